@@ -0,0 +1,213 @@
+"""Admission control: bound the requests in flight instead of queueing them behind the DB pool.
+
+Every request (health checks aside) passes up to three gates before it runs:
+
+- per client (``X-Client-Id`` header, else the peer address): at most
+  ``admission_max_per_client`` in flight; the next one gets 429 at once, so one
+  noisy caller cannot fill the shared slots;
+- per route, for expensive prefixes in ``admission_route_limits`` (exports, route
+  evaluation, duplicate scans);
+- global: ``admission_max_concurrent`` slots, by default the size of the DB pool
+  (5 + 10 overflow connections).
+
+Route and global gates keep a short FIFO queue: a request waits up to
+``admission_queue_timeout_s`` for a slot; when ``admission_max_queue`` requests
+are already waiting, or the wait times out, it is shed with 503. Both 429 and
+503 carry ``Retry-After``.
+"""
+
+import asyncio
+import json
+import math
+from collections import deque
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+EXEMPT_PREFIXES = ("/api/health",)
+
+
+class Gate:
+    """``limit`` concurrent holders; others wait in FIFO order, handed the slot of whoever leaves."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+
+    def try_enter(self) -> bool:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def enter(self, max_queue: int, timeout: float) -> bool:
+        """Take a slot, waiting up to ``timeout``; False if the queue is full or the wait times out."""
+        if self.try_enter():
+            return True
+        if len(self.waiters) >= max_queue or timeout <= 0:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return True  # handed a slot just as the wait ran out
+            return False
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    def leave(self):
+        # Hand the slot straight to the oldest waiter, so newcomers cannot overtake the queue.
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """The gates and counters behind ``AdmissionMiddleware``; one per API process."""
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout_s: float | None = None,
+        max_per_client: int | None = None,
+        route_limits: dict[str, int] | None = None,
+        retry_after_s: int | None = None,
+    ):
+        self.max_concurrent = settings.admission_max_concurrent if max_concurrent is None else max_concurrent
+        self.max_queue = settings.admission_max_queue if max_queue is None else max_queue
+        self.queue_timeout_s = settings.admission_queue_timeout_s if queue_timeout_s is None else queue_timeout_s
+        self.max_per_client = settings.admission_max_per_client if max_per_client is None else max_per_client
+        self.route_limits = dict(settings.admission_route_limits if route_limits is None else route_limits)
+        self.retry_after_s = settings.admission_retry_after_s if retry_after_s is None else retry_after_s
+        self._loop = None
+        self._reset()
+        self.admitted = 0
+        self.throttled = 0
+        self.shed = 0
+
+    def _reset(self):
+        self.global_gate = Gate(self.max_concurrent)
+        self.route_gates = {prefix: Gate(limit) for prefix, limit in self.route_limits.items()}
+        self.clients: dict[str, int] = {}
+
+    def _bind_loop(self):
+        # Futures belong to one event loop; start afresh if the server (or a test client) runs a new one.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._reset()
+
+    def route_gate(self, path: str) -> Gate | None:
+        """Gate of the longest configured prefix of ``path``, if any."""
+        matches = [prefix for prefix in self.route_gates if path.startswith(prefix)]
+        return self.route_gates[max(matches, key=len)] if matches else None
+
+    async def admit(self, client: str, path: str) -> tuple[int | None, list]:
+        """Acquire every gate for a request: ``(None, gates to release)``, or ``(429 or 503, [])``."""
+        self._bind_loop()
+        if self.clients.get(client, 0) >= self.max_per_client:
+            self.throttled += 1
+            return 429, []
+        self.clients[client] = self.clients.get(client, 0) + 1
+        held = []
+        for gate in (self.route_gate(path), self.global_gate):
+            if gate is None:
+                continue
+            if not await gate.enter(self.max_queue, self.queue_timeout_s):
+                self.release(client, held)
+                self.shed += 1
+                return 503, []
+            held.append(gate)
+        self.admitted += 1
+        return None, held
+
+    def release(self, client: str, held: list):
+        for gate in reversed(held):
+            gate.leave()
+        remaining = self.clients.get(client, 0) - 1
+        if remaining > 0:
+            self.clients[client] = remaining
+        else:
+            self.clients.pop(client, None)
+
+    def stats(self) -> dict:
+        """Requests in flight and waiting, and how many were admitted, throttled (429) or shed (503)."""
+        return {
+            "in_flight": self.global_gate.active,
+            "waiting": len(self.global_gate.waiters),
+            "max_concurrent": self.max_concurrent,
+            "routes": {
+                prefix: {"in_flight": gate.active, "waiting": len(gate.waiters), "limit": gate.limit}
+                for prefix, gate in self.route_gates.items()
+            },
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "shed": self.shed,
+        }
+
+
+_controller: AdmissionController | None = None
+
+
+def admission_controller() -> AdmissionController:
+    """This process's controller, built from settings on first use."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
+
+
+def client_key(scope: Scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"x-client-id":
+            return "id:" + value.decode("latin-1")
+    peer = scope.get("client")
+    return "ip:" + (peer[0] if peer else "unknown")
+
+
+async def send_rejection(send: Send, status: int, retry_after: float):
+    detail = "Too many concurrent requests from this client." if status == 429 else "Server busy, retry later."
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Runs each HTTP request through an ``AdmissionController``; rejected requests never reach the app."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admission_enabled or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller or admission_controller()
+        client = client_key(scope)
+        status, held = await controller.admit(client, scope["path"])
+        if status is not None:
+            await send_rejection(send, status, controller.retry_after_s)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(client, held)
@@ -0,0 +1,146 @@
+"""Response encodings: compression and content negotiation.
+
+- ``CompressionMiddleware`` compresses response bodies of at least
+  ``response_compression_min_bytes`` with zstd (if ``zstandard`` is installed
+  and the client accepts it) or gzip, streaming responses included. Already
+  compressed payloads (Parquet) are left alone.
+- ``negotiate`` lets a route answer in MessagePack or, for tabular data, as an
+  Arrow IPC stream when the ``Accept`` header prefers it; JSON stays the default.
+  A format whose library is not installed is simply not offered.
+"""
+
+from functools import lru_cache
+
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import msgpack
+except ImportError:  # optional dependency: pip install "where2now[encodings]"
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency: pip install "where2now[encodings]"
+    zstandard = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency: pip install "where2now[export]"
+    pa = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+# Aliases clients send for the same formats.
+MEDIA_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.apache.arrow.file": ARROW}
+EXCLUDED_CONTENT_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/vnd.apache.parquet",)
+
+
+def _accepted(header: str) -> list[tuple[str, float]]:
+    """Media ranges of an ``Accept`` header with their q-values, best first (stable for ties)."""
+    ranges = []
+    for item in header.split(","):
+        media, *params = (part.strip() for part in item.split(";"))
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((MEDIA_ALIASES.get(media.lower(), media.lower()), q))
+    return sorted(ranges, key=lambda r: -r[1])
+
+
+def preferred_media_type(accept: str | None, offered: list[str]) -> str | None:
+    """The first of ``offered`` matching the best-ranked media range; None if nothing acceptable."""
+    if not accept:
+        return offered[0]
+    for media, q in _accepted(accept):
+        if q <= 0:
+            continue
+        if media in ("*/*", "application/*"):
+            return offered[0]
+        if media in offered:
+            return media
+    return None
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def negotiate(request: Request, schema, value, rows=None):
+    """Encode ``value`` (validated as ``schema``) in the format the client prefers.
+
+    Returns ``value`` unchanged for JSON so the route's ``response_model`` applies
+    as usual, or a ``Response`` for MessagePack / Arrow. ``rows`` makes Arrow
+    available: a function from the validated value to a list of flat dicts (the
+    table). Raises 406 when no offered format is acceptable.
+    """
+    offered = [JSON]
+    if msgpack is not None:
+        offered.append(MSGPACK)
+    if pa is not None and rows is not None:
+        offered.append(ARROW)
+    media = preferred_media_type(request.headers.get("accept"), offered)
+    if media is None:
+        raise HTTPException(status_code=406, detail=f"Acceptable formats: {', '.join(offered)}.")
+    if media == JSON:
+        return value
+    adapter = _adapter(schema)
+    validated = adapter.validate_python(value, from_attributes=True)
+    if media == MSGPACK:
+        return Response(msgpack.packb(adapter.dump_python(validated, mode="json")), media_type=MSGPACK)
+    table = pa.Table.from_pylist(rows(adapter.dump_python(validated)))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), media_type=ARROW)
+
+
+class ZstdResponder(IdentityResponder):
+    content_encoding = "zstd"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int = 3, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            return self._compressor.compress(body) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(body) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """zstd or gzip response compression above a size threshold, by ``Accept-Encoding``."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = settings.response_compression_min_bytes if minimum_size is None else minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = {media for media, q in _accepted(Headers(scope=scope).get("accept-encoding", "")) if q > 0}
+        kwargs = {"exclude_content_types": EXCLUDED_CONTENT_TYPES}
+        if zstandard is not None and "zstd" in accepted:
+            responder = ZstdResponder(self.app, self.minimum_size, level=self.zstd_level, **kwargs)
+        elif "gzip" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level, **kwargs)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, **kwargs)
+        await responder(scope, receive, send)
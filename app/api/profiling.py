@@ -0,0 +1,200 @@
+"""On-demand request profiling for admins.
+
+A request with ``X-Profile: inline`` (or ``?profile=inline``) and an
+``X-Admin-Token`` matching ``PROFILING_ADMIN_TOKEN`` runs its endpoint under a
+sampling profiler (pyinstrument; cProfile when it is not installed):
+
+- ``inline``: the response is replaced by the report (pyinstrument's HTML
+  flame/timeline view, or cProfile stats as text); the endpoint's status is in
+  ``X-Profiled-Status``;
+- ``store``: the response is returned as usual and the report is written to
+  ``PROFILE_DIR``, named in the ``X-Profile-Report`` header.
+
+Sync endpoints run in a worker thread, and profilers only sample the thread
+they start in, so ``ProfiledRoute`` starts the profiler inside the endpoint
+call itself; the middleware hands it the request's profile through a context
+variable. Only the endpoint is profiled: a streaming body produced after it
+returns (exports) is not.
+"""
+
+import cProfile
+import functools
+import hmac
+import inspect
+import io
+import pstats
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import pyinstrument
+except ImportError:  # optional dependency: pip install "where2now[profiling]"
+    pyinstrument = None
+
+PROFILE_MODES = ("inline", "store")
+SAMPLE_INTERVAL_S = 0.001
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Profiler for one request; pyinstrument if installed, else cProfile."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._pyinstrument = None
+        self._cprofile = None
+
+    def start(self, is_async: bool = False):
+        if pyinstrument is not None:
+            self._pyinstrument = pyinstrument.Profiler(
+                interval=SAMPLE_INTERVAL_S, async_mode="enabled" if is_async else "disabled"
+            )
+            self._pyinstrument.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._pyinstrument is not None:
+            self._pyinstrument.stop()
+        elif self._cprofile is not None:
+            self._cprofile.disable()
+
+    @property
+    def media_type(self) -> str:
+        return "text/html" if pyinstrument is not None else "text/plain"
+
+    @property
+    def filename(self) -> str:
+        return self.name + (".html" if pyinstrument is not None else ".txt")
+
+    def render(self) -> bytes:
+        """The report; empty when the request never reached a profiled endpoint."""
+        if self._pyinstrument is not None:
+            return self._pyinstrument.output_html().encode()
+        if self._cprofile is not None:
+            out = io.StringIO()
+            pstats.Stats(self._cprofile, stream=out).sort_stats("cumulative").print_stats(60)
+            return out.getvalue().encode()
+        return b""
+
+
+def _profiled(endpoint):
+    """Wrap an endpoint so it runs under the request's profiler when one is active."""
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            profile.start(is_async=True)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.stop()
+
+        return wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        profile.start()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.stop()
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """API route whose endpoint can be profiled on demand (``APIRouter(route_class=ProfiledRoute)``)."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+def requested_mode(scope: Scope) -> str | None:
+    headers = Headers(scope=scope)
+    mode = headers.get("x-profile") or QueryParams(scope.get("query_string", b"")).get("profile")
+    if mode is None:
+        return None
+    return "inline" if mode in ("1", "true") else mode
+
+
+def is_admin(scope: Scope) -> bool:
+    token = settings.profiling_admin_token
+    supplied = Headers(scope=scope).get("x-admin-token", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+async def _send_plain(send: Send, status: int, body: bytes, media_type: str, headers: list | None = None):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", media_type.encode()), (b"content-length", str(len(body)).encode()), *(headers or [])],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class ProfilingMiddleware:
+    """Starts a ``RequestProfile`` for admin requests asking for one and returns or stores its report."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        if not is_admin(scope):
+            await _send_plain(send, 403, b'{"detail": "Profiling needs a valid X-Admin-Token."}', "application/json")
+            return
+        if mode not in PROFILE_MODES:
+            await _send_plain(send, 400, f'{{"detail": "profile must be one of {list(PROFILE_MODES)}."}}'.encode(), "application/json")
+            return
+
+        profile = RequestProfile(mode)
+        token = _current.set(profile)
+        if mode == "store":
+            path = Path(settings.profile_dir) / profile.filename
+
+            async def send_with_header(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-report", profile.filename.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_header)
+            finally:
+                _current.reset(token)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(profile.render())
+            return
+
+        status = [500]
+
+        async def capture(message):
+            # The endpoint's own response is dropped; only its status is kept.
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            _current.reset(token)
+        await _send_plain(send, 200, profile.render(), profile.media_type, [(b"x-profiled-status", str(status[0]).encode())])
@@ -1,23 +1,83 @@
 """Clients routes."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, delete, insert, select
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db_session
-from app.models.clients import Client
+from app.api.encoding import negotiate
+from app.api.profiling import ProfiledRoute
+from app.dependencies import get_bulk_delete_dispatcher, get_db_session, get_entity_cache, get_task_status
+from app.models.clients import Client, client_delivery_points
 from app.models.delivery_points import DeliveryPoint
-from app.schemas.clients import ClientCreate, ClientDeliveryPointsLink, ClientRead, ClientUpdate
+from app.schemas.bulk import MAX_BATCH_IDS, BatchGet, BulkDeleteRead, BulkDeleteStatus
+from app.schemas.clients import ClientBatchRead, ClientBulkDelete, ClientCreate, ClientDeliveryPointsLink, ClientRead, ClientUpdate
 from app.schemas.delivery_points import DeliveryPointRead
+from app.services.batch import get_many, parse_ids
+from app.services.bulk_delete import bulk_delete
+from app.services.entity_cache import EntityCache, serialize
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
-@router.get("/", response_model=list[ClientRead])
-def list_clients(db: Session = Depends(get_db_session)):
-    """List all clients."""
+@router.post("/bulk-delete", response_model=BulkDeleteRead)
+def bulk_delete_clients(
+    payload: ClientBulkDelete,
+    response: Response,
+    db: Session = Depends(get_db_session),
+    dispatch=Depends(get_bulk_delete_dispatcher),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Delete clients by id list and/or filter, set-based in chunks; links cascade.
+
+    With ``background`` the ids are handed to a worker and 202 is returned with a task id.
+    """
+    criteria = payload.model_dump(exclude={"background"})
+    try:
+        result = bulk_delete(db.get_bind(), "clients", criteria, dispatch if payload.background else None)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Rows went away outside this session; links went with them.
+    db.expire_all()
+    cache.clear()
+    if result.get("task_id"):
+        response.status_code = 202
+    return result
+
+
+@router.get("/bulk-delete/{task_id}", response_model=BulkDeleteStatus)
+def bulk_delete_clients_status(task_id: str, status=Depends(get_task_status)):
+    """Progress of a background bulk delete."""
+    return status(task_id)
+
+
+@router.get("/", response_model=list[ClientRead] | ClientBatchRead)
+def list_clients(
+    request: Request,
+    ids: str | None = Query(None, description="Comma-separated ids: fetch just these, in this order"),
+    db: Session = Depends(get_db_session),
+):
+    """List all clients, or with ``ids`` the requested ones in request order plus the missing ids.
+
+    Also served as MessagePack, and the full listing as an Arrow stream, by ``Accept``.
+    """
+    if ids is not None:
+        try:
+            wanted = parse_ids(ids)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if len(wanted) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request.")
+        items, missing = get_many(db, Client, wanted)
+        return negotiate(request, ClientBatchRead, {"items": items, "missing": missing})
     result = db.execute(select(Client))
-    return list(result.scalars().all())
+    return negotiate(request, list[ClientRead], list(result.scalars().all()), rows=list)
+
+
+@router.post("/batch-get", response_model=ClientBatchRead)
+def batch_get_clients(payload: BatchGet, db: Session = Depends(get_db_session)):
+    """Fetch many clients by id in one request; request order is kept and missing ids are reported."""
+    items, missing = get_many(db, Client, payload.ids)
+    return {"items": items, "missing": missing}
 
 
 @router.post("/", response_model=ClientRead, status_code=201)
@@ -31,16 +91,26 @@ def create_client(payload: ClientCreate, db: Session = Depends(get_db_session)):
 
 
 @router.get("/{client_id}", response_model=ClientRead)
-def get_client(client_id: int, db: Session = Depends(get_db_session)):
-    """Get one client by id."""
-    client = db.get(Client, client_id)
-    if client is None:
+def get_client(client_id: int, db: Session = Depends(get_db_session), cache: EntityCache = Depends(get_entity_cache)):
+    """Get one client by id (served from the entity cache when warm)."""
+
+    def load():
+        client = db.get(Client, client_id)
+        return None if client is None else serialize(ClientRead, client)
+
+    body = cache.get_or_load("clients", client_id, load)
+    if body is None:
         raise HTTPException(status_code=404, detail="Client not found.")
-    return client
+    return Response(body, media_type="application/json")
 
 
 @router.patch("/{client_id}", response_model=ClientRead)
-def update_client(client_id: int, payload: ClientUpdate, db: Session = Depends(get_db_session)):
+def update_client(
+    client_id: int,
+    payload: ClientUpdate,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
     """Update a client (partial)."""
     client = db.get(Client, client_id)
     if client is None:
@@ -49,55 +119,82 @@ def update_client(client_id: int, payload: ClientUpdate, db: Session = Depends(g
     for key, value in data.items():
         setattr(client, key, value)
     db.commit()
+    cache.invalidate("clients", [client_id])
+    # Listings of its delivery points embed the client.
+    cache.invalidate("delivery_point_clients")
     db.refresh(client)
     return client
 
 
 @router.delete("/{client_id}", status_code=204)
-def delete_client(client_id: int, db: Session = Depends(get_db_session)):
-    """Delete a client."""
-    client = db.get(Client, client_id)
-    if client is None:
+def delete_client(client_id: int, db: Session = Depends(get_db_session), cache: EntityCache = Depends(get_entity_cache)):
+    """Delete a client; its links and jobs go with it (ON DELETE CASCADE)."""
+    result = db.execute(delete(Client).where(Client.id == client_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Client not found.")
-    db.delete(client)
     db.commit()
+    cache.invalidate("clients", [client_id])
+    cache.invalidate("client_delivery_points", [client_id])
+    cache.invalidate("delivery_point_clients")
     return None
 
 @router.get("/{client_id}/delivery-points", response_model=list[DeliveryPointRead])
-def list_client_delivery_points(client_id: int, db: Session = Depends(get_db_session)):
-    """Get a list of delivery points for a client id."""
-    client = db.get(Client, client_id)
-    if client is None:
-        raise HTTPException(status_code=404, detail="Client not found.")
+def list_client_delivery_points(
+    client_id: int,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Get a list of delivery points for a client id (served from the entity cache when warm)."""
+
+    def load():
+        client = db.get(Client, client_id)
+        if client is None:
+            return None
+        # Using the relationship in place, SQLAlchemy handles the join
+        return serialize(list[DeliveryPointRead], list(client.delivery_points))
 
-    # Using the relationship in place, SQLAlchemy handles the join
-    return list(client.delivery_points)
+    body = cache.get_or_load("client_delivery_points", client_id, load)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Client not found.")
+    return Response(body, media_type="application/json")
 
 @router.post("/{client_id}/delivery-points", response_model=list[DeliveryPointRead])
 def link_client_delivery_points(
     client_id: int, 
     payload: ClientDeliveryPointsLink, 
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
 ):
-    """Link one or more delivery points to a client."""
+    """Link one or more delivery points to a client.
+
+    Set-based: one lookup of the requested ids (with their current link), one
+    multi-row insert for the new links and one select for the result, whatever
+    the batch size.
+    """
     client = db.get(Client, client_id)
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found.")
 
     if not payload.delivery_point_ids:
         # Nothing to add; just return current links
-        return list(client.delivery_points)
+        return _client_delivery_points(db, client_id)
 
-    # load all delivery points for the given IDs
-    result = db.execute(
-        select(DeliveryPoint)
-        .where(DeliveryPoint.id.in_(payload.delivery_point_ids))
-    )
-    delivery_points = list(result.scalars().all())
+    # Which requested points exist, and which of them are already linked
+    request_ids = list(dict.fromkeys(payload.delivery_point_ids))
+    rows = db.execute(
+        select(DeliveryPoint.id, client_delivery_points.c.client_id)
+        .outerjoin(
+            client_delivery_points,
+            and_(
+                client_delivery_points.c.delivery_point_id == DeliveryPoint.id,
+                client_delivery_points.c.client_id == client_id,
+            ),
+        )
+        .where(DeliveryPoint.id.in_(request_ids))
+    ).all()
 
-    found_ids = {dp.id for dp in delivery_points}
-    request_ids = set(payload.delivery_point_ids)
-    missing_ids = request_ids - found_ids
+    found_ids = {dp_id for dp_id, _ in rows}
+    missing_ids = set(request_ids) - found_ids
     if missing_ids:
         raise HTTPException(
             status_code=404,
@@ -105,17 +202,28 @@ def link_client_delivery_points(
         )
 
     # Add links (idempotent: skip if already linked)
-    for dp in delivery_points:
-        if dp not in client.delivery_points:
-            client.delivery_points.append(dp)
-
+    linked_ids = {dp_id for dp_id, linked in rows if linked is not None}
+    new_links = [
+        {"client_id": client_id, "delivery_point_id": dp_id}
+        for dp_id in request_ids
+        if dp_id not in linked_ids
+    ]
+    if new_links:
+        db.execute(insert(client_delivery_points), new_links)
     db.commit()
-    db.refresh(client)
+    if new_links:
+        cache.invalidate("client_delivery_points", [client_id])
+        cache.invalidate("delivery_point_clients", [link["delivery_point_id"] for link in new_links])
 
-    return list(client.delivery_points)
+    return _client_delivery_points(db, client_id)
 
 @router.delete("/{client_id}/delivery-points/{delivery_point_id}", status_code=204)
-def unlink_client_delivery_point(client_id: int, delivery_point_id: int, db: Session = Depends(get_db_session)):
+def unlink_client_delivery_point(
+    client_id: int,
+    delivery_point_id: int,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
     """Unlink a delivery point from a client."""
     # Check if the client exists
     client = db.get(Client, client_id)
@@ -127,11 +235,28 @@ def unlink_client_delivery_point(client_id: int, delivery_point_id: int, db: Ses
     if delivery_point is None:
         raise HTTPException(status_code=404, detail="Delivery point not found.")
 
-    # Check if the delivery point is associated with the client
-    if delivery_point not in client.delivery_points:
+    # Delete the link row directly instead of loading the whole collection
+    result = db.execute(
+        delete(client_delivery_points).where(
+            client_delivery_points.c.client_id == client_id,
+            client_delivery_points.c.delivery_point_id == delivery_point_id,
+        )
+    )
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Delivery point not associated with client.")
-
-    # Unlink the delivery point from the client
-    client.delivery_points.remove(delivery_point)
     db.commit()
-    return None
\ No newline at end of file
+    cache.invalidate("client_delivery_points", [client_id])
+    cache.invalidate("delivery_point_clients", [delivery_point_id])
+    return None
+
+
+def _client_delivery_points(db: Session, client_id: int) -> list[DeliveryPoint]:
+    """Delivery points linked to a client, in one joined select."""
+    result = db.execute(
+        select(DeliveryPoint)
+        .join(client_delivery_points, client_delivery_points.c.delivery_point_id == DeliveryPoint.id)
+        .where(client_delivery_points.c.client_id == client_id)
+        .order_by(DeliveryPoint.id)
+    )
+    return list(result.scalars().all())
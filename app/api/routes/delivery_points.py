@@ -1,24 +1,136 @@
 """Delivery points routes."""
 
 # Dependencies
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, delete, insert, select
 from sqlalchemy.orm import Session
 
 # Local stuff
-from app.dependencies import get_db_session
-from app.models.clients import Client
+from app.api.encoding import negotiate
+from app.api.profiling import ProfiledRoute
+from app.dependencies import get_bulk_delete_dispatcher, get_db_session, get_entity_cache, get_task_status
+from app.models.clients import Client, client_delivery_points
 from app.models.delivery_points import DeliveryPoint
+from app.schemas.bulk import MAX_BATCH_IDS, BatchGet, BulkDeleteRead, BulkDeleteStatus, BulkUpdateRead
 from app.schemas.clients import ClientRead
-from app.schemas.delivery_points import DeliveryPointClientsLink, DeliveryPointRead, DeliveryPointCreate, DeliveryPointUpdate
+from app.schemas.delivery_points import (
+    DeliveryPointBatchRead,
+    DeliveryPointBulkDelete,
+    DeliveryPointBulkUpdate,
+    DeliveryPointClientsLink,
+    DeliveryPointCreate,
+    DeliveryPointRead,
+    DeliveryPointsMerge,
+    DeliveryPointUpdate,
+    DuplicatesRead,
+    MergeRead,
+)
+from app.services.batch import get_many, parse_ids, update_many
+from app.services.bulk_delete import bulk_delete
+from app.services.dedup import DEFAULT_MIN_SIMILARITY, DEFAULT_RADIUS_M, find_duplicates, merge_duplicates
+from app.services.entity_cache import EntityCache, serialize
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-@router.get("/", response_model=list[DeliveryPointRead])
-def list_delivery_points(db: Session = Depends(get_db_session)):
-    """List all delivery points."""
+@router.get("/", response_model=list[DeliveryPointRead] | DeliveryPointBatchRead)
+def list_delivery_points(
+    request: Request,
+    ids: str | None = Query(None, description="Comma-separated ids: fetch just these, in this order"),
+    db: Session = Depends(get_db_session),
+):
+    """List all delivery points, or with ``ids`` the requested ones in request order plus the missing ids.
+
+    Also served as MessagePack, and the full listing as an Arrow stream, by ``Accept``.
+    """
+    if ids is not None:
+        try:
+            wanted = parse_ids(ids)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if len(wanted) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request.")
+        items, missing = get_many(db, DeliveryPoint, wanted)
+        return negotiate(request, DeliveryPointBatchRead, {"items": items, "missing": missing})
     result = db.execute(select(DeliveryPoint))
-    return list(result.scalars().all())
+    return negotiate(request, list[DeliveryPointRead], list(result.scalars().all()), rows=list)
+
+@router.patch("/", response_model=BulkUpdateRead)
+def bulk_update_delivery_points(
+    payload: DeliveryPointBulkUpdate,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Partially update many delivery points in one request (grouped executemany UPDATEs).
+
+    Returns a summary instead of the rows; unknown ids are skipped and listed.
+    """
+    rows = [item.model_dump(exclude_unset=True) | {"id": item.id} for item in payload.items]
+    result = update_many(db.get_bind(), DeliveryPoint.__table__, rows)
+    # Rows changed outside this session.
+    db.expire_all()
+    cache.invalidate("delivery_points", [row["id"] for row in rows])
+    cache.invalidate("client_delivery_points")
+    return result
+
+@router.post("/batch-get", response_model=DeliveryPointBatchRead)
+def batch_get_delivery_points(payload: BatchGet, db: Session = Depends(get_db_session)):
+    """Fetch many delivery points by id in one request; request order is kept and missing ids are reported."""
+    items, missing = get_many(db, DeliveryPoint, payload.ids)
+    return {"items": items, "missing": missing}
+
+@router.post("/bulk-delete", response_model=BulkDeleteRead)
+def bulk_delete_delivery_points(
+    payload: DeliveryPointBulkDelete,
+    response: Response,
+    db: Session = Depends(get_db_session),
+    dispatch=Depends(get_bulk_delete_dispatcher),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Delete delivery points by id list and/or filter, set-based in chunks; links cascade.
+
+    With ``background`` the ids are handed to a worker and 202 is returned with a task id.
+    """
+    criteria = payload.model_dump(exclude={"background"})
+    try:
+        result = bulk_delete(db.get_bind(), "delivery_points", criteria, dispatch if payload.background else None)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Rows went away outside this session; links went with them.
+    db.expire_all()
+    cache.clear()
+    if result.get("task_id"):
+        response.status_code = 202
+    return result
+
+@router.get("/bulk-delete/{task_id}", response_model=BulkDeleteStatus)
+def bulk_delete_delivery_points_status(task_id: str, status=Depends(get_task_status)):
+    """Progress of a background bulk delete."""
+    return status(task_id)
+
+@router.get("/duplicates", response_model=DuplicatesRead)
+def find_duplicate_delivery_points(
+    radius_m: float = Query(DEFAULT_RADIUS_M, ge=10, le=5_000),
+    min_similarity: float = Query(DEFAULT_MIN_SIMILARITY, ge=0, le=1),
+    db: Session = Depends(get_db_session),
+):
+    """Clusters of likely duplicates: nearby points with similar name/address, or equal addresses in one zip/city."""
+    return find_duplicates(db.get_bind(), radius_m, min_similarity)
+
+@router.post("/merge", response_model=MergeRead)
+def merge_delivery_points(
+    payload: DeliveryPointsMerge,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Merge duplicates into their canonical point: client links are re-pointed in bulk, duplicates deleted."""
+    try:
+        result = merge_duplicates(db.get_bind(), [(m.canonical_id, m.duplicate_ids) for m in payload.merges])
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    cache.clear()
+    return result
 
 @router.post("/", response_model=DeliveryPointRead, status_code=201)
 def create_delivery_point(payload: DeliveryPointCreate, db: Session = Depends(get_db_session)):
@@ -30,15 +142,29 @@ def create_delivery_point(payload: DeliveryPointCreate, db: Session = Depends(ge
     return delivery_point
 
 @router.get("/{delivery_point_id}", response_model=DeliveryPointRead)
-def get_delivery_point(delivery_point_id: int, db: Session = Depends(get_db_session)):
-    """Get one delivery point by id."""
-    delivery_point = db.get(DeliveryPoint, delivery_point_id)
-    if delivery_point is None:
+def get_delivery_point(
+    delivery_point_id: int,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Get one delivery point by id (served from the entity cache when warm)."""
+
+    def load():
+        delivery_point = db.get(DeliveryPoint, delivery_point_id)
+        return None if delivery_point is None else serialize(DeliveryPointRead, delivery_point)
+
+    body = cache.get_or_load("delivery_points", delivery_point_id, load)
+    if body is None:
         raise HTTPException(status_code=404, detail="Delivery point not found.")
-    return delivery_point
+    return Response(body, media_type="application/json")
 
 @router.patch("/{delivery_point_id}", response_model=DeliveryPointRead)
-def update_delivery_point(delivery_point_id: int, payload: DeliveryPointUpdate, db: Session = Depends(get_db_session)):
+def update_delivery_point(
+    delivery_point_id: int,
+    payload: DeliveryPointUpdate,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
     """Update a delivery point (partial)."""
     delivery_point = db.get(DeliveryPoint, delivery_point_id)
     if delivery_point is None:
@@ -47,57 +173,83 @@ def update_delivery_point(delivery_point_id: int, payload: DeliveryPointUpdate,
     for key, value in data.items():
         setattr(delivery_point, key, value)
     db.commit()
+    cache.invalidate("delivery_points", [delivery_point_id])
+    # Listings of its clients embed the point.
+    cache.invalidate("client_delivery_points")
     db.refresh(delivery_point)
     return delivery_point
 
 @router.delete("/{delivery_point_id}", status_code=204)
-def delete_delivery_point(delivery_point_id: int, db: Session = Depends(get_db_session)):
-    """Delete a delivery point."""
-    delivery_point = db.get(DeliveryPoint, delivery_point_id)
-    if delivery_point is None:
+def delete_delivery_point(
+    delivery_point_id: int,
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
+):
+    """Delete a delivery point; its links and cached travel times go with it (ON DELETE CASCADE)."""
+    result = db.execute(delete(DeliveryPoint).where(DeliveryPoint.id == delivery_point_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Delivery point not found.")
-    db.delete(delivery_point)
     db.commit()
+    cache.invalidate("delivery_points", [delivery_point_id])
+    cache.invalidate("delivery_point_clients", [delivery_point_id])
+    cache.invalidate("client_delivery_points")
     return None
 
 
 @router.get("/{delivery_point_id}/clients", response_model=list[ClientRead])
 def list_delivery_point_clients(
     delivery_point_id: int,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
 ):
-    """Get a list of clients for a delivery point id."""
-    delivery_point = db.get(DeliveryPoint, delivery_point_id)
-    if delivery_point is None:
-        raise HTTPException(status_code=404, detail="Delivery point not found.")
+    """Get a list of clients for a delivery point id (served from the entity cache when warm)."""
+
+    def load():
+        delivery_point = db.get(DeliveryPoint, delivery_point_id)
+        return None if delivery_point is None else serialize(list[ClientRead], list(delivery_point.clients))
 
-    return list(delivery_point.clients)
+    body = cache.get_or_load("delivery_point_clients", delivery_point_id, load)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Delivery point not found.")
+    return Response(body, media_type="application/json")
 
 @router.post("/{delivery_point_id}/clients", response_model=list[ClientRead])
 def link_delivery_point_clients(
     delivery_point_id: int,
     payload: DeliveryPointClientsLink,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
 ):
-    """Link one or more clients to a delivery point"""
+    """Link one or more clients to a delivery point
+
+    Set-based: one lookup of the requested ids (with their current link), one
+    multi-row insert for the new links and one select for the result, whatever
+    the batch size.
+    """
     delivery_point = db.get(DeliveryPoint, delivery_point_id)
     if delivery_point is None:
         raise HTTPException(status_code=404, detail="Delivery point not found.")
 
     if not payload.client_ids:
         # Nothing to add; returning the current links
-        return list(delivery_point.clients)
+        return _delivery_point_clients(db, delivery_point_id)
 
-    # load all clients for the given id's
-    result = db.execute(
-        select(Client)
-        .where(Client.id.in_(payload.client_ids))
-    )
-    clients = list(result.scalars().all())
+    # Which requested clients exist, and which of them are already linked
+    request_ids = list(dict.fromkeys(payload.client_ids))
+    rows = db.execute(
+        select(Client.id, client_delivery_points.c.delivery_point_id)
+        .outerjoin(
+            client_delivery_points,
+            and_(
+                client_delivery_points.c.client_id == Client.id,
+                client_delivery_points.c.delivery_point_id == delivery_point_id,
+            ),
+        )
+        .where(Client.id.in_(request_ids))
+    ).all()
 
-    found_ids = {client.id for client in clients}
-    request_ids = set(payload.client_ids)
-    missing_ids = request_ids - found_ids
+    found_ids = {client_id for client_id, _ in rows}
+    missing_ids = set(request_ids) - found_ids
     if missing_ids:
         raise HTTPException(
             status_code=404,
@@ -105,20 +257,27 @@ def link_delivery_point_clients(
         )
     
     # Add links (idempotent: skip if already linked)
-    for client in clients:
-        if client not in delivery_point.clients:
-            delivery_point.clients.append(client)
-
+    linked_ids = {client_id for client_id, linked in rows if linked is not None}
+    new_links = [
+        {"client_id": client_id, "delivery_point_id": delivery_point_id}
+        for client_id in request_ids
+        if client_id not in linked_ids
+    ]
+    if new_links:
+        db.execute(insert(client_delivery_points), new_links)
     db.commit()
-    db.refresh(delivery_point)
+    if new_links:
+        cache.invalidate("delivery_point_clients", [delivery_point_id])
+        cache.invalidate("client_delivery_points", [link["client_id"] for link in new_links])
 
-    return list(delivery_point.clients)
+    return _delivery_point_clients(db, delivery_point_id)
 
 @router.delete("/{delivery_point_id}/clients/{client_id}", status_code=204)
 def unlink_delivery_point_client(
     delivery_point_id: int,
     client_id: int,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    cache: EntityCache = Depends(get_entity_cache),
 ):
     """Unlink a client from a delivery point."""
     # Check if the delivery point exists
@@ -131,10 +290,28 @@ def unlink_delivery_point_client(
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found.")
 
-    # Check if the client is associated with the delivery point
-    if client not in delivery_point.clients:
+    # Delete the link row directly instead of loading the whole collection
+    result = db.execute(
+        delete(client_delivery_points).where(
+            client_delivery_points.c.client_id == client_id,
+            client_delivery_points.c.delivery_point_id == delivery_point_id,
+        )
+    )
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Client not associated with delivery point.")
-
-    delivery_point.clients.remove(client)
     db.commit()
-    return None
\ No newline at end of file
+    cache.invalidate("delivery_point_clients", [delivery_point_id])
+    cache.invalidate("client_delivery_points", [client_id])
+    return None
+
+
+def _delivery_point_clients(db: Session, delivery_point_id: int) -> list[Client]:
+    """Clients linked to a delivery point, in one joined select."""
+    result = db.execute(
+        select(Client)
+        .join(client_delivery_points, client_delivery_points.c.client_id == Client.id)
+        .where(client_delivery_points.c.delivery_point_id == delivery_point_id)
+        .order_by(Client.id)
+    )
+    return list(result.scalars().all())
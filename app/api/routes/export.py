@@ -0,0 +1,37 @@
+"""Bulk export routes (Arrow IPC / Parquet)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.profiling import ProfiledRoute
+from app.dependencies import get_db_session
+from app.services.export import DEFAULT_CHUNK_SIZE, MEDIA_TYPES, ExportError, parse_filters, stream_export
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/{table_name}")
+def export_table(
+    table_name: str,
+    format: str = Query("arrow", description="arrow (IPC stream) or parquet"),
+    columns: str | None = Query(None, description="Comma-separated column projection"),
+    filter: list[str] = Query([], description="Equality filters as column=value (repeatable)"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=1_000_000),
+    db: Session = Depends(get_db_session),
+):
+    """Stream a table snapshot in row-group chunks."""
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        body = stream_export(db.get_bind(), table_name, format, selected, parse_filters(filter), chunk_size)
+    except ExportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+
+    extension = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{extension}"'},
+    )
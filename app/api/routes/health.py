@@ -2,7 +2,8 @@
 
 from fastapi import APIRouter, Depends
 from fastapi_health import health
-from app.dependencies import get_db_session
+from app.api.admission import admission_controller
+from app.dependencies import get_db_session, get_entity_cache
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
@@ -14,4 +15,16 @@ def is_database_online(db: Session = Depends(get_db_session)):
         return False
 
 router = APIRouter()
-router.add_api_route("/health", health([is_database_online]))
\ No newline at end of file
+router.add_api_route("/health", health([is_database_online]))
+
+
+@router.get("/health/cache")
+def entity_cache_stats(cache=Depends(get_entity_cache)):
+    """Entity cache size and hit ratios for this API process."""
+    return cache.stats()
+
+
+@router.get("/health/admission")
+def admission_stats():
+    """Requests in flight and waiting, and counts of throttled (429) and shed (503) requests, for this API process."""
+    return admission_controller().stats()
@@ -0,0 +1,141 @@
+"""Solve jobs routes."""
+
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.encoding import negotiate
+from app.api.profiling import ProfiledRoute
+from app.config import settings
+from app.dependencies import get_db_session, get_job_dispatcher
+from app.models.clients import Client
+from app.models.delivery_points import DeliveryPoint
+from app.models.jobs import Job
+from app.schemas.jobs import InsertionCreate, JobRead, ScenarioJobCreate, SolveJobCreate
+from app.services.insertion import insert_into_solution
+from app.travel_times_subsystem.service import shared_service
+from app.worker.affinity import job_region
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _queue_job(db: Session, dispatch, payload: SolveJobCreate, kind: str) -> Job:
+    # Back-pressure: refuse new work while the solve queue is deep rather than let it grow without bound.
+    queued = db.execute(select(func.count()).select_from(Job).where(Job.status == "queued")).scalar_one()
+    if queued >= settings.job_queue_max_depth:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Solve queue is full ({queued} jobs waiting); retry later.",
+            headers={"Retry-After": str(settings.job_queue_retry_after_s)},
+        )
+    if db.get(Client, payload.client_id) is None:
+        raise HTTPException(status_code=404, detail="Client not found.")
+    depot = db.get(DeliveryPoint, payload.depot_id)
+    if depot is None:
+        raise HTTPException(status_code=404, detail="Delivery point not found.")
+    job = Job(client_id=payload.client_id, kind=kind, status="queued", params=payload.model_dump(exclude={"client_id"}))
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    # Jobs are routed to workers already holding the depot's region.
+    located = depot.latitude is not None and depot.longitude is not None
+    dispatch(job.id, job_region((depot.latitude, depot.longitude)) if located else None)
+    return job
+
+
+@router.post("/", response_model=JobRead, status_code=202)
+def create_job(
+    payload: SolveJobCreate,
+    db: Session = Depends(get_db_session),
+    dispatch=Depends(get_job_dispatcher),
+):
+    """Queue a solve job; poll ``GET /jobs/{id}`` for the result."""
+    return _queue_job(db, dispatch, payload, "solve")
+
+
+@router.post("/scenarios", response_model=JobRead, status_code=202)
+def create_scenario_job(
+    payload: ScenarioJobCreate,
+    db: Session = Depends(get_db_session),
+    dispatch=Depends(get_job_dispatcher),
+):
+    """Queue a scenario batch: the problem is solved once per scenario on one shared matrix."""
+    return _queue_job(db, dispatch, payload, "scenarios")
+
+
+@router.get("/", response_model=list[JobRead])
+def list_jobs(
+    request: Request,
+    client_id: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db_session),
+):
+    """Most recent jobs first, optionally for one client."""
+    stmt = select(Job).order_by(Job.id.desc()).limit(limit)
+    if client_id is not None:
+        stmt = stmt.where(Job.client_id == client_id)
+    return negotiate(request, list[JobRead], list(db.execute(stmt).scalars().all()))
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(job_id: int, request: Request, db: Session = Depends(get_db_session)):
+    """Get one job (status and, once finished, result or error).
+
+    Also served as MessagePack, or its routes as an Arrow table of stops, by ``Accept``.
+    """
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return negotiate(request, JobRead, job, rows=_route_stops)
+
+
+@router.post("/{job_id}/insertions", response_model=JobRead, status_code=201)
+def insert_stops(job_id: int, payload: InsertionCreate, db: Session = Depends(get_db_session)):
+    """Insert new stops into a finished job's routes (cheapest feasible insertion + local repair).
+
+    Runs synchronously and stores the updated plan as a new job, so insertions can be chained.
+    """
+    base = db.get(Job, job_id)
+    if base is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if base.kind == "scenarios":
+        raise HTTPException(status_code=409, detail="Scenario batches have no single plan to insert into.")
+    if base.status != "succeeded" or not base.result:
+        raise HTTPException(status_code=409, detail="Job has no solution yet.")
+    engine = db.get_bind()
+    try:
+        result = insert_into_solution(engine, base.params, base.result, payload.delivery_point_ids, shared_service(engine))
+    except (ValueError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    now = datetime.now(timezone.utc)
+    job = Job(
+        client_id=base.client_id,
+        kind="insert",
+        status="succeeded",
+        params={**base.params, "base_job_id": base.id, "inserted_ids": result["inserted"]},
+        result=result,
+        started_at=now,
+        finished_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _route_stops(job: dict) -> list[dict]:
+    """One row per routed stop: (scenario,) route, position and delivery point id."""
+    result = job["result"] or {}
+    if "scenarios" in result:
+        plans = [(s["name"], s["routes"]) for s in result["scenarios"]]
+    else:
+        plans = [(None, result.get("routes", []))]
+    return [
+        {**({"scenario": name} if name is not None else {}), "route": r, "position": p, "delivery_point_id": stop}
+        for name, routes in plans
+        for r, route in enumerate(routes)
+        for p, stop in enumerate(route)
+    ]
+
@@ -0,0 +1,26 @@
+"""Route evaluation routes."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.profiling import ProfiledRoute
+from app.dependencies import get_db_session
+from app.schemas.routes import EvaluationRead, RouteEvaluationCreate
+from app.services.evaluation import evaluate_plan
+from app.travel_times_subsystem.service import shared_service
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.post("/evaluate", response_model=EvaluationRead)
+def evaluate(payload: RouteEvaluationCreate, db: Session = Depends(get_db_session)):
+    """Score candidate routes: distance, duration, per-stop ETAs, load profile and constraint violations."""
+    engine = db.get_bind()
+    try:
+        return evaluate_plan(
+            engine, payload.depot_id, payload.routes, payload.model_dump(exclude={"depot_id", "routes"}), shared_service(engine)
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -0,0 +1,54 @@
+"""Command-line tools.
+
+Usage (from project root):
+    python -m app.cli export delivery_points --format parquet -o delivery_points.parquet
+    python -m app.cli export clients --columns id,name --filter name=Acme -o clients.arrows
+"""
+
+import argparse
+import sys
+
+from app.db.session import engine
+from app.services.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES, ExportError, parse_filters, stream_export
+
+
+def _export(args) -> int:
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None
+    try:
+        chunks = stream_export(engine, args.table, args.format, columns, parse_filters(args.filter), args.chunk_size)
+    except (ExportError, RuntimeError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export a table as Arrow IPC or Parquet.")
+    export.add_argument("table", choices=sorted(EXPORT_TABLES))
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="arrow")
+    export.add_argument("--columns", help="Comma-separated column projection.")
+    export.add_argument("--filter", action="append", default=[], help="Equality filter column=value (repeatable).")
+    export.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    export.add_argument("-o", "--output", default="-", help="Output file ('-' for stdout).")
+    export.set_defaults(func=_export)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,4 +7,50 @@ def get_db_session():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_entity_cache():
+    """This process's entity response cache (overridden in tests)."""
+    from app.services.entity_cache import entity_cache
+
+    return entity_cache()
+
+
+def _enqueue_solve_job(job_id: int, region: int | None = None):
+    from app.worker.affinity import WorkerRegistry, dispatch_solve_job
+    from app.worker.tasks import solve_job
+
+    dispatch_solve_job(solve_job, job_id, region, WorkerRegistry.from_url())
+
+
+def get_job_dispatcher():
+    """Callable that hands a queued job id to the workers (overridden in tests)."""
+    return _enqueue_solve_job
+
+
+def _enqueue_bulk_delete(table: str, ids: list[int]) -> str:
+    from app.worker.tasks import bulk_delete
+
+    return bulk_delete.delay(table, ids).id
+
+
+def get_bulk_delete_dispatcher():
+    """Callable that hands a bulk delete to the workers and returns its task id (overridden in tests)."""
+    return _enqueue_bulk_delete
+
+
+def _bulk_delete_status(task_id: str) -> dict:
+    from celery.result import AsyncResult
+
+    from app.worker.celery_app import celery_app
+
+    result = AsyncResult(task_id, app=celery_app)
+    # PROGRESS and SUCCESS carry counts; a failure carries the exception instead.
+    info = result.info if isinstance(result.info, dict) else {}
+    return {"task_id": task_id, "state": result.state, **info}
+
+
+def get_task_status():
+    """Callable returning a background task's state and progress (overridden in tests)."""
+    return _bulk_delete_status
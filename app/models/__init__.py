@@ -5,4 +5,6 @@ Alembic needs this for `alembic revision --autogenerate` to detect your tables.
 """
 
 from app.models.clients import Client  # noqa: F401
-from app.models.delivery_points import DeliveryPoint  # noqa: F401
\ No newline at end of file
+from app.models.delivery_points import DeliveryPoint  # noqa: F401
+from app.models.travel_times import TravelTime  # noqa: F401
+from app.models.jobs import Job  # noqa: F401
@@ -0,0 +1,25 @@
+"""Travel times model (cached provider observations)."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+
+from app.db.base import Base
+
+# Time-of-day buckets: 96 buckets of 15 minutes, bucket 0 starts at midnight (local time).
+BUCKET_SECONDS = 900
+BUCKETS_PER_DAY = 86_400 // BUCKET_SECONDS
+
+
+class TravelTime(Base):
+    """Observed travel time from one delivery point to another in one time-of-day bucket."""
+
+    __tablename__ = "travel_times"
+
+    origin_id = Column(Integer, ForeignKey("delivery_points.id", ondelete="CASCADE"), primary_key=True)
+    destination_id = Column(Integer, ForeignKey("delivery_points.id", ondelete="CASCADE"), primary_key=True)
+    time_bucket = Column(Integer, primary_key=True)
+    duration_s = Column(Float, nullable=False)
+    distance_m = Column(Float, nullable=True)
+    source = Column(String(32), nullable=False, default="google")
+    observed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
@@ -0,0 +1,37 @@
+"""Pydantic schemas for bulk operations."""
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_IDS = 10_000
+
+
+class BulkDeleteRead(BaseModel):
+    """Result of a bulk delete; in background mode ``deleted`` is None and ``task_id`` is set."""
+
+    matched: int
+    deleted: int | None = None
+    task_id: str | None = None
+
+
+class BulkDeleteStatus(BaseModel):
+    """Progress of a background bulk delete (``state``: PENDING, PROGRESS, SUCCESS or FAILURE)."""
+
+    task_id: str
+    state: str
+    total: int | None = None
+    done: int | None = None
+    deleted: int | None = None
+
+
+class BatchGet(BaseModel):
+    """Payload for fetching many entities by id; results keep this order."""
+
+    ids: list[int] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class BulkUpdateRead(BaseModel):
+    """Summary of a bulk update: rows asked for, rows changed and ids that do not exist."""
+
+    requested: int
+    updated: int
+    missing: list[int]
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ClientCreate(BaseModel):
@@ -37,4 +37,23 @@ class ClientUpdate(BaseModel):
 class ClientDeliveryPointsLink(BaseModel):
     """Payload for linking delivery points to a client"""
 
-    delivery_point_ids: list[int]
\ No newline at end of file
+    delivery_point_ids: list[int]
+
+
+class ClientBulkDelete(BaseModel):
+    """Payload for deleting clients in bulk: by ``ids`` and/or exact ``name``/``email``.
+
+    With ``background`` the delete runs on a worker; poll its progress by task id.
+    """
+
+    ids: list[int] | None = Field(None, max_length=1_000_000)
+    name: str | None = None
+    email: str | None = None
+    background: bool = False
+
+
+class ClientBatchRead(BaseModel):
+    """Clients in request order, plus requested ids that do not exist."""
+
+    items: list[ClientRead]
+    missing: list[int]
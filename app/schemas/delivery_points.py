@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 class DeliveryPointCreate(BaseModel):
     """Payload for creating a delivery point"""
@@ -43,4 +43,78 @@ class DeliveryPointUpdate(BaseModel):
 class DeliveryPointClientsLink(BaseModel):
     """Payload for linking clients to a delivery point"""
 
-    client_ids: list[int]
\ No newline at end of file
+    client_ids: list[int]
+class DuplicateCluster(BaseModel):
+    """Delivery points that look like one place; ``canonical_id`` is the one to keep"""
+
+    canonical_id: int
+    duplicate_ids: list[int]
+    names: list[str]
+    max_distance_m: float | None
+
+class DuplicatesRead(BaseModel):
+    """Response shape for duplicate detection"""
+
+    points: int
+    candidate_pairs: int
+    duplicates: int
+    clusters: list[DuplicateCluster]
+    seconds: float
+
+class DeliveryPointMerge(BaseModel):
+    """One merge: links of ``duplicate_ids`` move to ``canonical_id``, then the duplicates are deleted"""
+
+    canonical_id: int
+    duplicate_ids: list[int] = Field(min_length=1)
+
+class DeliveryPointsMerge(BaseModel):
+    """Payload for merging duplicate delivery points in bulk"""
+
+    merges: list[DeliveryPointMerge] = Field(min_length=1)
+
+class MergeRead(BaseModel):
+    """Response shape for a bulk merge"""
+
+    merged: int
+    links_added: int
+
+class DeliveryPointBulkDelete(BaseModel):
+    """Payload for deleting delivery points in bulk: by ``ids`` and/or filters
+
+    ``client_id`` selects the client's points; with ``exclusive`` only those no other
+    client is linked to. With ``background`` the delete runs on a worker; poll its
+    progress by task id.
+    """
+
+    ids: list[int] | None = Field(None, max_length=1_000_000)
+    client_id: int | None = None
+    exclusive: bool = False
+    country: str | None = None
+    zip: str | None = None
+    city: str | None = None
+    state: str | None = None
+    background: bool = False
+
+class DeliveryPointBatchRead(BaseModel):
+    """Delivery points in request order, plus requested ids that do not exist"""
+
+    items: list[DeliveryPointRead]
+    missing: list[int]
+
+class DeliveryPointBulkUpdateItem(DeliveryPointUpdate):
+    """One partial update; fields left out are not touched"""
+
+    id: int
+
+class DeliveryPointBulkUpdate(BaseModel):
+    """Payload for updating many delivery points at once (e.g. geocoding corrections)"""
+
+    items: list[DeliveryPointBulkUpdateItem] = Field(min_length=1, max_length=100_000)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: list[DeliveryPointBulkUpdateItem]) -> list[DeliveryPointBulkUpdateItem]:
+        ids = [item.id for item in items]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Each delivery point may appear only once.")
+        return items
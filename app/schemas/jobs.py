@@ -0,0 +1,80 @@
+"""Pydantic schemas for Job."""
+
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class SolveJobCreate(BaseModel):
+    """Payload for submitting a solve job.
+
+    Without ``delivery_point_ids`` every delivery point linked to the client is routed.
+    ``depot_id`` is the delivery point vehicles start from and return to.
+    """
+
+    client_id: int
+    depot_id: int
+    delivery_point_ids: list[int] | None = None
+    mode: Literal["greedy", "local_search", "alns"] = "local_search"
+    travel_times: Literal["approximate", "cached"] = "cached"
+    time_bucket: int = Field(32, ge=0, lt=96, description="Departure time-of-day bucket (15 min each); 32 = 08:00")
+    vehicle_capacity: float | None = Field(None, gt=0)
+    iterations: int = Field(300, ge=1, le=100_000, description="ALNS iterations per search")
+    workers: int | None = Field(None, ge=1, le=256, description="Parallel ALNS searches (default: SOLVER_WORKERS)")
+    time_limit_s: float | None = Field(None, gt=0)
+    presolve: bool = Field(True, description="Merge co-located stops and prune unusable arcs before solving")
+    merge_seconds: float = Field(30.0, ge=0, description="Stops this close (both ways) are visited as one block")
+
+
+class Scenario(BaseModel):
+    """One what-if variant; unset fields keep the batch's values."""
+
+    name: str = Field(min_length=1, max_length=100)
+    vehicles: int | None = Field(None, ge=1, description="Fleet size; stops that do not fit are reported as unserved")
+    shift_start_s: float | None = Field(None, ge=0, description="Shift start, seconds from midnight")
+    shift_s: float | None = Field(None, gt=0, description="Shift length in seconds; routes must be back at the depot by its end")
+    vehicle_capacity: float | None = Field(None, gt=0)
+    mode: Literal["greedy", "local_search", "alns"] | None = None
+    iterations: int | None = Field(None, ge=1, le=100_000)
+
+
+class ScenarioJobCreate(SolveJobCreate):
+    """Payload for a scenario batch: one problem and matrix, solved once per scenario.
+
+    ``workers`` is the number of scenarios solved in parallel; ALNS scenarios run one search each.
+    """
+
+    scenarios: list[Scenario] = Field(min_length=1, max_length=64)
+
+    @field_validator("scenarios")
+    @classmethod
+    def unique_names(cls, scenarios: list[Scenario]) -> list[Scenario]:
+        names = [s.name for s in scenarios]
+        if len(set(names)) != len(names):
+            raise ValueError("Scenario names must be unique.")
+        return scenarios
+
+
+class InsertionCreate(BaseModel):
+    """Payload for inserting new stops into a finished job's routes."""
+
+    delivery_point_ids: list[int] = Field(min_length=1)
+
+
+class JobRead(BaseModel):
+    """Response shape for a job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    client_id: int
+    kind: str
+    status: str
+    params: dict
+    result: dict | None
+    error: str | None
+    phases: dict[str, float] | None = None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -0,0 +1,57 @@
+"""Pydantic schemas for route evaluation."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class RouteEvaluationCreate(BaseModel):
+    """Candidate routes to score, each a list of delivery point ids visited in order.
+
+    Every route starts and ends at ``depot_id``; routes are evaluated independently.
+    """
+
+    depot_id: int
+    routes: list[list[int]] = Field(min_length=1)
+    travel_times: Literal["approximate", "cached"] = "cached"
+    time_bucket: int = Field(32, ge=0, lt=96, description="Time-of-day bucket of the travel times (15 min each); 32 = 08:00")
+    vehicle_capacity: float | None = Field(None, gt=0)
+    start_time_s: float | None = Field(None, ge=0, description="Departure from the depot, seconds from midnight (default: start of time_bucket)")
+
+
+class Violation(BaseModel):
+    """A broken constraint: ``time_window`` (amount = seconds late), ``return_late``, ``capacity`` (excess load) or ``repeated_stop``."""
+
+    type: Literal["time_window", "return_late", "capacity", "repeated_stop"]
+    delivery_point_id: int | None
+    amount: float | None
+
+
+class RouteEvaluationRead(BaseModel):
+    """Scores for one route; per-stop lists are aligned with ``delivery_point_ids``."""
+
+    delivery_point_ids: list[int]
+    travel_s: float
+    duration_s: float
+    wait_s: float
+    distance_m: float
+    departure_s: float
+    return_s: float
+    etas_s: list[float]
+    arrivals_s: list[float]
+    loads: list[float]
+    feasible: bool
+    violations: list[Violation]
+
+
+class EvaluationTotals(BaseModel):
+    routes: int
+    stops: int
+    travel_s: float
+    distance_m: float
+    feasible_routes: int
+
+
+class EvaluationRead(BaseModel):
+    routes: list[RouteEvaluationRead]
+    totals: EvaluationTotals
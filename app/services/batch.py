@@ -0,0 +1,82 @@
+"""Fetch and update many rows by id with a few set-based statements.
+
+Ids are read in chunks of ``CHUNK_SIZE`` with ``WHERE id IN (...)`` (bounded
+statement size on every backend); results come back in request order with the
+ids that do not exist listed separately. Updates are grouped by the columns
+they set and sent as one statement per group instead of one per row.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import Table, bindparam, cast, column, select, update, values
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+CHUNK_SIZE = 1000
+
+
+def parse_ids(text: str) -> list[int]:
+    """Ids from a comma-separated query value; raises ValueError on anything else."""
+    try:
+        return [int(part) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be comma-separated integers.") from None
+
+
+def get_many(db: Session, model, ids) -> tuple[list, list[int]]:
+    """Rows of ``model`` for ``ids`` in request order (each id once) and the ids not found."""
+    wanted = list(dict.fromkeys(ids))
+    found = {}
+    for start in range(0, len(wanted), CHUNK_SIZE):
+        chunk = wanted[start:start + CHUNK_SIZE]
+        found.update((row.id, row) for row in db.execute(select(model).where(model.id.in_(chunk))).scalars())
+    return [found[i] for i in wanted if i in found], [i for i in wanted if i not in found]
+
+
+def update_many(engine: Engine, table: Table, rows: list[dict]) -> dict:
+    """Apply partial updates keyed by ``id`` to ``table`` in one transaction; bumps ``updated_at``.
+
+    Rows setting the same columns share one statement: an ``UPDATE ... FROM (VALUES ...)``
+    per chunk on PostgreSQL, one executemany ``UPDATE ... WHERE id = ?`` elsewhere.
+    Ids that do not exist are skipped and reported.
+    """
+    rows = [row for row in rows if len(row) > 1]
+    ids = [row["id"] for row in rows]
+    now = datetime.now(timezone.utc)
+    groups = defaultdict(list)
+    with engine.begin() as conn:
+        existing = set()
+        for start in range(0, len(ids), CHUNK_SIZE):
+            existing.update(conn.execute(select(table.c.id).where(table.c.id.in_(ids[start:start + CHUNK_SIZE]))).scalars())
+        for row in rows:
+            if row["id"] in existing:
+                groups[tuple(sorted(key for key in row if key != "id"))].append(row)
+        for columns, group in groups.items():
+            if conn.dialect.name == "postgresql":
+                for start in range(0, len(group), CHUNK_SIZE):
+                    conn.execute(_update_from_values(table, columns, group[start:start + CHUNK_SIZE], now))
+            else:
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("_id"))
+                    .values({**{c: bindparam(c) for c in columns}, "updated_at": now})
+                )
+                conn.execute(stmt, [{**{c: row[c] for c in columns}, "_id": row["id"]} for row in group])
+    return {
+        "requested": len(ids),
+        "updated": sum(len(group) for group in groups.values()),
+        "missing": [i for i in ids if i not in existing],
+    }
+
+
+def _update_from_values(table: Table, columns: tuple, rows: list[dict], now: datetime):
+    data = values(*(column(c, table.c[c].type) for c in ("id", *columns)), name="v").data(
+        [tuple(row[c] for c in ("id", *columns)) for row in rows]
+    )
+    # NULLs in a VALUES list have no type of their own, so every column is cast back to the target type.
+    return (
+        update(table)
+        .where(table.c.id == data.c.id)
+        .values({**{c: cast(data.c[c], table.c[c].type) for c in columns}, "updated_at": now})
+    )
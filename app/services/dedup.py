@@ -0,0 +1,217 @@
+"""Find and merge near-duplicate delivery points.
+
+Candidate pairs come from two blocking passes, never from comparing every point
+with every other:
+
+- spatial: points within ``radius_m`` of each other (``close_pairs``, spatial hashing);
+- address: points in the same (country, zip) block, or (country, city) without a
+  zip, whose normalized addresses are equal, which catches duplicates
+  geocoded far apart or not at all.
+
+A candidate pair from either pass counts as a duplicate when the token overlap
+(Jaccard) of its normalized name + address reaches ``min_similarity``. Pairs are joined into
+clusters (union-find); each cluster keeps a geocoded point with the most client
+links (then the lowest id) as canonical. ``merge_duplicates`` re-points the links of
+the other points to the canonical one and deletes them, set-based and in chunks.
+"""
+
+import re
+import time
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.engine import Engine
+
+from app.models.clients import client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.models.travel_times import TravelTime
+from app.travel_times_subsystem.geometry import close_pairs
+
+DEFAULT_RADIUS_M = 50.0
+DEFAULT_MIN_SIMILARITY = 0.5
+CHUNK_SIZE = 500
+
+# Street-type abbreviations (Portuguese and English) spelled out, so "Av." and "Avenida" match.
+ABBREVIATIONS = {
+    "r": "rua", "av": "avenida", "avda": "avenida", "tv": "travessa", "trav": "travessa", "lg": "largo",
+    "pc": "praca", "pca": "praca", "estr": "estrada", "est": "estrada", "al": "alameda", "cc": "calcada",
+    "st": "street", "str": "street", "rd": "road", "ave": "avenue", "blvd": "boulevard", "ln": "lane",
+    "dr": "drive", "sq": "square", "n": "", "no": "", "nr": "", "num": "",
+}
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text: str | None) -> str:
+    """Lowercase ASCII words with accents, punctuation and street-type abbreviations normalized."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    words = (ABBREVIATIONS.get(word, word) for word in _NON_WORD.split(text))
+    return " ".join(word for word in words if word)
+
+
+def _tokens(*parts: str | None) -> frozenset[str]:
+    return frozenset(" ".join(normalize_text(p) for p in parts).split())
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard overlap of two token sets (0 when both are empty)."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def _block(country: str | None, zip_code: str | None, city: str | None) -> tuple | None:
+    zip_code = "".join(ch for ch in (zip_code or "") if ch.isalnum()).upper()
+    if zip_code:
+        return (country or "").upper(), "zip", zip_code
+    city = normalize_text(city)
+    return ((country or "").upper(), "city", city) if city else None
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, a: int) -> int:
+        while self.parent[a] != a:
+            self.parent[a] = self.parent[self.parent[a]]
+            a = self.parent[a]
+        return a
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def find_duplicates(engine: Engine, radius_m: float = DEFAULT_RADIUS_M, min_similarity: float = DEFAULT_MIN_SIMILARITY) -> dict:
+    """Clusters of likely duplicate delivery points, largest first.
+
+    Two set-based reads: the points, and link counts per point.
+    """
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(DeliveryPoint.id, DeliveryPoint.name, DeliveryPoint.address, DeliveryPoint.city,
+                   DeliveryPoint.zip, DeliveryPoint.country, DeliveryPoint.latitude, DeliveryPoint.longitude)
+            .order_by(DeliveryPoint.id)
+        ).all()
+        link_counts = dict(conn.execute(
+            select(client_delivery_points.c.delivery_point_id, func.count())
+            .group_by(client_delivery_points.c.delivery_point_id)
+        ).all())
+
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    tokens = [_tokens(row.name, row.address) for row in rows]
+    union = _UnionFind(len(rows))
+    distances: dict[tuple[int, int], float] = {}
+    candidates = 0
+
+    coords = np.array([(row.latitude, row.longitude) for row in rows], dtype=np.float64).reshape(-1, 2)
+    located = np.flatnonzero(~np.isnan(coords).any(axis=1))
+    located_set = set(located.tolist())
+    first, second, distance = close_pairs(coords[located], radius_m)
+    candidates += first.size
+    for a, b, d in zip(located[first].tolist(), located[second].tolist(), distance.tolist()):
+        if similarity(tokens[a], tokens[b]) >= min_similarity:
+            union.union(a, b)
+            distances[(a, b)] = d
+
+    blocks = defaultdict(list)
+    for k, row in enumerate(rows):
+        address = normalize_text(row.address)
+        block = _block(row.country, row.zip, row.city)
+        if address and block is not None:
+            blocks[(block, address)].append(k)
+    for members in blocks.values():
+        candidates += len(members) * (len(members) - 1) // 2
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                # Tenants of one building share an address; only similar names make a duplicate.
+                if similarity(tokens[a], tokens[b]) >= min_similarity:
+                    union.union(a, b)
+
+    groups = defaultdict(list)
+    for k in range(len(rows)):
+        groups[union.find(k)].append(k)
+    spread = defaultdict(float)
+    for (a, _), d in distances.items():
+        spread[union.find(a)] = max(spread[union.find(a)], d)
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        canonical = max(members, key=lambda k: (k in located_set, link_counts.get(int(ids[k]), 0), -ids[k]))
+        clusters.append({
+            "canonical_id": int(ids[canonical]),
+            "duplicate_ids": sorted(int(ids[k]) for k in members if k != canonical),
+            "names": [rows[k].name for k in sorted(members)],
+            "max_distance_m": spread.get(root),
+        })
+    clusters.sort(key=lambda c: (-len(c["duplicate_ids"]), c["canonical_id"]))
+    return {
+        "points": len(rows),
+        "candidate_pairs": int(candidates),
+        "duplicates": sum(len(c["duplicate_ids"]) for c in clusters),
+        "clusters": clusters,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _chunks(values: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def merge_duplicates(engine: Engine, merges: list[tuple[int, list[int]]]) -> dict:
+    """Fold each ``(canonical_id, duplicate_ids)`` into its canonical point, in one transaction.
+
+    Client links of the duplicates are re-pointed to the canonical point (skipping
+    links it already has), then the duplicates, their links and cached travel times
+    are deleted. Raises ValueError on overlapping merges and KeyError on unknown ids.
+    """
+    canonicals = {canonical for canonical, _ in merges}
+    target: dict[int, int] = {}
+    for canonical, duplicates in merges:
+        for duplicate in duplicates:
+            if duplicate in target or duplicate in canonicals:
+                raise ValueError(f"Delivery point {duplicate} appears in more than one merge.")
+            target[duplicate] = canonical
+    wanted = sorted(set(target) | canonicals)
+    duplicate_ids = sorted(target)
+
+    with engine.begin() as conn:
+        found = set()
+        for chunk in _chunks(wanted):
+            found.update(conn.execute(select(DeliveryPoint.id).where(DeliveryPoint.id.in_(chunk))).scalars())
+        missing = sorted(set(wanted) - found)
+        if missing:
+            raise KeyError(f"Delivery points not found: {missing}")
+
+        cdp = client_delivery_points
+        moved = set()
+        for chunk in _chunks(duplicate_ids):
+            for client_id, point_id in conn.execute(
+                select(cdp.c.client_id, cdp.c.delivery_point_id).where(cdp.c.delivery_point_id.in_(chunk))
+            ):
+                moved.add((client_id, target[point_id]))
+        existing = set()
+        for chunk in _chunks(sorted(canonicals)):
+            existing.update(
+                (client_id, point_id)
+                for client_id, point_id in conn.execute(
+                    select(cdp.c.client_id, cdp.c.delivery_point_id).where(cdp.c.delivery_point_id.in_(chunk))
+                )
+            )
+        new_links = [{"client_id": c, "delivery_point_id": p} for c, p in sorted(moved - existing)]
+        if new_links:
+            conn.execute(insert(cdp), new_links)
+
+        deleted = 0
+        for chunk in _chunks(duplicate_ids):
+            conn.execute(delete(cdp).where(cdp.c.delivery_point_id.in_(chunk)))
+            conn.execute(delete(TravelTime).where(or_(TravelTime.origin_id.in_(chunk), TravelTime.destination_id.in_(chunk))))
+            deleted += conn.execute(delete(DeliveryPoint).where(DeliveryPoint.id.in_(chunk))).rowcount
+    return {"merged": deleted, "links_added": len(new_links)}
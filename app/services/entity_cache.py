@@ -0,0 +1,240 @@
+"""Read-through cache of serialized entity responses, per API process.
+
+Hot single-entity reads (a client, a delivery point) and their relationship
+listings change rarely, so their JSON bodies are kept in a bounded LRU with a
+TTL, keyed by ``(namespace, id)``. Routes that write drop the affected keys (or a
+whole namespace when the affected ids are not known up front) right away, and
+publish the invalidation on a bus so the other API processes and the workers'
+writes reach every copy:
+
+- ``LocalBus``: in-process stand-in, enough for a single API process;
+- ``RedisBus``: Redis pub/sub on one channel, for several processes.
+
+A message lost on the way (Redis restart) can leave an entry stale for at most
+the TTL; a dropped subscription clears the local cache. A load that races with
+an invalidation is not stored, so a reader never puts back a row it read before
+the write committed.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "where2now:entity-cache"
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def serialize(schema, value) -> bytes:
+    """JSON body of ``value`` (ORM objects or a list of them) as response ``schema`` renders it."""
+    adapter = _adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+class LocalBus:
+    """In-process stand-in for the pub/sub channel: publishing calls every subscriber directly."""
+
+    def __init__(self):
+        self.subscribers: list[Callable[[dict], None]] = []
+
+    def publish(self, message: dict):
+        for callback in list(self.subscribers):
+            callback(message)
+
+    def subscribe(self, callback: Callable[[dict], None], on_error: Callable[[], None] | None = None):
+        self.subscribers.append(callback)
+
+
+class RedisBus:
+    """Invalidations over Redis pub/sub; subscribing starts a listener thread."""
+
+    def __init__(self, redis, channel: str = CHANNEL):
+        self.redis = redis
+        self.channel = channel
+        self._thread = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBus":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def publish(self, message: dict):
+        try:
+            self.redis.publish(self.channel, json.dumps(message))
+        except Exception:
+            # The write itself succeeded; other processes catch up within the TTL.
+            logger.warning("Could not publish cache invalidation", exc_info=True)
+
+    def subscribe(self, callback: Callable[[dict], None], on_error: Callable[[], None] | None = None):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: lambda raw: callback(json.loads(raw["data"]))})
+
+        def handle_error(exc, pubsub, thread):
+            # Messages may have been missed while disconnected.
+            logger.warning("Cache invalidation subscription failed: %s", exc)
+            if on_error is not None:
+                on_error()
+            time.sleep(1.0)
+
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=handle_error)
+
+
+class EntityCache:
+    """Bounded LRU of serialized responses with a TTL, hit/miss counters and bus invalidation.
+
+    With ``enabled=False`` every read goes to the loader and nothing is stored;
+    invalidations are still published for the processes that do cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 60.0,
+        bus=None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.clock = clock
+        self.bus = LocalBus() if bus is None else bus
+        self.origin = uuid.uuid4().hex
+        self._entries: OrderedDict[tuple[str, Any], tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits: dict[str, int] = {}
+        self._misses: dict[str, int] = {}
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.bus.subscribe(self._on_message, on_error=self.clear_local)
+
+    def get_or_load(self, namespace: str, key, load: Callable[[], bytes | None]) -> bytes | None:
+        """Cached body for ``(namespace, key)``, or ``load()`` stored on the way out; None (not found) is not cached."""
+        if not self.enabled:
+            return load()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end((namespace, key))
+                self._hits[namespace] = self._hits.get(namespace, 0) + 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[(namespace, key)]
+                self.expirations += 1
+            self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            generation = self._generation
+        value = load()
+        if value is None:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                self._entries[(namespace, key)] = (self.clock() + self.ttl_seconds, value)
+                self._entries.move_to_end((namespace, key))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, namespace: str, keys=None):
+        """Drop ``keys`` of ``namespace`` (all of it if None) here and in every subscribed process."""
+        keys = None if keys is None else list(keys)
+        self._drop(namespace, keys)
+        self.bus.publish({"origin": self.origin, "namespace": namespace, "keys": keys})
+
+    def clear(self):
+        """Drop every entry here and in every subscribed process."""
+        self.clear_local()
+        self.bus.publish({"origin": self.origin, "namespace": None, "keys": None})
+
+    def clear_local(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def _drop(self, namespace: str | None, keys: list | None):
+        if namespace is None:
+            self.clear_local()
+            return
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if keys is None:
+                for entry_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[entry_key]
+            else:
+                for key in keys:
+                    self._entries.pop((namespace, key), None)
+
+    def _on_message(self, message: dict):
+        if message.get("origin") != self.origin:
+            self._drop(message.get("namespace"), message.get("keys"))
+
+    def stats(self) -> dict:
+        """Size, hit ratios (overall and per namespace) and eviction/expiry counters."""
+        with self._lock:
+            namespaces = sorted(set(self._hits) | set(self._misses))
+            per_namespace = {
+                ns: _ratio(self._hits.get(ns, 0), self._misses.get(ns, 0)) for ns in namespaces
+            }
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                **_ratio(sum(self._hits.values()), sum(self._misses.values())),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "namespaces": per_namespace,
+            }
+
+
+def _ratio(hits: int, misses: int) -> dict:
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+
+_cache: EntityCache | None = None
+_lock = threading.Lock()
+
+
+def _bus():
+    return RedisBus.from_url(settings.entity_cache_pubsub_url) if settings.entity_cache_pubsub_url else LocalBus()
+
+
+def entity_cache() -> EntityCache:
+    """This process's cache, built from settings on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = EntityCache(
+                max_entries=settings.entity_cache_max_entries,
+                ttl_seconds=settings.entity_cache_ttl_seconds,
+                bus=_bus(),
+                enabled=settings.entity_cache_enabled,
+            )
+        return _cache
+
+
+def publish_clear():
+    """Tell every API process to drop its cache; for writes made outside the API (worker tasks)."""
+    if settings.entity_cache_pubsub_url:
+        RedisBus.from_url(settings.entity_cache_pubsub_url).publish({"origin": None, "namespace": None, "keys": None})
@@ -0,0 +1,106 @@
+"""Score candidate routes (lists of delivery point ids) against cached travel times.
+
+Loads every point the routes touch in one query, builds the duration and
+distance matrices over those points once, and evaluates all routes in one batch
+(``app/solver/evaluation.py``), so a dispatcher's edited plan and a solver plan
+can be compared on the same numbers.
+"""
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from app.models.travel_times import BUCKET_SECONDS
+from app.services.problem_loader import DEFAULT_WINDOW, load_problem
+from app.solver.evaluation import evaluate_routes, pad_routes
+from app.solver.problem import RoutingInstance
+from app.travel_times_subsystem.service import TravelTimeService
+
+
+def _violations(evaluation, k: int, ids: np.ndarray, padded: np.ndarray) -> list[dict]:
+    found = []
+    stops = padded[k, : evaluation.lengths[k]]
+    for position in np.flatnonzero(evaluation.lateness[k, : stops.size] > 0):
+        found.append({"type": "time_window", "delivery_point_id": int(ids[stops[position]]),
+                      "amount": float(evaluation.lateness[k, position])})
+    if evaluation.return_lateness[k] > 0:
+        found.append({"type": "return_late", "delivery_point_id": None, "amount": float(evaluation.return_lateness[k])})
+    if evaluation.capacity_excess[k] > 0:
+        found.append({"type": "capacity", "delivery_point_id": None, "amount": float(evaluation.capacity_excess[k])})
+    nodes, counts = np.unique(stops, return_counts=True)
+    for node in nodes[(counts > 1) | (nodes == 0)]:
+        found.append({"type": "repeated_stop", "delivery_point_id": int(ids[node]), "amount": None})
+    return found
+
+
+def evaluate_plan(engine: Engine, depot_id: int, routes: list[list[int]], params: dict, travel_times: TravelTimeService) -> dict:
+    """Totals, per-stop ETAs, load profiles and violations for each route in ``routes``.
+
+    ``params`` carries ``travel_times`` (mode), ``time_bucket``, ``vehicle_capacity``
+    and ``start_time_s`` (departure from the depot; default: start of ``time_bucket``).
+    Raises KeyError on unknown delivery point ids and ValueError on missing coordinates.
+    """
+    wanted = np.unique(np.array([depot_id, *(dp for route in routes for dp in route)], dtype=np.int64))
+    problem = load_problem(engine, delivery_point_ids=wanted.tolist())
+    problem.index_of(wanted)
+    depot = int(problem.index_of([depot_id])[0])
+    # Node 0 is the depot; the other points keep their id order.
+    order = np.concatenate(([depot], np.delete(np.arange(problem.size), depot)))
+    node_of = np.empty_like(order)
+    node_of[order] = np.arange(order.size)
+    ids = problem.ids[order]
+    if problem.missing_coords.size:
+        raise ValueError(f"Delivery points without coordinates: {problem.missing_coords.tolist()}")
+    coords = problem.coords[order]
+    bucket = params.get("time_bucket", 32)
+    mode = params.get("travel_times", "cached")
+
+    demands = problem.demands[order].copy()
+    demands[0] = 0.0
+    windows = problem.windows[order].copy()
+    windows[0] = DEFAULT_WINDOW
+    instance = RoutingInstance(
+        name="evaluation",
+        durations=travel_times.matrix(ids, coords, bucket, mode=mode),
+        demands=demands,
+        windows=windows,
+        service_times=np.zeros(ids.shape[0]),
+        capacity=float(params.get("vehicle_capacity") or np.inf),
+        coords=coords,
+    )
+    padded = pad_routes([node_of[problem.index_of(route)] for route in routes])
+    start = params.get("start_time_s")
+    evaluation = evaluate_routes(
+        instance,
+        padded,
+        start_times=bucket * BUCKET_SECONDS if start is None else start,
+        distances=travel_times.distance_matrix(ids, coords, bucket, mode=mode),
+    )
+
+    results = []
+    for k, route in enumerate(routes):
+        size = len(route)
+        violations = _violations(evaluation, k, ids, padded)
+        results.append({
+            "delivery_point_ids": list(route),
+            "travel_s": float(evaluation.travel[k]),
+            "duration_s": float(evaluation.durations[k]),
+            "wait_s": float(evaluation.wait[k]),
+            "distance_m": float(evaluation.distance[k]),
+            "departure_s": float(evaluation.departures[k]),
+            "return_s": float(evaluation.returns[k]),
+            "etas_s": evaluation.starts[k, :size].tolist(),
+            "arrivals_s": evaluation.arrivals[k, :size].tolist(),
+            "loads": evaluation.loads[k, :size].tolist(),
+            "feasible": not violations,
+            "violations": violations,
+        })
+    return {
+        "routes": results,
+        "totals": {
+            "routes": len(routes),
+            "stops": int(evaluation.lengths.sum()),
+            "travel_s": float(evaluation.travel.sum()),
+            "distance_m": float(evaluation.distance.sum()),
+            "feasible_routes": sum(r["feasible"] for r in results),
+        },
+    }
@@ -0,0 +1,191 @@
+"""Columnar bulk export of tables (Arrow IPC / Parquet).
+
+Rows are read with Core selects on a server-side cursor and turned into Arrow
+record batches chunk by chunk, so no ORM objects are built and memory stays
+bounded by the chunk size.
+"""
+
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String, Table, select
+from sqlalchemy.engine import Connection
+
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: pip install "where2now[export]"
+    pa = None
+    pq = None
+
+EXPORT_TABLES: dict[str, Table] = {
+    "delivery_points": DeliveryPoint.__table__,
+    "clients": Client.__table__,
+    "client_delivery_points": client_delivery_points,
+}
+EXPORT_FORMATS = ("arrow", "parquet")
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown table, column, filter or format)."""
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('pyarrow is required for exports: pip install "where2now[export]"')
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC") if column.type.timezone else pa.timestamp("us")
+    if isinstance(column.type, String):
+        return pa.string()
+    raise ExportError(f"Column {column.name!r} has no Arrow mapping.")
+
+
+def _coerce(column, raw: str):
+    """Convert a filter value from the query string to the column's Python type."""
+    try:
+        if isinstance(column.type, Integer):
+            return int(raw)
+        if isinstance(column.type, Float):
+            return float(raw)
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ExportError(f"Invalid value for {column.name!r}: {raw!r}.") from None
+    return raw
+
+
+def parse_filters(items: list[str]) -> dict[str, str]:
+    """Parse ``column=value`` strings into a dict."""
+    filters = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ExportError(f"Invalid filter {item!r}; expected column=value.")
+        filters[key.strip()] = value.strip()
+    return filters
+
+
+def build_export_query(table_name: str, columns: list[str] | None = None, filters: dict[str, str] | None = None):
+    """Return ``(select, arrow_schema)`` for a projected, filtered table export."""
+    _require_pyarrow()
+    table = EXPORT_TABLES.get(table_name)
+    if table is None:
+        raise ExportError(f"Unknown table {table_name!r}; expected one of {sorted(EXPORT_TABLES)}.")
+
+    names = columns or [c.name for c in table.columns]
+    unknown = [name for name in names if name not in table.c]
+    unknown += [name for name in (filters or {}) if name not in table.c]
+    if unknown:
+        raise ExportError(f"Unknown columns for {table_name}: {sorted(set(unknown))}.")
+
+    selected = [table.c[name] for name in names]
+    stmt = select(*selected)
+    for name, raw in (filters or {}).items():
+        column = table.c[name]
+        stmt = stmt.where(column == _coerce(column, raw))
+    # Stable order so chunked exports are reproducible.
+    stmt = stmt.order_by(*table.primary_key.columns)
+
+    schema = pa.schema([pa.field(c.name, _arrow_type(c), nullable=c.nullable) for c in selected])
+    return stmt, schema
+
+
+def iter_record_batches(conn: Connection, stmt, schema, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator["pa.RecordBatch"]:
+    """Stream ``stmt`` through a server-side cursor as Arrow record batches."""
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    for rows in result.partitions(chunk_size):
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+class _ChunkSink:
+    """Write-only file object that hands out whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def encode_batches(batches: Iterator["pa.RecordBatch"], schema, fmt: str) -> Iterator[bytes]:
+    """Encode record batches as an Arrow IPC stream or Parquet file, yielding bytes per chunk.
+
+    For Parquet every batch becomes one row group.
+    """
+    _require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format {fmt!r}; expected one of {list(EXPORT_FORMATS)}.")
+
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode="w")
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(stream, schema)
+        write = writer.write_batch
+    else:
+        writer = pq.ParquetWriter(stream, schema)
+        write = lambda batch: writer.write_batch(batch, row_group_size=batch.num_rows)  # noqa: E731
+
+    try:
+        for batch in batches:
+            write(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(
+    engine,
+    table_name: str,
+    fmt: str = "arrow",
+    columns: list[str] | None = None,
+    filters: dict[str, str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Validate the request, then return an iterator of encoded export bytes.
+
+    Validation happens eagerly so callers can report errors before streaming starts.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format {fmt!r}; expected one of {list(EXPORT_FORMATS)}.")
+    stmt, schema = build_export_query(table_name, columns, filters)
+
+    def generate():
+        with engine.connect() as conn:
+            yield from encode_batches(iter_record_batches(conn, stmt, schema, chunk_size), schema, fmt)
+
+    return generate()
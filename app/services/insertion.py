@@ -0,0 +1,81 @@
+"""Add same-day stops to a stored solution without re-solving.
+
+Builds a routing instance over the plan's stops plus the new ones in which only
+the legs the insertion kernel reads are filled: existing route legs and every
+row/column of the new stops. For a 1k-stop plan and a handful of new stops that
+is a few thousand entries instead of a million.
+"""
+
+import time
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from app.services.problem_loader import DEFAULT_WINDOW, load_problem
+from app.solver.evaluation import DEPOT, route_cost
+from app.solver.insertion import insert_stops
+from app.solver.problem import RoutingInstance
+from app.travel_times_subsystem.service import TravelTimeService
+
+
+def insert_into_solution(engine: Engine, params: dict, result: dict, new_ids, travel_times: TravelTimeService) -> dict:
+    """New job result with ``new_ids`` inserted into the routes of ``result`` (a finished solve's result)."""
+    started = time.perf_counter()
+    depot_id = result["depot_id"]
+    routed = [dp for route in result["routes"] for dp in route]
+    new_ids = list(dict.fromkeys(new_ids))
+    already = sorted(set(new_ids) & set(routed + [depot_id]))
+    if already:
+        raise ValueError(f"Delivery points already in the plan: {already}")
+
+    node_ids = np.array([depot_id, *routed, *new_ids], dtype=np.int64)
+    problem = load_problem(engine, delivery_point_ids=node_ids.tolist())
+    order = problem.index_of(node_ids)
+    if problem.missing_coords.size:
+        raise ValueError(f"Delivery points without coordinates: {problem.missing_coords.tolist()}")
+    coords = problem.coords[order]
+    bucket = params.get("time_bucket", 32)
+    mode = params.get("travel_times", "cached")
+
+    n, n_old = node_ids.size, 1 + len(routed)
+    routes, start = [], 1
+    for route in result["routes"]:
+        routes.append(np.arange(start, start + len(route)))
+        start += len(route)
+    new_nodes = np.arange(n_old, n)
+
+    durations = np.full((n, n), np.nan)
+    np.fill_diagonal(durations, 0.0)
+    legs = [np.concatenate(([DEPOT], r, [DEPOT])) for r in routes]
+    if legs:
+        origins = np.concatenate([p[:-1] for p in legs])
+        destinations = np.concatenate([p[1:] for p in legs])
+        durations[origins, destinations] = travel_times.pairs(
+            node_ids[origins], coords[origins], node_ids[destinations], coords[destinations], bucket, mode
+        )
+    durations[n_old:, :] = travel_times.block(node_ids[n_old:], coords[n_old:], node_ids, coords, bucket, mode)
+    durations[:, n_old:] = travel_times.block(node_ids, coords, node_ids[n_old:], coords[n_old:], bucket, mode)
+
+    demands = problem.demands[order].copy()
+    demands[DEPOT] = 0.0
+    windows = problem.windows[order].copy()
+    windows[DEPOT] = DEFAULT_WINDOW
+    instance = RoutingInstance(
+        name="insertion",
+        durations=durations,
+        demands=demands,
+        windows=windows,
+        service_times=np.zeros(n),
+        capacity=float(params.get("vehicle_capacity") or np.inf),
+        coords=coords,
+    )
+    routes, opened = insert_stops(instance, routes, new_nodes)
+    return {
+        "objective": sum(route_cost(durations, r) for r in routes),
+        "n_routes": len(routes),
+        "depot_id": depot_id,
+        "routes": [node_ids[r].tolist() for r in routes],
+        "inserted": new_ids,
+        "new_route_ids": node_ids[opened].tolist(),
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,259 @@
+"""Run solve jobs: load the problem, build travel times, solve, store the result on the job.
+
+``scenarios`` jobs build the problem and matrix once and solve every scenario
+on them (``app/solver/scenarios.py``). Each job records the seconds spent per
+phase (load, matrix, build, solve, postprocess) in ``Job.phases``.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.jobs import Job
+from app.services.problem_loader import DEFAULT_WINDOW, load_problem
+from app.services.timing import PhaseTimer, timed
+from app.solver.checkpoint import Checkpointer
+from app.solver.evaluation import route_cost
+from app.solver.presolve import DEFAULT_MERGE_SECONDS, presolve
+from app.solver.problem import RoutingInstance
+from app.solver.scenarios import solve_scenarios
+from app.solver.shared import parallel_available
+from app.solver.solver import solve
+from app.travel_times_subsystem.service import TravelTimeService
+
+
+def build_instance(
+    engine: Engine,
+    client_id: int,
+    params: dict,
+    travel_times: TravelTimeService | None = None,
+    timer: PhaseTimer | None = None,
+):
+    """Routing instance for a job's params, with the depot as node 0.
+
+    Returns ``(instance, ids)`` where ``ids[i]`` is the delivery point id of node ``i``.
+    """
+    depot_id = params["depot_id"]
+    with timed(timer, "load"):
+        if params.get("delivery_point_ids"):
+            problem = load_problem(engine, delivery_point_ids=[depot_id, *params["delivery_point_ids"]])
+        else:
+            problem = load_problem(engine, client_ids=[client_id], delivery_point_ids=[depot_id])
+    if problem.missing_coords.size:
+        raise ValueError(f"Delivery points without coordinates: {problem.missing_coords.tolist()}")
+
+    depot = int(problem.index_of([depot_id])[0])
+    order = np.concatenate(([depot], np.delete(np.arange(problem.size), depot)))
+    ids = problem.ids[order]
+    coords = problem.coords[order]
+    travel_times = travel_times or TravelTimeService(engine)
+    with timed(timer, "matrix"):
+        durations = travel_times.matrix(ids, coords, params.get("time_bucket", 32), mode=params.get("travel_times", "cached"))
+
+    with timed(timer, "build"):
+        demands = problem.demands[order].copy()
+        demands[0] = 0.0
+        windows = problem.windows[order].copy()
+        windows[0] = DEFAULT_WINDOW
+        capacity = params.get("vehicle_capacity") or np.inf
+        instance = RoutingInstance(
+            name=f"client-{client_id}",
+            durations=durations,
+            demands=demands,
+            windows=windows,
+            service_times=np.zeros(ids.shape[0]),
+            capacity=float(capacity),
+            coords=coords,
+        )
+    return instance, ids
+
+
+def checkpoint_path(job_id: int) -> Path:
+    return Path(settings.checkpoint_dir) / f"job-{job_id}.npz"
+
+
+def solver_options(params: dict, checkpoint: Checkpointer | None = None) -> dict:
+    """ALNS options from job params; other modes take none."""
+    if params.get("mode") != "alns":
+        return {}
+    return {
+        "iterations": params.get("iterations", 300),
+        "workers": params.get("workers") or settings.solver_workers or os.cpu_count() or 1,
+        "time_limit": params.get("time_limit_s"),
+        "seed": params.get("seed", 0),
+        "checkpoint": checkpoint,
+    }
+
+
+def scenario_result(instance: RoutingInstance, ids: np.ndarray, params: dict, timer: PhaseTimer | None = None) -> dict:
+    """Solve a scenario batch's variants on ``instance`` and compare them side by side.
+
+    ``parallel`` in the result is false when the scenarios were solved one after another in this process.
+    """
+    defaults = {"mode": params.get("mode", "local_search"), "iterations": params.get("iterations", 300), "seed": params.get("seed", 0)}
+    scenarios = []
+    for scenario in params["scenarios"]:
+        overrides = {key: value for key, value in scenario.items() if value is not None}
+        capacity = overrides.pop("vehicle_capacity", None)
+        scenarios.append({**defaults, **overrides, "capacity": capacity})
+    workers = params.get("workers") or settings.solver_workers or os.cpu_count() or 1
+    merge_seconds = params.get("merge_seconds", DEFAULT_MERGE_SECONDS) if params.get("presolve", True) else None
+    with timed(timer, "solve"):
+        solved = solve_scenarios(instance, scenarios, workers, merge_seconds)
+    with timed(timer, "postprocess"):
+        return {**_compare_scenarios(instance, ids, params, solved), "parallel": parallel_available(min(workers, len(scenarios)))}
+
+
+def _compare_scenarios(instance: RoutingInstance, ids: np.ndarray, params: dict, solved: list[dict]) -> dict:
+    results = [
+        {
+            **params["scenarios"][k],
+            "objective": result["objective"],
+            "n_routes": len(result["routes"]),
+            "served": int(sum(len(route) for route in result["routes"])),
+            "unserved": ids[result["unserved"]].tolist(),
+            "seconds": result["seconds"],
+            "routes": [ids[route].tolist() for route in result["routes"]],
+            "presolve": result["presolve"],
+        }
+        for k, result in enumerate(solved)
+    ]
+    complete = [r for r in results if not r["unserved"]]
+    return {
+        "depot_id": int(ids[0]),
+        "stops": int(instance.size - 1),
+        "scenarios": results,
+        "best": min(complete, key=lambda r: r["objective"])["name"] if complete else None,
+    }
+
+
+def solve_result(
+    instance: RoutingInstance,
+    ids: np.ndarray,
+    params: dict,
+    checkpoint_file: Path | None = None,
+    timer: PhaseTimer | None = None,
+    heartbeat: Callable[[], None] | None = None,
+) -> dict:
+    """Solve ``instance`` (pre-solved unless disabled) and report routes as delivery point ids.
+
+    ALNS solves checkpoint to ``checkpoint_file`` and resume from it when it exists;
+    ``heartbeat`` is called after each checkpoint. Presolve counts towards the "build" phase.
+    """
+    reduced = None
+    with timed(timer, "build"):
+        if params.get("presolve", True):
+            reduced = presolve(instance, params.get("merge_seconds", DEFAULT_MERGE_SECONDS))
+        model = instance if reduced is None else reduced.instance
+        checkpoint = None
+        if checkpoint_file is not None and params.get("mode") == "alns":
+            checkpoint = Checkpointer(checkpoint_file, model, settings.checkpoint_interval_s, on_save=heartbeat)
+    with timed(timer, "solve"):
+        solution = solve(model, params.get("mode", "local_search"), **solver_options(params, checkpoint))
+    with timed(timer, "postprocess"):
+        routes = solution.routes if reduced is None else reduced.expand(solution.routes)
+        return {
+            "objective": sum(route_cost(instance.durations, route) for route in routes),
+            "n_routes": len(routes),
+            "depot_id": int(ids[0]),
+            "routes": [ids[route].tolist() for route in routes],
+            "stats": solution.stats,
+            "presolve": None if reduced is None else reduced.report,
+        }
+
+
+def claim_job(engine: Engine, job_id: int, resume: bool = False, lease_seconds: float | None = None) -> bool:
+    """Atomically move a job from queued to running; False if another worker already took it.
+
+    With ``resume`` a running job is taken over as well, but only once its lease
+    (``updated_at``, renewed by ``renew_lease``) is older than ``lease_seconds``
+    (default ``settings.job_lease_seconds``): its worker died. A job another worker
+    is still solving is left alone.
+    """
+    now = datetime.now(timezone.utc)
+    claimable = Job.status == "queued"
+    if resume:
+        lease_seconds = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+        expired = and_(Job.status == "running", Job.updated_at < now - timedelta(seconds=lease_seconds))
+        claimable = or_(claimable, expired)
+    with engine.begin() as conn:
+        result = conn.execute(
+            update(Job).where(Job.id == job_id, claimable).values(status="running", started_at=now, updated_at=now)
+        )
+    return result.rowcount == 1
+
+
+def renew_lease(engine: Engine, job_id: int):
+    """Mark a running job as still being worked on, so redelivered copies of its task leave it alone."""
+    with engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id, Job.status == "running").values(updated_at=datetime.now(timezone.utc)))
+
+
+def lease_remaining(engine: Engine, job_id: int, lease_seconds: float | None = None) -> float | None:
+    """Seconds until a running job's lease expires (0 once it has); None when the job is not running."""
+    lease_seconds = settings.job_lease_seconds if lease_seconds is None else lease_seconds
+    with engine.connect() as conn:
+        row = conn.execute(select(Job.status, Job.updated_at).where(Job.id == job_id)).first()
+    if row is None or row.status != "running":
+        return None
+    renewed = row.updated_at if row.updated_at.tzinfo else row.updated_at.replace(tzinfo=timezone.utc)
+    return max(0.0, lease_seconds - (datetime.now(timezone.utc) - renewed).total_seconds())
+
+
+def run_solve_job(engine: Engine, job_id: int, travel_times=None, resume: bool = False) -> Job | None:
+    """Execute a queued solve (or scenario batch) job and record its result (or error) on the job row.
+
+    Returns None when the job was already claimed by another worker. ``travel_times``
+    is anything with ``TravelTimeService.matrix``'s interface (e.g. a worker's resident data).
+    ``resume`` is for redelivered tasks: the job is taken over even if marked running,
+    once its lease has expired, and an ALNS solve continues from its last checkpoint. Errors other than invalid
+    parameters are recorded on the job too, then re-raised.
+    """
+    if not claim_job(engine, job_id, resume):
+        return None
+    with Session(engine, expire_on_commit=False) as db:
+        job = db.get(Job, job_id)
+        checkpoint_file = checkpoint_path(job.id) if job.kind == "solve" else None
+        timer = PhaseTimer()
+        unexpected = None
+        try:
+            started = time.perf_counter()
+            instance, ids = build_instance(engine, job.client_id, job.params, travel_times, timer)
+            built = time.perf_counter() - started
+            renew_lease(engine, job_id)
+            if job.kind == "scenarios":
+                result = scenario_result(instance, ids, job.params, timer)
+            else:
+                result = solve_result(
+                    instance, ids, job.params, checkpoint_file, timer, heartbeat=lambda: renew_lease(engine, job_id)
+                )
+        except (ValueError, KeyError) as exc:
+            job.status = "failed"
+            job.error = str(exc)
+        except Exception as exc:
+            # Provider, database or pool errors: still finish the job, then let the task fail.
+            db.rollback()
+            job = db.get(Job, job_id)
+            job.status = "failed"
+            job.error = f"{type(exc).__name__}: {exc}"
+            unexpected = exc
+        else:
+            job.status = "succeeded"
+            job.result = {**result, "build_seconds": built, "seconds": time.perf_counter() - started}
+        # Also on failure: shows how far the job got and where the time went.
+        job.phases = timer.report()
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        if checkpoint_file is not None:
+            checkpoint_file.unlink(missing_ok=True)
+        if unexpected is not None:
+            raise unexpected
+        return job
@@ -0,0 +1,235 @@
+"""Off-peak precompute of travel time matrices for clients that solve regularly.
+
+Clients with jobs in the last ``lookback_days`` are "active"; each active client's
+delivery point set (through ``client_delivery_points``) needs a full matrix per
+morning time bucket. Origins whose row is missing or older than ``max_age_days``
+are fetched from the provider for next morning's departure and stored in the
+cache. Matrices are refreshed in order of recent solves per element, so a limited
+element budget warms the most solves. Once a travel time predictor is trained,
+stale rows whose every pair it predicts within ``travel_time_max_relative_error``
+are left to the predictor and not fetched (``predicted_rows``).
+
+Coverage is reported before and after the run: ``expected_warm_solves`` is the
+share of recent solves (per client and bucket) whose whole matrix is cached and
+fresh, i.e. an estimate of how many of tomorrow's solves will not have to fall
+back to approximations.
+
+A provider error on one matrix is logged and counted (``failed``) and the run
+goes on with the next. Pairs the provider has no route for are stored as
+``NO_ROUTE`` markers, so they count as fresh and are not refetched every night.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.models.clients import client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.models.jobs import Job
+from app.models.travel_times import BUCKET_SECONDS, TravelTime
+from app.travel_times_subsystem.cache import store_matrix
+from app.travel_times_subsystem.client import GoogleMapsClient, ProviderError, QuotaExceeded
+from app.travel_times_subsystem.predictor import TravelTimePredictor, load_predictor, uncertain_pairs
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MatrixStatus:
+    """Cache state of one client's matrix in one time bucket; ``stale_rows`` are node indices to refetch."""
+
+    client_id: int
+    time_bucket: int
+    ids: np.ndarray
+    coords: np.ndarray
+    weight: int
+    stale_rows: np.ndarray
+
+    @property
+    def pairs(self) -> int:
+        return self.ids.size * (self.ids.size - 1)
+
+    @property
+    def cost(self) -> int:
+        """Provider elements needed to refresh the stale rows."""
+        return self.stale_rows.size * self.ids.size
+
+    @property
+    def warm(self) -> bool:
+        return self.stale_rows.size == 0
+
+
+def active_clients(engine: Engine, since: datetime) -> dict[int, int]:
+    """Number of jobs per client created since ``since``."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Job.client_id, func.count()).where(Job.created_at >= since).group_by(Job.client_id)
+        ).all()
+    return dict(rows)
+
+
+def client_point_sets(engine: Engine, client_ids) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """Linked delivery point ids and coordinates per client (points without coordinates are left out)."""
+    cdp = client_delivery_points
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(cdp.c.client_id, DeliveryPoint.id, DeliveryPoint.latitude, DeliveryPoint.longitude)
+            .join(DeliveryPoint, DeliveryPoint.id == cdp.c.delivery_point_id)
+            .where(cdp.c.client_id.in_(list(client_ids)))
+            .where(DeliveryPoint.latitude.is_not(None), DeliveryPoint.longitude.is_not(None))
+            .order_by(cdp.c.client_id, DeliveryPoint.id)
+        ).all()
+    sets: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    if rows:
+        data = np.array(rows, dtype=np.float64)
+        clients, starts = np.unique(data[:, 0].astype(np.int64), return_index=True)
+        for client_id, chunk in zip(clients, np.split(data, starts[1:])):
+            sets[int(client_id)] = (chunk[:, 1].astype(np.int64), chunk[:, 2:4])
+    return sets
+
+
+def stale_rows(engine: Engine, ids: np.ndarray, time_bucket: int, fresh_after: datetime) -> np.ndarray:
+    """Node indices whose row (to every other node in ``ids``) is incomplete or older than ``fresh_after``."""
+    if ids.size < 2:
+        return np.empty(0, dtype=np.int64)
+    id_list = ids.tolist()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(TravelTime.origin_id, func.count())
+            .where(TravelTime.origin_id.in_(id_list), TravelTime.destination_id.in_(id_list))
+            .where(TravelTime.time_bucket == time_bucket, TravelTime.observed_at >= fresh_after)
+            .group_by(TravelTime.origin_id)
+        ).all()
+    fresh = np.zeros(ids.size, dtype=np.int64)
+    if rows:
+        origins, counts = (np.array(col, dtype=np.int64) for col in zip(*rows))
+        fresh[np.searchsorted(ids, origins)] = counts
+    return np.flatnonzero(fresh < ids.size - 1)
+
+
+def matrix_statuses(
+    engine: Engine,
+    now: datetime,
+    time_buckets,
+    lookback_days: int,
+    max_age_days: int,
+) -> list[MatrixStatus]:
+    weights = active_clients(engine, now - timedelta(days=lookback_days))
+    point_sets = client_point_sets(engine, weights)
+    fresh_after = now - timedelta(days=max_age_days)
+    return [
+        MatrixStatus(client_id, bucket, ids, coords, weights[client_id], stale_rows(engine, ids, bucket, fresh_after))
+        for client_id, (ids, coords) in point_sets.items()
+        for bucket in time_buckets
+    ]
+
+
+def coverage(statuses: list[MatrixStatus]) -> dict:
+    """Warm-cache coverage of ``statuses``: by matrix, by pair and weighted by recent solves."""
+    pairs = sum(s.pairs for s in statuses)
+    stale_pairs = sum(s.stale_rows.size * (s.ids.size - 1) for s in statuses)
+    weight = sum(s.weight for s in statuses)
+    return {
+        "matrices": len(statuses),
+        "warm_matrices": sum(s.warm for s in statuses),
+        "pair_coverage": 1.0 - stale_pairs / pairs if pairs else 1.0,
+        "expected_warm_solves": sum(s.weight for s in statuses if s.warm) / weight if weight else 1.0,
+    }
+
+
+def uncertain_rows(predictor: TravelTimePredictor, status: MatrixStatus, max_relative_error: float) -> np.ndarray:
+    """Stale rows of ``status`` with at least one pair the predictor is unsure about."""
+    _, sigma = predictor.predict_matrix(status.coords, status.time_bucket)
+    uncertain = uncertain_pairs(sigma, max_relative_error)
+    np.fill_diagonal(uncertain, False)
+    return status.stale_rows[uncertain[status.stale_rows].any(axis=1)]
+
+
+def next_departure(now: datetime, time_bucket: int, tz: ZoneInfo) -> int:
+    """Unix timestamp of the next local time-of-day at the start of ``time_bucket``."""
+    local = now.astimezone(tz)
+    seconds = time_bucket * BUCKET_SECONDS
+    departure = local.replace(hour=seconds // 3600, minute=seconds % 3600 // 60, second=0, microsecond=0)
+    if departure <= local:
+        departure += timedelta(days=1)
+    return int(departure.timestamp())
+
+
+async def precompute_matrices(
+    engine: Engine,
+    maps: GoogleMapsClient,
+    now: datetime | None = None,
+    time_buckets=None,
+    lookback_days: int | None = None,
+    max_age_days: int | None = None,
+    max_elements: int | None = None,
+    predictor: TravelTimePredictor | None = None,
+    max_relative_error: float | None = None,
+) -> dict:
+    """Refresh stale morning matrices of active clients within ``max_elements`` (and the client's quota).
+
+    ``predictor`` defaults to the saved model, if any. Returns coverage before and
+    after, plus provider elements spent, matrices refreshed (and failed) and rows left to the predictor.
+    """
+    now = now or datetime.now(timezone.utc)
+    time_buckets = settings.precompute_time_buckets if time_buckets is None else time_buckets
+    lookback_days = settings.precompute_lookback_days if lookback_days is None else lookback_days
+    max_age_days = settings.precompute_max_age_days if max_age_days is None else max_age_days
+    max_elements = settings.precompute_max_elements if max_elements is None else max_elements
+    predictor = load_predictor() if predictor is None else predictor
+    max_relative_error = settings.travel_time_max_relative_error if max_relative_error is None else max_relative_error
+    fresh_after = now - timedelta(days=max_age_days)
+    tz = ZoneInfo(settings.timezone)
+
+    statuses = matrix_statuses(engine, now, time_buckets, lookback_days, max_age_days)
+    before = coverage(statuses)
+    budget = min(maps.quota.remaining, np.inf if max_elements is None else max_elements)
+    # Most recent solves warmed per element first.
+    pending = sorted((s for s in statuses if not s.warm), key=lambda s: -s.weight / s.cost)
+    elements = refreshed = predicted = failed = 0
+    for status in pending:
+        # Points shared between clients may have been fetched for an earlier matrix in this run.
+        status.stale_rows = stale_rows(engine, status.ids, status.time_bucket, fresh_after)
+        if status.warm:
+            continue
+        rows = status.stale_rows
+        if predictor is not None:
+            rows = uncertain_rows(predictor, status, max_relative_error)
+            predicted += status.stale_rows.size - rows.size
+            if rows.size == 0:
+                continue
+        if rows.size * status.ids.size > budget - elements:
+            continue
+        try:
+            result = await maps.fetch_matrix(
+                status.coords[rows], status.coords, departure_time=next_departure(now, status.time_bucket, tz)
+            )
+        except QuotaExceeded:
+            break
+        except ProviderError as exc:
+            logger.warning("Precompute of client %d, bucket %d failed: %s", status.client_id, status.time_bucket, exc)
+            failed += 1
+            continue
+        store_matrix(engine, status.ids[rows], status.time_bucket, result.durations, result.distances,
+                     destination_ids=status.ids, no_route=np.isnan(result.durations))
+        elements += result.elements
+        refreshed += 1
+        status.stale_rows = stale_rows(engine, status.ids, status.time_bucket, fresh_after)
+
+    return {
+        "active_clients": len({s.client_id for s in statuses}),
+        "time_buckets": list(time_buckets),
+        "before": before,
+        "after": coverage(statuses),
+        "elements": elements,
+        "cost": elements * maps.metrics.cost_per_element,
+        "refreshed": refreshed,
+        "failed": failed,
+        "predicted_rows": predicted,
+    }
@@ -0,0 +1,99 @@
+"""Load a routing problem from the database into compact arrays.
+
+All reads for one problem run inside a single snapshot (REPEATABLE READ on
+PostgreSQL, SERIALIZABLE on SQLite) so points and links come from one consistent
+view, using two set-based queries no matter how many points are involved.
+"""
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.engine import Engine
+
+from app.models.clients import client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.solver.problem import SECONDS_PER_DAY, ProblemData
+
+# Until per-point restrictions exist every stop is one unit of demand, open all day.
+DEFAULT_DEMAND = 1.0
+DEFAULT_WINDOW = (0.0, SECONDS_PER_DAY)
+
+
+def snapshot_options(engine: Engine) -> dict:
+    """Execution options for a read-only, snapshot-isolated connection."""
+    if engine.dialect.name == "postgresql":
+        return {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+    if engine.dialect.name == "sqlite":
+        return {"isolation_level": "SERIALIZABLE"}
+    return {"isolation_level": "REPEATABLE READ"}
+
+
+def load_problem(
+    engine: Engine,
+    client_ids: list[int] | None = None,
+    delivery_point_ids: list[int] | None = None,
+) -> ProblemData:
+    """Load every delivery point linked to ``client_ids`` plus any explicit ``delivery_point_ids``.
+
+    Links are returned for the requested clients, or for the requested points when
+    no clients are given.
+    """
+    client_ids = list(client_ids or [])
+    delivery_point_ids = list(delivery_point_ids or [])
+    if not client_ids and not delivery_point_ids:
+        raise ValueError("load_problem needs client_ids or delivery_point_ids.")
+
+    cdp = client_delivery_points
+    link_filter = (
+        cdp.c.client_id.in_(client_ids) if client_ids else cdp.c.delivery_point_id.in_(delivery_point_ids)
+    )
+    point_filters = []
+    if client_ids:
+        point_filters.append(
+            DeliveryPoint.id.in_(select(cdp.c.delivery_point_id).where(cdp.c.client_id.in_(client_ids)))
+        )
+    if delivery_point_ids:
+        point_filters.append(DeliveryPoint.id.in_(delivery_point_ids))
+
+    with engine.connect().execution_options(**snapshot_options(engine)) as conn, conn.begin():
+        point_rows = conn.execute(
+            select(DeliveryPoint.id, DeliveryPoint.latitude, DeliveryPoint.longitude)
+            .where(or_(*point_filters))
+            .order_by(DeliveryPoint.id)
+        ).all()
+        link_rows = conn.execute(
+            select(cdp.c.client_id, cdp.c.delivery_point_id).where(link_filter)
+        ).all()
+
+    return pack_problem(point_rows, link_rows)
+
+
+def pack_problem(point_rows, link_rows) -> ProblemData:
+    """Pack ``(id, latitude, longitude)`` rows (sorted by id) and ``(client_id, delivery_point_id)`` rows."""
+    n = len(point_rows)
+    if n:
+        ids, lats, lons = zip(*point_rows)
+    else:
+        ids, lats, lons = (), (), ()
+    ids = np.array(ids, dtype=np.int64)
+    coords = np.empty((n, 2), dtype=np.float64)
+    coords[:, 0] = np.array(lats, dtype=np.float64)  # None -> NaN
+    coords[:, 1] = np.array(lons, dtype=np.float64)
+
+    if link_rows:
+        link_clients, link_points = (np.array(col, dtype=np.int64) for col in zip(*link_rows))
+        # Links to points outside this problem cannot happen: every linked point was loaded.
+        link_nodes = np.searchsorted(ids, link_points)
+    else:
+        link_clients = np.empty(0, dtype=np.int64)
+        link_nodes = np.empty(0, dtype=np.int64)
+
+    windows = np.empty((n, 2), dtype=np.float64)
+    windows[:] = DEFAULT_WINDOW
+    return ProblemData(
+        ids=ids,
+        coords=coords,
+        demands=np.full(n, DEFAULT_DEMAND, dtype=np.float64),
+        windows=windows,
+        link_clients=link_clients,
+        link_nodes=link_nodes,
+    )
@@ -0,0 +1,37 @@
+"""Named phase timers for the solve pipeline.
+
+``with timer.phase("matrix"): ...`` adds the block's wall-clock seconds to the
+phase, so a job can report where its time went (load, matrix, build, solve,
+postprocess) even when it fails half way.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Seconds per named phase, in the order the phases first ran."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def report(self) -> dict[str, float]:
+        return {name: round(seconds, 6) for name, seconds in self.seconds.items()}
+
+
+@contextmanager
+def timed(timer: PhaseTimer | None, name: str):
+    """``timer.phase(name)``, or nothing when no timer is given."""
+    if timer is None:
+        yield
+    else:
+        with timer.phase(name):
+            yield
@@ -0,0 +1,254 @@
+"""Adaptive large neighbourhood search (ALNS), multi-start across processes.
+
+Each search repeatedly removes part of the solution (random, worst-saving or
+related stops) and reinserts it (greedy or regret-2 insertion with the
+feasibility kernel), picking operators by roulette wheel over adaptively
+learned weights, and accepts candidates by simulated annealing.
+
+``solve_alns`` runs ``workers`` independently seeded searches. With more than
+one worker they run in a process pool; the duration matrix is placed once in
+shared memory (``app/solver/shared.py``) and every process maps it read-only
+instead of receiving a copy. Searches run in epochs of ``exchange_every`` iterations;
+between epochs every search whose best is behind the overall best continues
+from the overall best. With a fixed iteration budget the result depends only on
+the seed and the number of workers.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from app.solver.evaluation import DEPOT, route_cost
+from app.solver.insertion import insert_stops, regret_insert
+from app.solver.problem import RoutingInstance
+from app.solver.shared import parallel_available, shared_pool, worker_instance
+
+DESTROY = ("random", "worst", "related")
+REPAIR = ("greedy", "regret")
+# Scores per outcome: new overall best, better than current, accepted worse.
+SCORES = (33.0, 9.0, 13.0)
+REACTION = 0.1
+SEGMENT = 50
+
+
+def total_cost(instance: RoutingInstance, routes) -> float:
+    return sum(route_cost(instance.durations, r) for r in routes)
+
+
+def _copy(routes) -> list[np.ndarray]:
+    return [r.copy() for r in routes]
+
+
+@dataclass
+class SearchState:
+    """Everything one search needs to continue: solutions, operator weights, temperature, RNG."""
+
+    seed: int
+    current: list[np.ndarray]
+    current_cost: float
+    best: list[np.ndarray]
+    best_cost: float
+    temperature: float
+    cooling: float
+    rng: np.random.Generator
+    iteration: int = 0
+    destroy_weights: np.ndarray = field(default_factory=lambda: np.ones(len(DESTROY)))
+    repair_weights: np.ndarray = field(default_factory=lambda: np.ones(len(REPAIR)))
+
+
+def new_state(instance: RoutingInstance, routes, seed: int, iterations: int) -> SearchState:
+    cost = total_cost(instance, routes)
+    # A candidate 5% worse than the start is accepted with probability 1/2 at first; cool to 1/1000 of that.
+    temperature = 0.05 * cost / math.log(2) if cost > 0 else 1.0
+    return SearchState(
+        seed=seed,
+        current=_copy(routes),
+        current_cost=cost,
+        best=_copy(routes),
+        best_cost=cost,
+        temperature=temperature,
+        cooling=0.001 ** (1 / max(iterations, 1)),
+        rng=np.random.default_rng(seed),
+    )
+
+
+def _remove(routes, removed: np.ndarray) -> list[np.ndarray]:
+    kept = [r[~np.isin(r, removed)] for r in routes]
+    return [r for r in kept if r.size]
+
+
+def _destroy(instance: RoutingInstance, routes, operator: str, q: int, rng: np.random.Generator):
+    nodes = np.concatenate(routes)
+    q = min(q, nodes.size)
+    if operator == "random":
+        removed = rng.choice(nodes, size=q, replace=False)
+    elif operator == "worst":
+        d = instance.durations
+        paths = [np.concatenate(([DEPOT], r, [DEPOT])) for r in routes]
+        prev = np.concatenate([p[:-2] for p in paths])
+        nxt = np.concatenate([p[2:] for p in paths])
+        saving = d[prev, nodes] + d[nodes, nxt] - d[prev, nxt]
+        # Randomized: rank by saving, then sample ranks skewed to the top.
+        order = nodes[np.argsort(-saving)]
+        ranks = np.unique((rng.random(q * 3) ** 4 * order.size).astype(np.int64))[:q]
+        removed = order[ranks]
+    else:
+        seed_node = rng.choice(nodes)
+        relatedness = instance.durations[seed_node, nodes] + instance.durations[nodes, seed_node]
+        removed = nodes[np.argsort(relatedness)[:q]]
+    return _remove(routes, removed), removed
+
+
+def _repair(instance: RoutingInstance, routes, removed, operator: str, rng: np.random.Generator):
+    removed = rng.permutation(removed)
+    if operator == "greedy":
+        return insert_stops(instance, routes, removed, repair_rounds=0)[0]
+    return regret_insert(instance, routes, removed)
+
+
+def _pick(weights: np.ndarray, rng: np.random.Generator) -> int:
+    return int(rng.choice(weights.size, p=weights / weights.sum()))
+
+
+def search(instance: RoutingInstance, state: SearchState, steps: int, deadline: float | None = None) -> SearchState:
+    """Run up to ``steps`` ALNS iterations on ``state`` (in place) and return it."""
+    rng = state.rng
+    n_customers = instance.size - 1
+    low, high = max(1, n_customers // 20), max(2, min(60, n_customers // 4))
+    d_scores, d_uses = np.zeros(len(DESTROY)), np.zeros(len(DESTROY))
+    r_scores, r_uses = np.zeros(len(REPAIR)), np.zeros(len(REPAIR))
+    for _ in range(steps):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        di, ri = _pick(state.destroy_weights, rng), _pick(state.repair_weights, rng)
+        partial, removed = _destroy(instance, state.current, DESTROY[di], int(rng.integers(low, high + 1)), rng)
+        candidate = _repair(instance, partial, removed, REPAIR[ri], rng)
+        cost = total_cost(instance, candidate)
+
+        score = 0.0
+        if cost < state.best_cost - 1e-9:
+            state.best, state.best_cost = _copy(candidate), cost
+            score = SCORES[0]
+        if cost < state.current_cost - 1e-9:
+            state.current, state.current_cost = candidate, cost
+            score = max(score, SCORES[1])
+        elif rng.random() < math.exp(-(cost - state.current_cost) / state.temperature):
+            state.current, state.current_cost = candidate, cost
+            score = max(score, SCORES[2])
+        d_scores[di] += score
+        r_scores[ri] += score
+        d_uses[di] += 1
+        r_uses[ri] += 1
+
+        state.iteration += 1
+        state.temperature *= state.cooling
+        if state.iteration % SEGMENT == 0:
+            for weights, scores, uses in ((state.destroy_weights, d_scores, d_uses), (state.repair_weights, r_scores, r_uses)):
+                used = uses > 0
+                weights[used] = (1 - REACTION) * weights[used] + REACTION * scores[used] / uses[used]
+                np.maximum(weights, 0.05, out=weights)
+                scores[:] = 0
+                uses[:] = 0
+    return state
+
+
+def _search_in_worker(state: SearchState, steps: int, deadline: float | None) -> SearchState:
+    return search(worker_instance(), state, steps, deadline)
+
+
+def _exchange(states: list[SearchState]) -> SearchState:
+    """Searches behind the overall best continue from it; returns the leading state."""
+    leader = min(states, key=lambda s: s.best_cost)
+    for state in states:
+        if state.best_cost > leader.best_cost + 1e-9:
+            state.current, state.current_cost = _copy(leader.best), leader.best_cost
+    return leader
+
+
+def lower_bound(instance: RoutingInstance) -> float:
+    """Every stop is entered exactly once: the sum of each stop's cheapest incoming leg."""
+    d = np.where(np.eye(instance.size, dtype=bool), np.inf, instance.durations)
+    return float(d[:, 1:].min(axis=0).sum()) if instance.size > 1 else 0.0
+
+
+def run_epochs(
+    instance: RoutingInstance,
+    states: list[SearchState],
+    iterations: int,
+    exchange_every: int,
+    time_limit: float | None,
+    on_epoch=None,
+    trace: list[list[float]] | None = None,
+) -> tuple[list[SearchState], list[list[float]]]:
+    """Advance ``states`` in epochs until each has done ``iterations`` (or time runs out).
+
+    ``on_epoch(states, trace)`` is called after every exchange. Returns the final
+    states and the trace of ``[elapsed seconds, best objective]`` per epoch,
+    continuing ``trace`` when resuming.
+    """
+    offset = trace[-1][0] if trace else 0.0
+    started = time.monotonic() - offset
+    deadline = None if time_limit is None else started + time_limit
+    trace = list(trace) if trace else [[0.0, min(s.best_cost for s in states)]]
+    with shared_pool(instance, len(states)) as pool:
+        while min(s.iteration for s in states) < iterations and (deadline is None or time.monotonic() < deadline):
+            steps = [min(exchange_every, iterations - s.iteration) for s in states]
+            if pool is None:
+                states = [search(instance, s, k, deadline) for s, k in zip(states, steps)]
+            else:
+                states = list(pool.map(_search_in_worker, states, steps, [deadline] * len(states)))
+            _exchange(states)
+            trace.append([time.monotonic() - started, min(s.best_cost for s in states)])
+            if on_epoch is not None:
+                on_epoch(states, trace)
+    return states, trace
+
+
+def solve_alns(
+    instance: RoutingInstance,
+    initial: list[np.ndarray],
+    iterations: int = 300,
+    workers: int = 1,
+    seed: int = 0,
+    exchange_every: int = 50,
+    time_limit: float | None = None,
+    checkpoint=None,
+) -> tuple[list[np.ndarray], dict]:
+    """Improve ``initial`` with ``workers`` parallel searches; returns the best routes and search stats.
+
+    With a ``checkpoint`` (``app/solver/checkpoint.py``) the search resumes from
+    the last saved state, if any, and saves its state after exchange epochs.
+    ``stats["parallel"]`` is false when the searches took turns in this process
+    (one worker, or a daemonic process that cannot start a pool).
+    """
+    workers = max(1, workers)
+    bounds = {"lower": lower_bound(instance)}
+    saved = checkpoint.load() if checkpoint is not None else None
+    trace = None
+    if saved is None:
+        states = [new_state(instance, initial, seed + k, iterations) for k in range(workers)]
+    else:
+        states, trace, _ = saved
+        # A different worker count on retry: drop extra searches or start new ones from the saved best.
+        leader = min(states, key=lambda s: s.best_cost)
+        states = states[:workers] + [
+            replace(new_state(instance, leader.best, seed + k, iterations), iteration=leader.iteration)
+            for k in range(len(states), workers)
+        ]
+
+    def on_epoch(states, trace):
+        if checkpoint is not None:
+            checkpoint.maybe_save(states, trace, {**bounds, "upper": trace[-1][1]})
+
+    states, trace = run_epochs(instance, states, iterations, exchange_every, time_limit, on_epoch, trace)
+    leader = min(states, key=lambda s: s.best_cost)
+    return leader.best, {
+        "workers": len(states),
+        "parallel": parallel_available(len(states)),
+        "iterations": sum(s.iteration for s in states),
+        "resumed": saved is not None,
+        "lower_bound": bounds["lower"],
+        "trace": trace,
+    }
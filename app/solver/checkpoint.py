@@ -0,0 +1,123 @@
+"""Checkpoints of a running ALNS solve, so an interrupted solve can resume.
+
+A checkpoint holds every search's current and best routes, operator weights,
+temperature, iteration count and RNG state, plus the progress trace and the
+bounds found so far. Routes are stored as flat int32 arrays with offsets in one
+``.npz`` file (no pickling), written atomically, so saving every few seconds
+costs a few milliseconds even for thousands of stops.
+
+A checkpoint is tied to the instance it was made for by a fingerprint of the
+duration matrix and parameters; a checkpoint for different data is ignored.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from app.solver.alns import SearchState
+from app.solver.problem import RoutingInstance
+
+
+def fingerprint(instance: RoutingInstance) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (instance.durations, instance.demands, instance.windows, instance.service_times):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    digest.update(repr(float(instance.capacity)).encode())
+    return digest.hexdigest()
+
+
+def _pack(routes) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.cumsum([0] + [len(r) for r in routes]).astype(np.int64)
+    flat = np.concatenate(routes).astype(np.int32) if routes else np.empty(0, dtype=np.int32)
+    return flat, offsets
+
+
+def _unpack(flat: np.ndarray, offsets: np.ndarray) -> list[np.ndarray]:
+    return [flat[a:b].astype(np.int64) for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+class Checkpointer:
+    """Saves and restores search states at ``path``, at most once per ``interval`` seconds.
+
+    ``on_save`` is called after every save (e.g. to renew the job's lease).
+    """
+
+    def __init__(self, path: str | Path, instance: RoutingInstance, interval: float = 5.0, on_save: Callable[[], None] | None = None):
+        self.path = Path(path)
+        self.interval = interval
+        self.on_save = on_save
+        self.fingerprint = fingerprint(instance)
+        self._last_save = -np.inf
+        self.saves = 0
+
+    def maybe_save(self, states: list[SearchState], trace, bounds: dict):
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save(states, trace, bounds)
+
+    def save(self, states: list[SearchState], trace, bounds: dict):
+        arrays = {"trace": np.asarray(trace, dtype=np.float64).reshape(-1, 2)}
+        meta = {"fingerprint": self.fingerprint, "bounds": bounds, "states": []}
+        for k, state in enumerate(states):
+            arrays[f"current_{k}"], arrays[f"current_offsets_{k}"] = _pack(state.current)
+            arrays[f"best_{k}"], arrays[f"best_offsets_{k}"] = _pack(state.best)
+            arrays[f"destroy_weights_{k}"] = state.destroy_weights
+            arrays[f"repair_weights_{k}"] = state.repair_weights
+            meta["states"].append({
+                "seed": state.seed,
+                "current_cost": state.current_cost,
+                "best_cost": state.best_cost,
+                "temperature": state.temperature,
+                "cooling": state.cooling,
+                "iteration": state.iteration,
+                "rng": state.rng.bit_generator.state,
+            })
+        arrays["meta"] = np.array(json.dumps(meta))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+        self.saves += 1
+        if self.on_save is not None:
+            self.on_save()
+
+    def load(self) -> tuple[list[SearchState], list[list[float]], dict] | None:
+        """``(states, trace, bounds)`` from the checkpoint, or None if there is none for this instance."""
+        if not self.path.exists():
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta["fingerprint"] != self.fingerprint:
+                    return None
+                states = []
+                for k, saved in enumerate(meta["states"]):
+                    rng = np.random.default_rng()
+                    rng.bit_generator.state = saved["rng"]
+                    states.append(SearchState(
+                        seed=saved["seed"],
+                        current=_unpack(data[f"current_{k}"], data[f"current_offsets_{k}"]),
+                        current_cost=saved["current_cost"],
+                        best=_unpack(data[f"best_{k}"], data[f"best_offsets_{k}"]),
+                        best_cost=saved["best_cost"],
+                        temperature=saved["temperature"],
+                        cooling=saved["cooling"],
+                        rng=rng,
+                        iteration=saved["iteration"],
+                        destroy_weights=data[f"destroy_weights_{k}"].copy(),
+                        repair_weights=data[f"repair_weights_{k}"].copy(),
+                    ))
+                trace = data["trace"].tolist()
+        except (OSError, ValueError, KeyError):
+            return None  # unreadable or from an older format: start over
+        return states, trace, meta["bounds"]
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,148 @@
+"""Route cost and schedule evaluation.
+
+Routes are arrays of node indices without the depot; the depot (node 0) is
+implied at both ends. ``evaluate_routes`` scores many routes at once: routes are
+padded into one (R, L) array and every leg, load and arrival is a gather over
+the matrices, advancing one stop position at a time across all routes.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.solver.problem import RoutingInstance
+
+DEPOT = 0
+
+
+def route_cost(durations: np.ndarray, route) -> float:
+    """Total travel time of depot → route → depot."""
+    if len(route) == 0:
+        return 0.0
+    path = np.concatenate(([DEPOT], np.asarray(route, dtype=np.int64), [DEPOT]))
+    return float(durations[path[:-1], path[1:]].sum())
+
+
+def route_schedule(instance: RoutingInstance, route) -> tuple[np.ndarray, bool]:
+    """Service start time at each stop, and whether windows and capacity hold.
+
+    Waiting is allowed when arriving before a window opens.
+    """
+    route = np.asarray(route, dtype=np.int64)
+    windows = instance.windows
+    starts = np.empty(route.shape[0], dtype=np.float64)
+    feasible = bool(instance.demands[route].sum() <= instance.capacity)
+    time = windows[DEPOT, 0]
+    prev = DEPOT
+    for k, node in enumerate(route):
+        time = max(time + instance.service_times[prev] + instance.durations[prev, node], windows[node, 0])
+        if time > windows[node, 1]:
+            feasible = False
+        starts[k] = time
+        prev = node
+    if time + instance.service_times[prev] + instance.durations[prev, DEPOT] > windows[DEPOT, 1]:
+        feasible = False
+    return starts, feasible
+
+
+def route_is_feasible(instance: RoutingInstance, route) -> bool:
+    return route_schedule(instance, route)[1]
+
+
+def pad_routes(routes) -> np.ndarray:
+    """(R, L) node indices padded with -1, L being the longest route."""
+    routes = [np.asarray(r, dtype=np.int64) for r in routes]
+    padded = np.full((len(routes), max((r.size for r in routes), default=0)), -1, dtype=np.int64)
+    for k, route in enumerate(routes):
+        padded[k, : route.size] = route
+    return padded
+
+
+@dataclass
+class RouteEvaluation:
+    """Per-route totals, shape (R,), and per-stop values, shape (R, L) with NaN on padding.
+
+    ``starts`` is the service start (arrival, or window opening when early); ``loads``
+    is the cumulative demand after each stop; ``lateness`` is how far a start is past
+    the stop's window close (0 when on time).
+    """
+
+    lengths: np.ndarray
+    travel: np.ndarray
+    distance: np.ndarray | None
+    wait: np.ndarray
+    departures: np.ndarray
+    returns: np.ndarray
+    arrivals: np.ndarray
+    starts: np.ndarray
+    loads: np.ndarray
+    lateness: np.ndarray
+    return_lateness: np.ndarray
+    capacity_excess: np.ndarray
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Time from leaving the depot to returning, waits included."""
+        return self.returns - self.departures
+
+    @property
+    def feasible(self) -> np.ndarray:
+        late = np.nan_to_num(self.lateness).max(axis=1, initial=0.0) > 0
+        return ~late & (self.return_lateness <= 0) & (self.capacity_excess <= 0)
+
+
+def evaluate_routes(instance: RoutingInstance, routes, start_times=None, distances: np.ndarray | None = None) -> RouteEvaluation:
+    """Evaluate many routes against ``instance`` in one batch.
+
+    ``start_times`` (scalar or (R,)) is when each route leaves the depot, defaulting to
+    the depot window opening. ``distances`` is an optional (n, n) matrix summed along
+    the same legs as the durations.
+    """
+    padded = routes if isinstance(routes, np.ndarray) and routes.ndim == 2 else pad_routes(routes)
+    n_routes, length = padded.shape
+    valid = padded >= 0
+    nodes = np.where(valid, padded, DEPOT)
+    lengths = valid.sum(axis=1)
+    previous = np.concatenate((np.full((n_routes, 1), DEPOT), nodes[:, :-1]), axis=1)
+    last = nodes[np.arange(n_routes), np.maximum(lengths - 1, 0)] if length else np.full(n_routes, DEPOT)
+    last = np.where(lengths > 0, last, DEPOT)
+
+    legs = np.where(valid, instance.durations[previous, nodes], 0.0)
+    back = instance.durations[last, DEPOT]
+    travel = legs.sum(axis=1) + back
+    distance = None
+    if distances is not None:
+        distance = np.where(valid, distances[previous, nodes], 0.0).sum(axis=1) + distances[last, DEPOT]
+
+    opens, closes = instance.windows[nodes, 0], instance.windows[nodes, 1]
+    service = instance.service_times
+    departures = np.broadcast_to(
+        np.asarray(instance.windows[DEPOT, 0] if start_times is None else start_times, dtype=np.float64), (n_routes,)
+    ).copy()
+    arrivals = np.full((n_routes, length), np.nan)
+    starts = np.full((n_routes, length), np.nan)
+    time = departures.copy()
+    for k in range(length):
+        active = valid[:, k]
+        arrive = time[active] + service[previous[active, k]] + legs[active, k]
+        arrivals[active, k] = arrive
+        starts[active, k] = np.maximum(arrive, opens[active, k])
+        time[active] = starts[active, k]
+    returns = time + np.where(lengths > 0, service[last], 0.0) + back
+
+    loads = np.where(valid, np.cumsum(np.where(valid, instance.demands[nodes], 0.0), axis=1), np.nan)
+    total_load = np.nan_to_num(loads).max(axis=1, initial=0.0)
+    return RouteEvaluation(
+        lengths=lengths,
+        travel=travel,
+        distance=distance,
+        wait=np.nansum(starts - arrivals, axis=1),
+        departures=departures,
+        returns=returns,
+        arrivals=arrivals,
+        starts=starts,
+        loads=loads,
+        lateness=np.where(valid, np.maximum(starts - closes, 0.0), np.nan),
+        return_lateness=np.maximum(returns - instance.windows[DEPOT, 1], 0.0),
+        capacity_excess=np.maximum(total_load - instance.capacity, 0.0),
+    )
@@ -0,0 +1,99 @@
+"""Feasibility kernel for route edits.
+
+A ``RouteState`` caches each stop's service start (forward pass) and latest
+feasible start (backward pass: the latest start that still lets every later
+stop and the return to the depot meet their windows). With it, inserting a node
+at any position of any route is checked in O(1) per position, vectorized over
+all positions of all routes at once, and only reads the matrix entries of the
+legs involved.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.solver.evaluation import DEPOT
+from app.solver.problem import RoutingInstance
+
+
+@dataclass
+class RouteState:
+    route: np.ndarray
+    starts: np.ndarray
+    latest: np.ndarray
+    load: float
+
+
+def route_state(instance: RoutingInstance, route) -> RouteState:
+    route = np.asarray(route, dtype=np.int64)
+    d, windows, service = instance.durations, instance.windows, instance.service_times
+    starts = np.empty(route.shape[0])
+    time, prev = windows[DEPOT, 0], DEPOT
+    for k, node in enumerate(route):
+        time = max(time + service[prev] + d[prev, node], windows[node, 0])
+        starts[k] = time
+        prev = node
+    latest = np.empty(route.shape[0])
+    bound, nxt = windows[DEPOT, 1], DEPOT
+    for k in range(route.shape[0] - 1, -1, -1):
+        node = route[k]
+        bound = min(windows[node, 1], bound - d[node, nxt] - service[node])
+        latest[k] = bound
+        nxt = node
+    return RouteState(route, starts, latest, float(instance.demands[route].sum()))
+
+
+@dataclass
+class Slots:
+    """Every insertion position of a set of routes, flattened: the node goes between ``prev`` and ``next``."""
+
+    route_index: np.ndarray
+    position: np.ndarray
+    prev: np.ndarray
+    next: np.ndarray
+    departure: np.ndarray  # departure time from ``prev``
+    latest_next: np.ndarray  # latest feasible start at ``next`` (horizon end for the depot)
+    load: np.ndarray  # load of the route
+
+
+def insertion_slots(instance: RoutingInstance, states: list[RouteState]) -> Slots:
+    windows, service = instance.windows, instance.service_times
+    parts = []
+    for r, state in enumerate(states):
+        length = state.route.shape[0]
+        prev = np.concatenate(([DEPOT], state.route))
+        depart = np.concatenate(([windows[DEPOT, 0]], state.starts)) + service[prev]
+        parts.append((
+            np.full(length + 1, r),
+            np.arange(length + 1),
+            prev,
+            np.concatenate((state.route, [DEPOT])),
+            depart,
+            np.concatenate((state.latest, [windows[DEPOT, 1]])),
+            np.full(length + 1, state.load),
+        ))
+    if not parts:
+        empty = np.empty(0)
+        return Slots(empty.astype(np.int64), empty.astype(np.int64), empty.astype(np.int64), empty.astype(np.int64), empty, empty, empty)
+    return Slots(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def insertion_costs(instance: RoutingInstance, slots: Slots, node) -> tuple[np.ndarray, np.ndarray]:
+    """Added travel time and feasibility of inserting ``node`` at every slot.
+
+    ``node`` may be an array of k nodes, giving (k, n_slots) results in one pass.
+    """
+    d, windows, service = instance.durations, instance.windows, instance.service_times
+    node = np.asarray(node, dtype=np.int64)
+    if node.ndim:
+        node = node[:, None]
+    start = np.maximum(slots.departure + d[slots.prev, node], windows[node, 0])
+    arrival_next = start + service[node] + d[node, slots.next]
+    start_next = np.where(slots.next == DEPOT, arrival_next, np.maximum(arrival_next, windows[slots.next, 0]))
+    feasible = (
+        (start <= windows[node, 1])
+        & (start_next <= slots.latest_next)
+        & (slots.load + instance.demands[node] <= instance.capacity)
+    )
+    delta = d[slots.prev, node] + d[node, slots.next] - d[slots.prev, slots.next]
+    return delta, feasible
@@ -0,0 +1,132 @@
+"""Incremental insertion of new stops into an existing solution.
+
+Cheapest feasible insertion over all routes (``app/solver/feasibility.py``),
+one stop at a time, globally cheapest first; a stop that fits nowhere gets its
+own route. A bounded repair then relocates each inserted stop to its best
+position given the others. Only legs that touch a new stop, plus legs already in
+the routes, are ever read from ``durations``, so callers only need to fill
+those entries.
+"""
+
+import numpy as np
+
+from app.solver.evaluation import DEPOT, route_is_feasible
+from app.solver.feasibility import insertion_costs, insertion_slots, route_state
+from app.solver.problem import RoutingInstance
+
+
+def _best_slot(instance, states, slots, node):
+    delta, feasible = insertion_costs(instance, slots, node)
+    if not feasible.any():
+        return None
+    k = np.flatnonzero(feasible)[np.argmin(delta[feasible])]
+    return float(delta[k]), int(slots.route_index[k]), int(slots.position[k])
+
+
+class _InsertionTable:
+    """Cheapest feasible insertion of every pending node into every route, kept up to date incrementally.
+
+    After an insertion only the changed route's column is recomputed.
+    """
+
+    def __init__(self, instance: RoutingInstance, states: list, pending: np.ndarray):
+        self.instance = instance
+        self.states = states
+        self.pending = pending
+        self.cost = np.full((pending.size, len(states)), np.inf)
+        self.position = np.zeros((pending.size, len(states)), dtype=np.int64)
+        for r in range(len(states)):
+            self._update(r)
+
+    def _update(self, r: int):
+        slots = insertion_slots(self.instance, [self.states[r]])
+        delta, feasible = insertion_costs(self.instance, slots, self.pending)
+        cost = np.where(feasible, delta, np.inf)
+        best = cost.argmin(axis=1)
+        self.cost[:, r] = cost[np.arange(self.pending.size), best]
+        self.position[:, r] = slots.position[best]
+
+    def insert(self, i: int, r: int):
+        """Insert pending node ``i`` at its best position in route ``r``."""
+        state = self.states[r]
+        self.states[r] = route_state(self.instance, np.insert(state.route, self.position[i, r], self.pending[i]))
+        self._drop(i)
+        self._update(r)
+
+    def open_route(self, i: int):
+        """Give pending node ``i`` a route of its own."""
+        self.states.append(route_state(self.instance, [self.pending[i]]))
+        self._drop(i)
+        self.cost = np.column_stack((self.cost, np.full(self.pending.size, np.inf)))
+        self.position = np.column_stack((self.position, np.zeros(self.pending.size, dtype=np.int64)))
+        self._update(len(self.states) - 1)
+
+    def _drop(self, i: int):
+        self.pending = np.delete(self.pending, i)
+        self.cost = np.delete(self.cost, i, axis=0)
+        self.position = np.delete(self.position, i, axis=0)
+
+
+def regret_insert(instance: RoutingInstance, routes, nodes) -> list[np.ndarray]:
+    """Regret-2 insertion: repeatedly place the stop with the largest gap between its best and second-best route.
+
+    Stops that fit nowhere get their own route; empty routes are dropped.
+    """
+    table = _InsertionTable(instance, [route_state(instance, r) for r in routes], np.asarray(nodes, dtype=np.int64))
+    while table.pending.size:
+        cost = table.cost
+        placeable = np.isfinite(cost).any(axis=1)
+        if not placeable.any():
+            table.open_route(0)
+            continue
+        ordered = np.sort(cost, axis=1)
+        first = ordered[:, 0]
+        second = ordered[:, 1] if cost.shape[1] > 1 else np.full(cost.shape[0], np.inf)
+        regret = np.full(cost.shape[0], -np.inf)
+        regret[placeable] = second[placeable] - first[placeable]
+        # Largest regret first (stops with a single feasible route have infinite regret); ties go to the cheapest.
+        candidates = np.flatnonzero(regret == regret.max())
+        i = int(candidates[np.argmin(first[candidates])])
+        table.insert(i, int(np.argmin(cost[i])))
+    return [s.route for s in table.states if s.route.size]
+
+
+def insert_stops(instance: RoutingInstance, routes, nodes, repair_rounds: int = 2) -> tuple[list[np.ndarray], list[int]]:
+    """Insert ``nodes`` into ``routes``; returns the new routes and the nodes that needed a route of their own."""
+    nodes = np.asarray(list(nodes), dtype=np.int64)
+    table = _InsertionTable(instance, [route_state(instance, r) for r in routes], nodes)
+    opened = []
+    while table.pending.size:
+        if table.cost.size == 0 or not np.isfinite(table.cost).any():
+            # Nothing fits anywhere; open a route for the first pending stop and retry the rest.
+            opened.append(int(table.pending[0]))
+            table.open_route(0)
+            continue
+        i, r = np.unravel_index(np.argmin(table.cost), table.cost.shape)
+        table.insert(int(i), int(r))
+    states = table.states
+
+    for _ in range(repair_rounds):
+        moved = False
+        for node in nodes.tolist():
+            r = next(i for i, s in enumerate(states) if node in s.route)
+            route = states[r].route
+            position = int(np.flatnonzero(route == node)[0])
+            removed = np.delete(route, position)
+            # Without the triangle inequality a shortcut can be slower, so removal is checked too.
+            if not route_is_feasible(instance, removed):
+                continue
+            prev = route[position - 1] if position > 0 else DEPOT
+            nxt = route[position + 1] if position + 1 < route.shape[0] else DEPOT
+            saving = instance.durations[prev, node] + instance.durations[node, nxt] - instance.durations[prev, nxt]
+            trial = states.copy()
+            trial[r] = route_state(instance, removed)
+            candidate = _best_slot(instance, trial, insertion_slots(instance, trial), node)
+            if candidate is None or candidate[0] >= saving - 1e-9:
+                continue
+            _, r2, position2 = candidate
+            trial[r2] = route_state(instance, np.insert(trial[r2].route, position2, node))
+            states, moved = trial, True
+        if not moved:
+            break
+    return [s.route for s in states if s.route.size], opened
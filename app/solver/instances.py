@@ -0,0 +1,217 @@
+"""Reference and synthetic routing instances.
+
+Synthetic generators are seeded and deterministic. Loaders read the standard
+text formats of the Solomon VRPTW set and the Uchoa et al. CVRP ``X`` set
+(CVRPLIB) from local files; the files themselves are not shipped.
+"""
+
+import math
+import re
+from pathlib import Path
+
+import numpy as np
+
+from app.solver.problem import RoutingInstance
+from app.travel_times_subsystem.geometry import haversine_matrix
+
+# Synthetic city layout: a Lisbon-sized area, urban driving with a road detour factor.
+CITY_CENTER = (38.7223, -9.1393)
+CITY_SPEED_MPS = 8.3  # ~30 km/h
+CITY_DETOUR = 1.3
+WORKDAY = (8 * 3600.0, 18 * 3600.0)
+
+
+def _euclidean(coords: np.ndarray) -> np.ndarray:
+    diff = coords[:, None, :] - coords[None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+def _planar_instance(name, coords, rng, capacity, time_windows, horizon=1000.0) -> RoutingInstance:
+    n = coords.shape[0]
+    demands = rng.integers(1, 10, size=n).astype(np.float64)
+    demands[0] = 0.0
+    service = np.full(n, 10.0 if time_windows else 0.0)
+    service[0] = 0.0
+    durations = _euclidean(coords)
+    windows = np.tile([0.0, horizon], (n, 1))
+    if time_windows:
+        # Windows centred on a reachable time so every stop is feasible on its own.
+        earliest = durations[0]
+        latest = horizon - durations[:, 0] - service
+        centre = earliest + rng.random(n) * np.maximum(latest - earliest, 0)
+        half = rng.uniform(30.0, 120.0, size=n)
+        windows[:, 0] = np.maximum(earliest, centre - half)
+        windows[:, 1] = np.minimum(np.maximum(latest, earliest), centre + half)
+        windows[0] = (0.0, horizon)
+    return RoutingInstance(
+        name=name,
+        durations=durations,
+        demands=demands,
+        windows=windows,
+        service_times=service,
+        capacity=float(capacity),
+        coords=coords,
+    )
+
+
+def uniform_instance(n: int, seed: int = 0, capacity: float = 50, time_windows: bool = False) -> RoutingInstance:
+    """``n`` customers uniformly on a 100×100 square, depot in the centre."""
+    rng = np.random.default_rng(seed)
+    coords = np.vstack(([50.0, 50.0], rng.uniform(0, 100, size=(n, 2))))
+    return _planar_instance(f"uniform-n{n}-s{seed}", coords, rng, capacity, time_windows)
+
+
+def clustered_instance(
+    n: int, seed: int = 0, n_clusters: int = 5, capacity: float = 50, time_windows: bool = False
+) -> RoutingInstance:
+    """``n`` customers in Gaussian clusters on a 100×100 square, depot in the centre."""
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform(10, 90, size=(n_clusters, 2))
+    members = rng.integers(0, n_clusters, size=n)
+    points = np.clip(centres[members] + rng.normal(0, 4.0, size=(n, 2)), 0, 100)
+    coords = np.vstack(([50.0, 50.0], points))
+    return _planar_instance(f"clustered-n{n}-k{n_clusters}-s{seed}", coords, rng, capacity, time_windows)
+
+
+def city_instance(n: int, seed: int = 0, capacity: float = 80, time_windows: bool = True) -> RoutingInstance:
+    """``n`` stops with ``DeliveryPoint``-like (latitude, longitude) coordinates around a city.
+
+    A dense core plus a few suburban hubs; the depot sits on the outskirts like a
+    warehouse. Travel times are haversine distance × detour at urban speed, in seconds.
+    """
+    rng = np.random.default_rng(seed)
+    lat0, lon0 = CITY_CENTER
+    deg_lat = 1 / 111_000.0  # degrees per meter
+    deg_lon = deg_lat / math.cos(math.radians(lat0))
+
+    n_core = int(n * 0.6)
+    core = rng.normal(0, 1500.0, size=(n_core, 2))
+    hubs = rng.normal(0, 6000.0, size=(4, 2))
+    members = rng.integers(0, 4, size=n - n_core)
+    suburbs = hubs[members] + rng.normal(0, 800.0, size=(n - n_core, 2))
+    offsets = np.vstack(([[-7000.0, 9000.0]], core, suburbs))  # meters north, east
+    coords = np.column_stack((lat0 + offsets[:, 0] * deg_lat, lon0 + offsets[:, 1] * deg_lon))
+
+    durations = haversine_matrix(coords) * CITY_DETOUR / CITY_SPEED_MPS
+    demands = rng.integers(1, 6, size=n + 1).astype(np.float64)
+    demands[0] = 0.0
+    service = np.full(n + 1, 300.0)
+    service[0] = 0.0
+    windows = np.tile(WORKDAY, (n + 1, 1))
+    if time_windows:
+        # Two-hour delivery slots for a share of the stops, like booked deliveries.
+        booked = rng.random(n + 1) < 0.4
+        booked[0] = False
+        slot_start = WORKDAY[0] + 3600.0 * rng.integers(1, 7, size=n + 1)
+        windows[booked, 0] = slot_start[booked]
+        windows[booked, 1] = slot_start[booked] + 7200.0
+    return RoutingInstance(
+        name=f"city-n{n}-s{seed}",
+        durations=durations,
+        demands=demands,
+        windows=windows,
+        service_times=service,
+        capacity=float(capacity),
+        coords=coords,
+    )
+
+
+GENERATORS = {
+    "uniform": uniform_instance,
+    "clustered": clustered_instance,
+    "city": city_instance,
+}
+
+
+def load_solomon(path: str | Path, best_known: float | None = None) -> RoutingInstance:
+    """Read a Solomon VRPTW file (e.g. ``C101.txt``); distances are Euclidean, unrounded."""
+    path = Path(path)
+    lines = [line.split() for line in path.read_text().splitlines()]
+    name = lines[0][0] if lines and lines[0] else path.stem
+    numeric = [row for row in lines if row and all(re.fullmatch(r"-?\d+(\.\d+)?", tok) for tok in row)]
+    if not numeric or len(numeric[0]) != 2:
+        raise ValueError(f"{path}: missing VEHICLE NUMBER / CAPACITY line.")
+    max_vehicles, capacity = int(numeric[0][0]), float(numeric[0][1])
+    rows = np.array([[float(tok) for tok in row] for row in numeric[1:] if len(row) == 7])
+    if rows.size == 0:
+        raise ValueError(f"{path}: no customer rows found.")
+    rows = rows[np.argsort(rows[:, 0])]
+    coords = rows[:, 1:3]
+    return RoutingInstance(
+        name=name,
+        durations=_euclidean(coords),
+        demands=rows[:, 3],
+        windows=rows[:, 4:6].copy(),
+        service_times=rows[:, 6],
+        capacity=capacity,
+        max_vehicles=max_vehicles,
+        coords=coords,
+        best_known=best_known,
+    )
+
+
+def load_cvrplib(path: str | Path, best_known: float | None = None) -> RoutingInstance:
+    """Read a CVRPLIB/TSPLIB CVRP file (e.g. Uchoa ``X-n101-k25.vrp``).
+
+    ``EUC_2D`` distances are rounded to the nearest integer, as in the reference
+    solutions. If ``best_known`` is omitted it is read from a sibling ``.sol``
+    file (``Cost <value>`` line) when present.
+    """
+    path = Path(path)
+    header: dict[str, str] = {}
+    sections: dict[str, list[list[str]]] = {}
+    current = None
+    for raw in path.read_text().splitlines():
+        line = raw.strip()
+        if not line or line == "EOF":
+            continue
+        if line.endswith("_SECTION"):
+            current = line
+            sections[current] = []
+        elif ":" in line and current is None:
+            key, _, value = line.partition(":")
+            header[key.strip().upper()] = value.strip()
+        elif current is not None:
+            sections[current].append(line.split())
+
+    weight_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+    if weight_type != "EUC_2D":
+        raise ValueError(f"{path}: unsupported EDGE_WEIGHT_TYPE {weight_type}.")
+    nodes = np.array(sections["NODE_COORD_SECTION"], dtype=np.float64)
+    demand_rows = np.array(sections["DEMAND_SECTION"], dtype=np.float64)
+    depot_ids = [int(row[0]) for row in sections.get("DEPOT_SECTION", [["1"]]) if int(row[0]) > 0]
+
+    coords_by_id = dict(zip(nodes[:, 0].astype(int), nodes[:, 1:3]))
+    demand_by_id = dict(zip(demand_rows[:, 0].astype(int), demand_rows[:, 1]))
+    depot = depot_ids[0] if depot_ids else 1
+    order = [depot] + sorted(i for i in coords_by_id if i != depot)
+    coords = np.array([coords_by_id[i] for i in order])
+    demands = np.array([demand_by_id.get(i, 0.0) for i in order])
+
+    if best_known is None:
+        solution_file = path.with_suffix(".sol")
+        if solution_file.exists():
+            match = re.search(r"Cost\s+([\d.]+)", solution_file.read_text())
+            best_known = float(match.group(1)) if match else None
+
+    n = coords.shape[0]
+    vehicles = re.search(r"-k(\d+)", header.get("NAME", path.stem))
+    return RoutingInstance(
+        name=header.get("NAME", path.stem),
+        durations=np.rint(_euclidean(coords)),
+        demands=demands,
+        windows=np.tile([0.0, np.inf], (n, 1)),
+        service_times=np.zeros(n),
+        capacity=float(header["CAPACITY"]),
+        max_vehicles=int(vehicles.group(1)) if vehicles else None,
+        coords=coords,
+        best_known=best_known,
+    )
+
+
+def load_directory(directory: str | Path) -> list[RoutingInstance]:
+    """Load every Solomon ``.txt`` and CVRPLIB ``.vrp`` file in ``directory``, sorted by name."""
+    directory = Path(directory)
+    instances = [load_cvrplib(p) for p in sorted(directory.glob("*.vrp"))]
+    instances += [load_solomon(p) for p in sorted(directory.glob("*.txt"))]
+    return instances
@@ -0,0 +1,131 @@
+"""Pre-solve reductions: merge co-located stops, tighten windows, prune arcs.
+
+- Stops that can reach each other within ``merge_seconds`` both ways (same
+  building, same coordinates) become one aggregated node, visited as a block in
+  index order. Its demand is the members' total, its service time covers every
+  member's service plus the short legs between them, its window is the range of
+  block start times that lets every member start inside its own window, and its
+  matrix row/column are the last member's outgoing and the first member's
+  incoming legs. Stops are only merged while the block stays feasible.
+- Windows are tightened: a stop cannot start before the direct drive from the
+  depot, nor later than leaves time to drive back before the horizon ends.
+- Arcs that no feasible route can use (window or capacity violations) get an
+  infinite travel time, which every solver mode treats as unusable.
+
+``Presolved.expand`` maps routes on the reduced instance back to original nodes.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.solver.evaluation import DEPOT
+from app.solver.problem import RoutingInstance
+
+DEFAULT_MERGE_SECONDS = 30.0
+
+
+@dataclass
+class Presolved:
+    """A reduced instance, the original nodes behind each reduced node, and what was removed."""
+
+    instance: RoutingInstance
+    members: list[np.ndarray]
+    report: dict
+
+    def expand(self, routes) -> list[np.ndarray]:
+        """Routes over original node indices."""
+        return [np.concatenate([self.members[node] for node in route]).astype(np.int64) for route in routes]
+
+
+def _group(instance: RoutingInstance, merge_seconds: float) -> list[np.ndarray]:
+    """Greedy blocks of co-located stops; each block's members in visiting order."""
+    d, windows, service = instance.durations, instance.windows, instance.service_times
+    n = instance.size
+    close = (d <= merge_seconds) & (d.T <= merge_seconds)
+    assigned = np.zeros(n, dtype=bool)
+    groups = [np.array([DEPOT])]
+    assigned[DEPOT] = True
+    for i in range(1, n):
+        if assigned[i]:
+            continue
+        block = [i]
+        assigned[i] = True
+        offset, low, high = service[i], windows[i, 0], windows[i, 1]
+        demand = instance.demands[i]
+        for j in np.flatnonzero(close[i] & ~assigned):
+            arrive = offset + d[block[-1], j]
+            # Start at block start + ``arrive``: the block window must keep j inside its own window.
+            new_low, new_high = max(low, windows[j, 0] - arrive), min(high, windows[j, 1] - arrive)
+            if new_low > new_high or demand + instance.demands[j] > instance.capacity:
+                continue
+            block.append(int(j))
+            assigned[j] = True
+            offset, low, high = arrive + service[j], new_low, new_high
+            demand += instance.demands[j]
+        groups.append(np.array(block))
+    return groups
+
+
+def presolve(instance: RoutingInstance, merge_seconds: float = DEFAULT_MERGE_SECONDS) -> Presolved:
+    """Reduce ``instance``; node 0 stays the depot."""
+    d, windows, service = instance.durations, instance.windows, instance.service_times
+    groups = _group(instance, merge_seconds)
+    first = np.array([g[0] for g in groups])
+    last = np.array([g[-1] for g in groups])
+    m = len(groups)
+
+    durations = d[np.ix_(last, first)].astype(np.float64)
+    np.fill_diagonal(durations, 0.0)
+    demands = np.array([instance.demands[g].sum() for g in groups])
+    new_service = np.empty(m)
+    new_windows = np.empty((m, 2))
+    for k, g in enumerate(groups):
+        legs = d[g[:-1], g[1:]]
+        # Start offset of each member relative to the block start.
+        offsets = np.concatenate(([0.0], np.cumsum(service[g[:-1]] + legs)))
+        new_service[k] = offsets[-1] + service[g[-1]]
+        new_windows[k] = (np.max(windows[g, 0] - offsets), np.min(windows[g, 1] - offsets))
+    new_windows[DEPOT] = windows[DEPOT]
+
+    # Tighten: no earlier than the direct drive from the depot, no later than allows the drive back.
+    depot_start, horizon_end = windows[DEPOT]
+    earliest = np.maximum(new_windows[:, 0], depot_start + new_service[DEPOT] + durations[DEPOT])
+    latest = np.minimum(new_windows[:, 1], horizon_end - new_service - durations[:, DEPOT])
+    earliest[DEPOT], latest[DEPOT] = new_windows[DEPOT]
+    tightened = int(np.sum((earliest > new_windows[:, 0] + 1e-9) | (latest < new_windows[:, 1] - 1e-9)))
+    new_windows = np.column_stack((earliest, latest))
+
+    # Prune arcs i -> j between stops that cannot be consecutive on any feasible route.
+    off_diagonal = ~np.eye(m, dtype=bool)
+    customers = np.arange(m) != DEPOT
+    between = off_diagonal & customers[:, None] & customers[None, :]
+    too_late = earliest[:, None] + new_service[:, None] + durations > latest[None, :]
+    too_heavy = demands[:, None] + demands[None, :] > instance.capacity
+    pruned = between & (too_late | too_heavy)
+    durations[pruned] = np.inf
+
+    reduced = RoutingInstance(
+        name=instance.name,
+        durations=durations,
+        demands=demands,
+        windows=new_windows,
+        service_times=new_service,
+        capacity=instance.capacity,
+        max_vehicles=instance.max_vehicles,
+        coords=None if instance.coords is None else instance.coords[first],
+        best_known=instance.best_known,
+    )
+    n = instance.size
+    arcs_before = n * (n - 1)
+    arcs_after = int(np.isfinite(durations[off_diagonal]).sum())
+    return Presolved(reduced, groups, {
+        "nodes_before": n,
+        "nodes_after": m,
+        "merged_stops": n - m,
+        "arcs_before": arcs_before,
+        "arcs_after": arcs_after,
+        "arcs_pruned": int(pruned.sum()),
+        "windows_tightened": tightened,
+        "reduction": 1 - (m + arcs_after) / (n + arcs_before) if n > 1 else 0.0,
+    })
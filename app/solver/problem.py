@@ -0,0 +1,85 @@
+"""Problem data handed to the solver.
+
+Everything is stored as flat NumPy arrays indexed by node position (0..n-1), so
+the solver never touches ORM objects and the whole problem fits in a few
+contiguous buffers.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+SECONDS_PER_DAY = 86_400.0
+
+
+@dataclass(frozen=True, slots=True)
+class ProblemData:
+    """Nodes of a routing problem plus their client links.
+
+    - ``ids``: delivery point ids, shape (n,), int64, sorted ascending.
+    - ``coords``: (latitude, longitude) per node, shape (n, 2), float64; NaN when unknown.
+    - ``demands``: demand per node, shape (n,), float64.
+    - ``windows``: (earliest, latest) arrival in seconds from midnight, shape (n, 2), float64.
+    - ``link_clients`` / ``link_nodes``: client id and node index per client→delivery point link, shape (m,).
+    """
+
+    ids: np.ndarray
+    coords: np.ndarray
+    demands: np.ndarray
+    windows: np.ndarray
+    link_clients: np.ndarray
+    link_nodes: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return int(self.ids.shape[0])
+
+    @property
+    def missing_coords(self) -> np.ndarray:
+        """Delivery point ids without usable coordinates."""
+        return self.ids[np.isnan(self.coords).any(axis=1)]
+
+    def index_of(self, delivery_point_ids) -> np.ndarray:
+        """Node indices for the given delivery point ids (raises KeyError on unknown ids)."""
+        wanted = np.asarray(delivery_point_ids, dtype=np.int64)
+        if self.size == 0:
+            missing = wanted
+            positions = np.zeros_like(wanted)
+        else:
+            positions = np.searchsorted(self.ids, wanted).clip(max=self.size - 1)
+            missing = wanted[self.ids[positions] != wanted]
+        if missing.size:
+            raise KeyError(f"Unknown delivery point ids: {sorted(set(missing.tolist()))}")
+        return positions
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.ids, self.coords, self.demands, self.windows, self.link_clients, self.link_nodes))
+
+
+@dataclass(frozen=True, slots=True)
+class RoutingInstance:
+    """A solver-ready routing instance; node 0 is the depot.
+
+    - ``durations``: travel time (also the objective cost) between nodes, shape (n, n).
+    - ``demands`` / ``service_times``: per node, shape (n,); zero at the depot.
+    - ``windows``: (earliest, latest) start of service per node, shape (n, 2);
+      the depot window is the planning horizon.
+    - ``capacity``: vehicle capacity; ``max_vehicles`` is informational (None = unlimited).
+    - ``coords``: optional node coordinates, shape (n, 2), only used for reporting.
+    - ``best_known``: best known objective, when the instance comes from a reference set.
+    """
+
+    name: str
+    durations: np.ndarray
+    demands: np.ndarray
+    windows: np.ndarray
+    service_times: np.ndarray
+    capacity: float
+    max_vehicles: int | None = None
+    coords: np.ndarray | None = None
+    best_known: float | None = None
+
+    @property
+    def size(self) -> int:
+        return int(self.durations.shape[0])
@@ -0,0 +1,93 @@
+"""What-if solving: many parameter variants of one instance, solved side by side.
+
+A scenario overrides a few parameters of the base instance: fleet size
+(``vehicles``), shift (``shift_start_s`` / ``shift_s``, i.e. the depot window),
+``capacity``, solver ``mode`` and ``iterations``. The duration matrix is built
+once and shared by a process pool (``app/solver/shared.py``); each process
+derives its scenario from the shared instance, so N scenarios cost one matrix
+and N solves spread over the cores.
+
+The solver modes do not limit the number of routes. With ``vehicles`` set, the
+largest routes are kept and the stops of the others are reinserted into them
+where they fit; whatever still does not fit, like stops that cannot be served
+at all within the scenario's shift, is reported as unserved.
+"""
+
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from app.solver.evaluation import route_cost, route_is_feasible
+from app.solver.insertion import insert_stops
+from app.solver.presolve import presolve
+from app.solver.problem import RoutingInstance
+from app.solver.shared import shared_pool, worker_instance
+from app.solver.solver import solve, two_opt
+
+
+def scenario_instance(instance: RoutingInstance, scenario: dict) -> RoutingInstance:
+    """``instance`` with the scenario's shift and capacity applied."""
+    windows = instance.windows
+    if scenario.get("shift_start_s") is not None or scenario.get("shift_s") is not None:
+        start = scenario.get("shift_start_s")
+        start = windows[0, 0] if start is None else start
+        end = windows[0, 1] if scenario.get("shift_s") is None else start + scenario["shift_s"]
+        windows = windows.copy()
+        windows[0] = (start, end)
+    capacity = scenario.get("capacity") or instance.capacity
+    return replace(instance, windows=windows, capacity=float(capacity), max_vehicles=scenario.get("vehicles"))
+
+
+def limit_fleet(instance: RoutingInstance, routes, vehicles: int | None) -> tuple[list[np.ndarray], np.ndarray]:
+    """At most ``vehicles`` routes: the largest are kept, the rest's stops reinserted; returns (routes, unserved nodes)."""
+    routes = sorted(routes, key=len, reverse=True)
+    if vehicles is None or len(routes) <= vehicles:
+        return routes, np.empty(0, dtype=np.int64)
+    kept, dropped = routes[:vehicles], np.concatenate(routes[vehicles:])
+    # Kept routes come back first; anything after them was opened for stops that fit nowhere.
+    routes, _ = insert_stops(instance, kept, dropped)
+    served, extra = routes[:vehicles], routes[vehicles:]
+    unserved = np.sort(np.concatenate(extra)) if extra else np.empty(0, dtype=np.int64)
+    return [two_opt(instance, route) for route in served], unserved
+
+
+def solve_scenario(instance: RoutingInstance, scenario: dict, merge_seconds: float | None = None) -> dict:
+    """Solve one scenario of ``instance``; routes and unserved stops are node indices."""
+    started = time.perf_counter()
+    variant = scenario_instance(instance, scenario)
+    reduced = None if merge_seconds is None else presolve(variant, merge_seconds)
+    model = variant if reduced is None else reduced.instance
+    options = {"iterations": scenario.get("iterations", 300), "seed": scenario.get("seed", 0)}
+    mode = scenario.get("mode", "local_search")
+    solution = solve(model, mode, **(options if mode == "alns" else {}))
+    routes = solution.routes if reduced is None else reduced.expand(solution.routes)
+    # Stops that cannot be served even on their own (e.g. beyond a short shift) are unserved, not a route.
+    feasible = [route_is_feasible(variant, route) for route in routes]
+    unreachable = [route for route, ok in zip(routes, feasible) if not ok]
+    routes, unserved = limit_fleet(variant, [route for route, ok in zip(routes, feasible) if ok], scenario.get("vehicles"))
+    unserved = np.sort(np.concatenate([unserved, *unreachable]))
+    return {
+        "name": scenario.get("name"),
+        "routes": routes,
+        "unserved": unserved,
+        "objective": sum(route_cost(variant.durations, route) for route in routes),
+        "seconds": time.perf_counter() - started,
+        "presolve": None if reduced is None else reduced.report,
+    }
+
+
+def _solve_in_worker(scenario: dict, merge_seconds: float | None) -> dict:
+    return solve_scenario(worker_instance(), scenario, merge_seconds)
+
+
+def solve_scenarios(instance: RoutingInstance, scenarios: list[dict], workers: int = 1, merge_seconds: float | None = None) -> list[dict]:
+    """Solve every scenario of ``instance``, in a pool of up to ``workers`` processes sharing its matrix.
+
+    Results are in scenario order; ``merge_seconds`` enables pre-solve per scenario.
+    In a daemonic process (a Celery prefork child) they are solved in turn here, with a warning.
+    """
+    with shared_pool(instance, min(workers, len(scenarios))) as pool:
+        if pool is None:
+            return [solve_scenario(instance, s, merge_seconds) for s in scenarios]
+        return list(pool.map(_solve_in_worker, scenarios, [merge_seconds] * len(scenarios)))
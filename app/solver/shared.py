@@ -0,0 +1,72 @@
+"""Process pools that share one instance's duration matrix.
+
+The matrix is placed once in ``multiprocessing.shared_memory``; each pool process
+maps it read-only at start-up and keeps the rest of the instance (small per-node
+arrays) from its initializer, so tasks only carry their own arguments.
+
+Daemonic processes (e.g. Celery prefork children) cannot start a pool: the work
+then runs in-process, with a warning, and callers report ``parallel: false``.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from multiprocessing import current_process, shared_memory
+
+import numpy as np
+
+from app.solver.problem import RoutingInstance
+
+logger = logging.getLogger(__name__)
+
+# Pool processes: the instance with ``durations`` mapped from shared memory, set up once per process.
+_worker_instance: RoutingInstance | None = None
+_worker_memory: shared_memory.SharedMemory | None = None
+
+
+def _attach(name: str, shape: tuple, skeleton: RoutingInstance):
+    global _worker_instance, _worker_memory
+    # Pool processes share the parent's resource tracker, and the parent unlinks the segment when done.
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    durations = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+    durations.flags.writeable = False
+    _worker_instance = replace(skeleton, durations=durations)
+
+
+def worker_instance() -> RoutingInstance:
+    """The shared instance, inside a ``shared_pool`` process."""
+    return _worker_instance
+
+
+def parallel_available(workers: int) -> bool:
+    """Whether ``shared_pool(instance, workers)`` gives a pool: more than one worker, outside a daemonic process."""
+    return workers > 1 and not current_process().daemon
+
+
+@contextmanager
+def shared_pool(instance: RoutingInstance, workers: int):
+    """Pool of ``workers`` processes holding ``instance``, or None when work should stay in-process.
+
+    Daemonic processes (e.g. Celery prefork children) cannot start a pool, and one worker gains nothing from it.
+    """
+    if not parallel_available(workers):
+        if workers > 1:
+            logger.warning(
+                "Running %d parallel searches in-process: daemonic processes cannot start a pool "
+                "(run Celery solver workers with -P solo or -P threads)",
+                workers,
+            )
+        yield None
+        return
+    memory = shared_memory.SharedMemory(create=True, size=max(instance.durations.nbytes, 1))
+    shared = np.ndarray(instance.durations.shape, dtype=np.float64, buffer=memory.buf)
+    shared[:] = instance.durations
+    skeleton = replace(instance, durations=np.empty((0, 0)))
+    pool = ProcessPoolExecutor(workers, initializer=_attach, initargs=(memory.name, shared.shape, skeleton))
+    try:
+        yield pool
+    finally:
+        pool.shutdown()
+        memory.close()
+        memory.unlink()
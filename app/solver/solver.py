@@ -0,0 +1,118 @@
+"""Solver entry point: takes a RoutingInstance, returns a Solution.
+
+Modes:
+- ``greedy``: nearest-feasible-neighbour construction (capacity + time windows).
+- ``local_search``: greedy, then 2-opt on every route until no improving feasible move remains.
+- ``alns``: local search, then adaptive large neighbourhood search, optionally
+  multi-start across processes (``app/solver/alns.py``); options ``iterations``,
+  ``workers``, ``seed``, ``exchange_every``, ``time_limit``.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.solver.alns import solve_alns
+from app.solver.evaluation import DEPOT, route_cost, route_is_feasible
+from app.solver.problem import RoutingInstance
+
+
+@dataclass
+class Solution:
+    """Routes as node-index arrays (depot excluded) and their total travel time."""
+
+    routes: list[np.ndarray]
+    objective: float
+    mode: str = ""
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def n_routes(self) -> int:
+        return len(self.routes)
+
+
+def greedy_routes(instance: RoutingInstance) -> list[np.ndarray]:
+    """Build routes by repeatedly driving to the nearest stop that keeps the route feasible."""
+    d = instance.durations
+    windows = instance.windows
+    service = instance.service_times
+    demands = instance.demands
+    horizon_end = windows[DEPOT, 1]
+
+    unvisited = np.ones(instance.size, dtype=bool)
+    unvisited[DEPOT] = False
+    routes = []
+    while unvisited.any():
+        route = []
+        node, time, load = DEPOT, windows[DEPOT, 0], 0.0
+        while True:
+            candidates = np.flatnonzero(unvisited)
+            if candidates.size == 0:
+                break
+            arrival = time + service[node] + d[node, candidates]
+            start = np.maximum(arrival, windows[candidates, 0])
+            ok = (
+                (start <= windows[candidates, 1])
+                & (load + demands[candidates] <= instance.capacity)
+                & (start + service[candidates] + d[candidates, DEPOT] <= horizon_end)
+            )
+            if not ok.any():
+                break
+            # Nearest by time to start of service, so waiting counts against a candidate.
+            pick = np.flatnonzero(ok)[np.argmin((start - time)[ok])]
+            node = int(candidates[pick])
+            time, load = float(start[pick]), load + float(demands[node])
+            unvisited[node] = False
+            route.append(node)
+        if not route:
+            # Stop cannot be served feasibly even alone; give it its own route so it is not lost.
+            node = int(np.flatnonzero(unvisited)[0])
+            unvisited[node] = False
+            route.append(node)
+        routes.append(np.array(route, dtype=np.int64))
+    return routes
+
+
+def two_opt(instance: RoutingInstance, route: np.ndarray, max_passes: int = 1000) -> np.ndarray:
+    """Improve one route with feasible segment reversals (first improvement, best-delta order)."""
+    d = instance.durations
+    route = np.asarray(route, dtype=np.int64)
+    for _ in range(max_passes):
+        n = route.shape[0]
+        if n < 3:
+            return route
+        path = np.concatenate(([DEPOT], route, [DEPOT]))
+        # Reversing path[i..j] (1 <= i < j <= n) replaces edges (i-1, i) and (j, j+1).
+        i, j = np.triu_indices(n, k=1)
+        i, j = i + 1, j + 1
+        delta = d[path[i - 1], path[j]] + d[path[i], path[j + 1]] - d[path[i - 1], path[i]] - d[path[j], path[j + 1]]
+        order = np.argsort(delta)
+        current = route_cost(d, route)
+        improved = False
+        for k in order[delta[order] < -1e-9]:
+            a, b = i[k] - 1, j[k]  # route positions
+            candidate = np.concatenate((route[:a], route[a:b][::-1], route[b:]))
+            if route_cost(d, candidate) < current - 1e-9 and route_is_feasible(instance, candidate):
+                route, improved = candidate, True
+                break
+        if not improved:
+            break
+    return route
+
+
+MODES = ("greedy", "local_search", "alns")
+
+
+def solve(instance: RoutingInstance, mode: str = "local_search", **options) -> Solution:
+    """Solve ``instance`` with the given mode; ``options`` are passed to the ALNS mode."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown solver mode {mode!r}; expected one of {list(MODES)}.")
+    routes = greedy_routes(instance)
+    stats = {}
+    if mode in ("local_search", "alns"):
+        routes = [two_opt(instance, route) for route in routes]
+    if mode == "alns" and instance.size > 2:
+        routes, stats = solve_alns(instance, routes, **options)
+        routes = [two_opt(instance, route) for route in routes]
+    objective = sum(route_cost(instance.durations, route) for route in routes)
+    return Solution(routes=routes, objective=objective, mode=mode, stats=stats)
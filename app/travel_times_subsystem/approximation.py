@@ -0,0 +1,169 @@
+"""Geometric travel time approximation for quick "what-if" solves.
+
+Road distance = great-circle distance × detour factor of the origin's region;
+travel time is road distance ÷ the speed of its distance band, interpolated
+between band midpoints so that a longer trip never takes less time. Detour
+factors and band speeds are fitted from cached provider observations (medians,
+so a few odd routes do not skew them) and fall back to urban defaults where there is no data. A full
+matrix for thousands of points is one vectorized pass.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+
+from app.models.delivery_points import DeliveryPoint
+from app.models.travel_times import TravelTime
+from app.travel_times_subsystem.geometry import EARTH_RADIUS_M, geohash_bounds, geohash_cells, haversine, haversine_matrix
+
+DEFAULT_DETOUR = 1.3
+# Road distance bands (m) and default speeds (m/s): short urban hops are slow, long trips use faster roads.
+SPEED_BANDS_M = np.array([1_000.0, 3_000.0, 10_000.0, 30_000.0])
+DEFAULT_SPEEDS = np.array([5.0, 7.0, 9.0, 13.0, 20.0])
+# Distance each band's speed applies at exactly: the band midpoints, and twice the last edge for the open-ended band.
+SPEED_ANCHORS_M = np.array([500.0, 2_000.0, 6_500.0, 20_000.0, 60_000.0])
+REGION_BITS = 15  # 3-character geohash, roughly 150 km × 150 km
+MIN_SAMPLES = 20
+
+
+def equirectangular_matrix(origins: np.ndarray, destinations: np.ndarray | None = None) -> np.ndarray:
+    """Equirectangular distance in meters between every origin and destination; cheaper than haversine, fine within a city."""
+    origins = np.radians(np.asarray(origins, dtype=np.float64))
+    destinations = origins if destinations is None else np.radians(np.asarray(destinations, dtype=np.float64))
+    mean_lat = (origins[:, 0, None] + destinations[None, :, 0]) / 2
+    x = (destinations[None, :, 1] - origins[:, 1, None]) * np.cos(mean_lat)
+    y = destinations[None, :, 0] - origins[:, 0, None]
+    return EARTH_RADIUS_M * np.hypot(x, y)
+
+
+DISTANCE_METHODS = {"haversine": haversine_matrix, "equirectangular": equirectangular_matrix}
+
+
+@dataclass
+class Samples:
+    """Observed trips: endpoints (k, 2), road distance (m, NaN if unknown) and duration (s)."""
+
+    origins: np.ndarray
+    destinations: np.ndarray
+    distances: np.ndarray
+    durations: np.ndarray
+
+
+def load_samples(engine: Engine) -> Samples:
+    """Cached observations with both endpoints' coordinates, in one select."""
+    origin = aliased(DeliveryPoint)
+    destination = aliased(DeliveryPoint)
+    stmt = (
+        select(origin.latitude, origin.longitude, destination.latitude, destination.longitude,
+               TravelTime.distance_m, TravelTime.duration_s)
+        .join(origin, origin.id == TravelTime.origin_id)
+        .join(destination, destination.id == TravelTime.destination_id)
+        .where(origin.latitude.is_not(None), destination.latitude.is_not(None))
+        .where(TravelTime.duration_s > 0)
+    )
+    with engine.connect() as conn:
+        data = np.array(conn.execute(stmt).all(), dtype=np.float64).reshape(-1, 6)
+    return Samples(data[:, 0:2], data[:, 2:4], data[:, 4], data[:, 5])
+
+
+def region_of(coords: np.ndarray) -> np.ndarray:
+    return geohash_cells(coords, REGION_BITS)
+
+
+def region_bounds(region: int) -> tuple[float, float, float, float]:
+    """``(lat_min, lat_max, lon_min, lon_max)`` of a region cell."""
+    return geohash_bounds(region, REGION_BITS)
+
+
+@dataclass
+class ApproximationModel:
+    """Per-region detour factors and a speed per road distance band."""
+
+    detours: dict[int, float] = field(default_factory=dict)
+    default_detour: float = DEFAULT_DETOUR
+    speeds: np.ndarray = field(default_factory=lambda: DEFAULT_SPEEDS.copy())
+    method: str = "haversine"
+    report: dict = field(default_factory=dict)
+
+    @classmethod
+    def fit(cls, samples: Samples, method: str = "haversine") -> "ApproximationModel":
+        """Fit detours and speeds from ``samples`` and attach an error report on those samples."""
+        model = cls(method=method)
+        great_circle = haversine(samples.origins, samples.destinations)
+        usable = great_circle > 50.0  # same-building hops say nothing about detours
+        with_distance = usable & ~np.isnan(samples.distances)
+
+        regions = region_of(samples.origins)
+        ratios = samples.distances / np.where(usable, great_circle, np.nan)
+        if with_distance.sum() >= MIN_SAMPLES:
+            model.default_detour = float(np.median(ratios[with_distance]))
+        for region in np.unique(regions[with_distance]):
+            in_region = with_distance & (regions == region)
+            if in_region.sum() >= MIN_SAMPLES:
+                model.detours[int(region)] = float(np.median(ratios[in_region]))
+
+        road = np.where(with_distance, samples.distances, great_circle * model._detour(samples.origins))
+        bands = np.searchsorted(SPEED_BANDS_M, road)
+        speeds = road / samples.durations
+        for band in range(DEFAULT_SPEEDS.size):
+            in_band = usable & (bands == band)
+            if in_band.sum() >= MIN_SAMPLES:
+                model.speeds[band] = float(np.median(speeds[in_band]))
+        # Longer trips use faster roads: a slow outlier band must not slow down every trip beyond it.
+        model.speeds = np.maximum.accumulate(model.speeds)
+
+        model.report = model.error_report(samples)
+        return model
+
+    def _detour(self, origins: np.ndarray) -> np.ndarray:
+        if not self.detours:
+            return np.full(np.shape(origins)[:-1], self.default_detour)
+        regions = region_of(origins)
+        keys = np.fromiter(self.detours.keys(), dtype=np.int64)
+        values = np.fromiter(self.detours.values(), dtype=np.float64)
+        order = np.argsort(keys)
+        keys, values = keys[order], values[order]
+        position = np.clip(np.searchsorted(keys, regions), 0, keys.size - 1)
+        return np.where(keys[position] == regions, values[position], self.default_detour)
+
+    def _durations(self, great_circle: np.ndarray, detour: np.ndarray) -> np.ndarray:
+        road = great_circle * detour
+        # Piecewise linear through each band's anchor and non-decreasing: with a speed per band
+        # taken stepwise, 2999 m at 5 m/s would take longer than 3001 m at 7 m/s.
+        anchors = np.concatenate(([0.0], SPEED_ANCHORS_M))
+        times = np.maximum.accumulate(np.concatenate(([0.0], SPEED_ANCHORS_M / self.speeds)))
+        beyond = times[-1] + (road - anchors[-1]) / self.speeds[-1]
+        return np.where(road > anchors[-1], beyond, np.interp(road, anchors, times))
+
+    def matrix(self, coords: np.ndarray, destinations: np.ndarray | None = None) -> np.ndarray:
+        """(n, n) approximate travel times in seconds for ``coords`` (lat, lon), or (n, m) to ``destinations``."""
+        coords = np.asarray(coords, dtype=np.float64)
+        great_circle = DISTANCE_METHODS[self.method](coords, destinations)
+        return self._durations(great_circle, self._detour(coords)[:, None])
+
+    def distance_matrix(self, coords: np.ndarray, destinations: np.ndarray | None = None) -> np.ndarray:
+        """Approximate road distances in meters (great-circle × detour), same shapes as ``matrix``."""
+        coords = np.asarray(coords, dtype=np.float64)
+        return DISTANCE_METHODS[self.method](coords, destinations) * self._detour(coords)[:, None]
+
+    def predict(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """Approximate travel times for aligned (k, 2) origin/destination arrays."""
+        return self._durations(haversine(origins, destinations), self._detour(np.asarray(origins, dtype=np.float64)))
+
+    def error_report(self, samples: Samples) -> dict:
+        """Relative error of the approximation against observed durations."""
+        predicted = self.predict(samples.origins, samples.destinations)
+        valid = samples.durations > 0
+        relative = (predicted[valid] - samples.durations[valid]) / samples.durations[valid]
+        if relative.size == 0:
+            return {"samples": 0}
+        return {
+            "samples": int(relative.size),
+            "mape": float(np.mean(np.abs(relative))),
+            "median_abs_error": float(np.median(np.abs(relative))),
+            "p90_abs_error": float(np.percentile(np.abs(relative), 90)),
+            "bias": float(np.mean(relative)),
+        }
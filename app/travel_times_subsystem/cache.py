@@ -0,0 +1,172 @@
+"""Lookup/store cached travel times (table ``travel_times``).
+
+Reads and writes are set-based: one upsert per batch of observations and one
+select per profile, packed straight into NumPy arrays. Pairs the provider has
+no route for are stored with ``duration_s = NO_ROUTE`` (a negative cache, so they
+are not refetched while fresh) and read back as missing.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from app.models.travel_times import BUCKET_SECONDS, TravelTime
+from app.travel_times_subsystem.profiles import TravelTimeProfile
+
+# Pairs per statement in ``load_pairs`` (two bound parameters each).
+PAIR_CHUNK_SIZE = 400
+# ``duration_s`` of a pair the provider has no route for.
+NO_ROUTE = -1.0
+
+
+def _upsert(engine: Engine):
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(engine.dialect.name)
+    if dialect is None:
+        raise NotImplementedError(f"Travel time upserts are not implemented for {engine.dialect.name}.")
+    stmt = dialect.insert(TravelTime)
+    return stmt.on_conflict_do_update(
+        index_elements=[TravelTime.origin_id, TravelTime.destination_id, TravelTime.time_bucket],
+        set_={
+            "duration_s": stmt.excluded.duration_s,
+            "distance_m": stmt.excluded.distance_m,
+            "source": stmt.excluded.source,
+            "observed_at": stmt.excluded.observed_at,
+        },
+    )
+
+
+def store_matrix(
+    engine: Engine,
+    ids: np.ndarray,
+    time_bucket: int,
+    durations: np.ndarray,
+    distances: np.ndarray | None = None,
+    source: str = "google",
+    destination_ids: np.ndarray | None = None,
+    no_route: np.ndarray | None = None,
+) -> int:
+    """Upsert an (origins × destinations) matrix observed in ``time_bucket``; NaN cells and the diagonal are skipped.
+
+    Cells set in the boolean mask ``no_route`` are stored as ``NO_ROUTE`` markers instead.
+    Returns the number of rows written.
+    """
+    origin_ids = np.asarray(ids, dtype=np.int64)
+    destination_ids = origin_ids if destination_ids is None else np.asarray(destination_ids, dtype=np.int64)
+    durations = np.asarray(durations, dtype=np.float64)
+    if no_route is not None:
+        durations = np.where(no_route, NO_ROUTE, durations)
+    distances = np.full(durations.shape, np.nan) if distances is None else np.asarray(distances, dtype=np.float64)
+    o, d = np.nonzero(~np.isnan(durations) & (origin_ids[:, None] != destination_ids[None, :]))
+    if o.size == 0:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "origin_id": int(oi),
+            "destination_id": int(di),
+            "time_bucket": time_bucket,
+            "duration_s": float(dur),
+            "distance_m": None if np.isnan(dist) else float(dist),
+            "source": source,
+            "observed_at": now,
+        }
+        for oi, di, dur, dist in zip(origin_ids[o], destination_ids[d], durations[o, d], distances[o, d])
+    ]
+    with engine.begin() as conn:
+        conn.execute(_upsert(engine), rows)
+    return len(rows)
+
+
+def load_durations(engine: Engine, ids, buckets: range) -> np.ndarray:
+    """Cached durations as an (n, n, len(buckets)) array over ``ids`` (NaN where missing, 0 on the diagonal)."""
+    ids = np.asarray(ids, dtype=np.int64)
+    n = ids.shape[0]
+    values = np.full((n, n, len(buckets)), np.nan)
+    if n == 0 or len(buckets) == 0:
+        return values
+    id_list = ids.tolist()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(TravelTime.origin_id, TravelTime.destination_id, TravelTime.time_bucket, TravelTime.duration_s)
+            .where(TravelTime.origin_id.in_(id_list))
+            .where(TravelTime.destination_id.in_(id_list))
+            .where(TravelTime.time_bucket >= buckets.start, TravelTime.time_bucket < buckets.stop)
+            .where(TravelTime.duration_s >= 0)
+        ).all()
+    if rows:
+        origin, destination, bucket, duration = (np.array(col) for col in zip(*rows))
+        order = np.argsort(ids)
+        o = order[np.searchsorted(ids, origin, sorter=order)]
+        d = order[np.searchsorted(ids, destination, sorter=order)]
+        values[o, d, bucket.astype(np.int64) - buckets.start] = duration
+    values[np.arange(n), np.arange(n), :] = 0.0
+    return values
+
+
+def load_block(engine: Engine, origin_ids, destination_ids, time_bucket: int, column=TravelTime.duration_s) -> np.ndarray:
+    """Cached (origins × destinations) durations in one bucket; NaN where missing, 0 where origin == destination.
+
+    Pass ``column=TravelTime.distance_m`` for road distances instead.
+    """
+    origin_ids = np.asarray(origin_ids, dtype=np.int64)
+    destination_ids = np.asarray(destination_ids, dtype=np.int64)
+    values = np.where(origin_ids[:, None] == destination_ids[None, :], 0.0, np.nan)
+    if values.size == 0:
+        return values
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(TravelTime.origin_id, TravelTime.destination_id, column)
+            .where(TravelTime.origin_id.in_(np.unique(origin_ids).tolist()))
+            .where(TravelTime.destination_id.in_(np.unique(destination_ids).tolist()))
+            .where(TravelTime.time_bucket == time_bucket)
+            .where(column.is_not(None), TravelTime.duration_s >= 0)
+        ).all()
+    if rows:
+        origin, destination, duration = (np.array(col, dtype=np.float64) for col in zip(*rows))
+        origin, destination = origin.astype(np.int64), destination.astype(np.int64)
+        o_order = np.argsort(origin_ids)
+        d_order = np.argsort(destination_ids)
+        o = o_order[np.searchsorted(origin_ids, origin, sorter=o_order)]
+        d = d_order[np.searchsorted(destination_ids, destination, sorter=d_order)]
+        values[o, d] = duration
+    return values
+
+
+def load_profile(engine: Engine, ids, buckets: range) -> TravelTimeProfile:
+    """Build a time-dependent profile over ``ids`` from the cache; node i is ``ids[i]``."""
+    return TravelTimeProfile(load_durations(engine, ids, buckets), first_bucket=buckets.start, bucket_seconds=BUCKET_SECONDS)
+
+
+def load_pairs(engine: Engine, origin_ids, destination_ids, time_bucket: int) -> np.ndarray:
+    """Cached durations for aligned (origin, destination) id pairs in one bucket; NaN where missing.
+
+    Selects only the requested pairs (row-value ``IN``, ``PAIR_CHUNK_SIZE`` per
+    statement), not the cross product of their origins and destinations.
+    """
+    origin_ids = np.asarray(origin_ids, dtype=np.int64)
+    destination_ids = np.asarray(destination_ids, dtype=np.int64)
+    result = np.where(origin_ids == destination_ids, 0.0, np.nan)
+    wanted = origin_ids != destination_ids
+    if not wanted.any():
+        return result
+    pairs, inverse = np.unique(np.column_stack((origin_ids[wanted], destination_ids[wanted])), axis=0, return_inverse=True)
+    values = np.full(pairs.shape[0], np.nan)
+    width = int(pairs[:, 1].max()) + 1
+    keys = pairs[:, 0] * width + pairs[:, 1]  # sorted, like the unique pairs
+    with engine.connect() as conn:
+        for start in range(0, pairs.shape[0], PAIR_CHUNK_SIZE):
+            chunk = pairs[start:start + PAIR_CHUNK_SIZE].tolist()
+            rows = conn.execute(
+                select(TravelTime.origin_id, TravelTime.destination_id, TravelTime.duration_s)
+                .where(tuple_(TravelTime.origin_id, TravelTime.destination_id).in_(chunk))
+                .where(TravelTime.time_bucket == time_bucket, TravelTime.duration_s >= 0)
+            ).all()
+            if rows:
+                origin, destination, duration = (np.array(col, dtype=np.float64) for col in zip(*rows))
+                found = origin.astype(np.int64) * width + destination.astype(np.int64)
+                values[np.searchsorted(keys, found)] = duration
+    result[wanted] = values[inverse.ravel()]
+    return result
@@ -0,0 +1,303 @@
+"""Google Maps Distance Matrix client (asyncio, batched).
+
+An N×M matrix is tiled into provider-sized origin/destination blocks that are
+fetched concurrently over one pooled ``httpx.AsyncClient``, under a token-bucket
+rate limit on elements and an overall element quota. The quota for the whole
+matrix is reserved before the first request, so a matrix never fails halfway for
+lack of quota. Failed blocks are retried with exponential backoff and full
+jitter; a block that still fails cancels the matrix's pending blocks. Identical
+blocks requested concurrently share one in-flight request.
+"""
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+
+import httpx
+import numpy as np
+
+from app.config import settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class QuotaExceeded(RuntimeError):
+    """The element quota cannot cover the requested matrix."""
+
+
+class ProviderError(RuntimeError):
+    """The provider kept failing after all retries, or answered with an error status."""
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}.")
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class QuotaBudget:
+    """Element budget shared by every request made through one client (None = unlimited).
+
+    ``used`` counts billed elements; ``reserved`` those set aside for matrices in
+    progress, released when they finish.
+    """
+
+    def __init__(self, max_elements: int | None = None):
+        self.max_elements = max_elements
+        self.used = 0
+        self.reserved = 0
+
+    @property
+    def remaining(self) -> float:
+        return math.inf if self.max_elements is None else self.max_elements - self.used - self.reserved
+
+    def reserve(self, elements: int):
+        if elements > self.remaining:
+            raise QuotaExceeded(f"Need {elements} elements, {self.remaining} left in quota.")
+        self.reserved += elements
+
+    def release(self, elements: int):
+        self.reserved -= elements
+
+    def charge(self, elements: int):
+        self.used += elements
+
+
+@dataclass
+class ProviderMetrics:
+    requests: int = 0
+    retries: int = 0
+    elements: int = 0
+    deduplicated: int = 0
+    seconds: float = 0.0
+    cost_per_element: float = 0.0
+
+    @property
+    def elements_per_second(self) -> float:
+        return self.elements / self.seconds if self.seconds else 0.0
+
+    @property
+    def cost(self) -> float:
+        return self.elements * self.cost_per_element
+
+
+@dataclass
+class MatrixResult:
+    """Travel durations (s) and distances (m), shape (n_origins, n_destinations); NaN where the provider had no route."""
+
+    durations: np.ndarray
+    distances: np.ndarray
+    elements: int
+    cost: float
+
+
+def tile(n_origins: int, n_destinations: int, max_origins: int, max_destinations: int, max_elements: int):
+    """Split an n×m matrix into (origin slice, destination slice) blocks within provider limits."""
+    o_block = max(1, min(max_origins, n_origins, max_elements))
+    d_block = max(1, min(max_destinations, n_destinations, max_elements // o_block))
+    return [
+        (slice(o, min(o + o_block, n_origins)), slice(d, min(d + d_block, n_destinations)))
+        for o in range(0, n_origins, o_block)
+        for d in range(0, n_destinations, d_block)
+    ]
+
+
+def _format_points(points: np.ndarray) -> str:
+    return "|".join(f"{lat:.6f},{lon:.6f}" for lat, lon in points)
+
+
+class GoogleMapsClient:
+    """Async Distance Matrix client; use as ``async with GoogleMapsClient() as maps: ...``.
+
+    ``transport`` can be replaced (e.g. ``httpx.MockTransport``) to run against a mock server.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_origins: int = 25,
+        max_destinations: int = 25,
+        max_elements: int = 100,
+        elements_per_second: float | None = None,
+        quota_elements: int | None = None,
+        max_concurrency: int = 8,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        cost_per_element: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float = 30.0,
+    ):
+        self.api_key = api_key if api_key is not None else settings.google_maps_api_key
+        self.max_origins = max_origins
+        self.max_destinations = max_destinations
+        self.max_elements = max_elements
+        rate = elements_per_second or settings.google_maps_elements_per_second
+        self.bucket = TokenBucket(rate=rate, capacity=max(rate, max_elements))
+        self.quota = QuotaBudget(quota_elements if quota_elements is not None else settings.google_maps_quota_elements)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = ProviderMetrics(
+            cost_per_element=cost_per_element if cost_per_element is not None else settings.google_maps_cost_per_element
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Shared block requests and how many callers are waiting on each.
+        self._inflight: dict[tuple, list] = {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url or settings.google_maps_base_url,
+            transport=transport,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def fetch_matrix(
+        self,
+        origins: np.ndarray,
+        destinations: np.ndarray | None = None,
+        departure_time: int | None = None,
+    ) -> MatrixResult:
+        """Fetch the full origins×destinations matrix of (lat, lon) points.
+
+        ``departure_time`` is a Unix timestamp for traffic-aware durations. Raises
+        QuotaExceeded up front when the quota cannot cover every element, and the
+        first ProviderError of any block (the other blocks are cancelled).
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        destinations = origins if destinations is None else np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        n, m = origins.shape[0], destinations.shape[0]
+        durations = np.full((n, m), np.nan)
+        distances = np.full((n, m), np.nan)
+        if n == 0 or m == 0:
+            return MatrixResult(durations, distances, 0, 0.0)
+
+        blocks = tile(n, m, self.max_origins, self.max_destinations, self.max_elements)
+        self.quota.reserve(n * m)
+        started = time.perf_counter()
+        before = self.metrics.elements
+
+        async def run_block(o_slice, d_slice):
+            block_durations, block_distances = await self._block(origins[o_slice], destinations[d_slice], departure_time)
+            durations[o_slice, d_slice] = block_durations
+            distances[o_slice, d_slice] = block_distances
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for o_slice, d_slice in blocks:
+                    group.create_task(run_block(o_slice, d_slice))
+        except BaseExceptionGroup as errors:
+            raise errors.exceptions[0]
+        finally:
+            self.quota.release(n * m)
+            self.metrics.seconds += time.perf_counter() - started
+        elements = self.metrics.elements - before
+        return MatrixResult(durations, distances, elements, elements * self.metrics.cost_per_element)
+
+    async def _block(self, origins: np.ndarray, destinations: np.ndarray, departure_time: int | None):
+        """One provider request, shared with any identical request already in flight.
+
+        The request is cancelled once no caller waits for it any more.
+        """
+        key = (origins.tobytes(), destinations.tobytes(), departure_time)
+        entry = self._inflight.get(key)
+        if entry is not None:
+            self.metrics.deduplicated += 1
+        else:
+            task = asyncio.ensure_future(self._fetch_block(origins, destinations, departure_time))
+            entry = self._inflight[key] = [task, 0]
+
+            def forget(_):
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                self._inflight.pop(key, None)
+                entry[0].cancel()
+
+    async def _fetch_block(self, origins: np.ndarray, destinations: np.ndarray, departure_time: int | None):
+        """Request one block, retrying; its elements are charged to the quota once the provider answers OK."""
+        elements = origins.shape[0] * destinations.shape[0]
+        params = {
+            "origins": _format_points(origins),
+            "destinations": _format_points(destinations),
+            "key": self.api_key,
+        }
+        if departure_time is not None:
+            params["departure_time"] = str(departure_time)
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire(elements)
+                self.metrics.requests += 1
+                try:
+                    response = await self._http.get("/maps/api/distancematrix/json", params=params)
+                except httpx.TransportError as exc:
+                    error = f"transport error: {exc!r}"
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        try:
+                            response.raise_for_status()
+                        except httpx.HTTPStatusError as exc:
+                            raise ProviderError(f"HTTP {response.status_code}: {response.text[:200]}") from exc
+                        body = response.json()
+                        if body.get("status", "OK") == "OK":
+                            self.metrics.elements += elements
+                            self.quota.charge(elements)
+                            return self._parse(body, origins.shape[0], destinations.shape[0])
+                        if body.get("status") != "OVER_QUERY_LIMIT":
+                            raise ProviderError(f"Provider status {body.get('status')}: {body.get('error_message', '')}")
+                    error = f"HTTP {response.status_code}"
+                if attempt < self.max_retries:
+                    self.metrics.retries += 1
+                    # Full jitter: uniform in [0, capped exponential backoff].
+                    await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+        raise ProviderError(f"Giving up after {self.max_retries + 1} attempts ({error}).")
+
+    @staticmethod
+    def _parse(body: dict, n: int, m: int):
+        durations = np.full((n, m), np.nan)
+        distances = np.full((n, m), np.nan)
+        for i, row in enumerate(body.get("rows", [])[:n]):
+            for j, element in enumerate(row.get("elements", [])[:m]):
+                if element.get("status") != "OK":
+                    continue
+                duration = element.get("duration_in_traffic") or element.get("duration")
+                durations[i, j] = duration["value"]
+                distances[i, j] = element["distance"]["value"]
+        return durations, distances
@@ -0,0 +1,121 @@
+"""Vectorized great-circle geometry on (latitude, longitude) arrays in degrees."""
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def haversine_matrix(origins: np.ndarray, destinations: np.ndarray | None = None) -> np.ndarray:
+    """Great-circle distance in meters between every origin and destination.
+
+    ``origins`` is (n, 2) and ``destinations`` (m, 2) of (lat, lon); returns (n, m).
+    With one argument the square origin×origin matrix is returned.
+    """
+    origins = np.radians(np.asarray(origins, dtype=np.float64))
+    destinations = origins if destinations is None else np.radians(np.asarray(destinations, dtype=np.float64))
+    lat1 = origins[:, 0, None]
+    lat2 = destinations[None, :, 0]
+    dlat = lat2 - lat1
+    dlon = destinations[None, :, 1] - origins[:, 1, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distance in meters for aligned (k, 2) origin/destination arrays."""
+    o = np.radians(np.asarray(origins, dtype=np.float64))
+    d = np.radians(np.asarray(destinations, dtype=np.float64))
+    dlat = d[..., 0] - o[..., 0]
+    dlon = d[..., 1] - o[..., 1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(o[..., 0]) * np.cos(d[..., 0]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def initial_bearing(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Initial great-circle bearing in radians (0 = north, clockwise) for aligned (k, 2) arrays."""
+    o = np.radians(np.asarray(origins, dtype=np.float64))
+    d = np.radians(np.asarray(destinations, dtype=np.float64))
+    dlon = d[..., 1] - o[..., 1]
+    x = np.sin(dlon) * np.cos(d[..., 0])
+    y = np.cos(o[..., 0]) * np.sin(d[..., 0]) - np.sin(o[..., 0]) * np.cos(d[..., 0]) * np.cos(dlon)
+    return np.arctan2(x, y)
+
+
+def geohash_cells(coords: np.ndarray, bits: int = 25) -> np.ndarray:
+    """Integer geohash of (lat, lon) rows: ``bits`` interleaved bits, longitude first (as in base32 geohash).
+
+    25 bits matches a 5-character geohash (cells of roughly 5 km × 5 km).
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    lat = np.clip((coords[..., 0] + 90.0) / 180.0, 0, 1 - 1e-12)
+    lon = np.clip((coords[..., 1] + 180.0) / 360.0, 0, 1 - 1e-12)
+    lat_q = (lat * (1 << lat_bits)).astype(np.int64)
+    lon_q = (lon * (1 << lon_bits)).astype(np.int64)
+    cells = np.zeros(lat_q.shape, dtype=np.int64)
+    for i in range(bits):
+        if i % 2 == 0:
+            bit = (lon_q >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (lat_q >> (lat_bits - 1 - i // 2)) & 1
+        cells = (cells << 1) | bit
+    return cells
+
+
+def geohash_bounds(cell: int, bits: int = 25) -> tuple[float, float, float, float]:
+    """``(lat_min, lat_max, lon_min, lon_max)`` of a ``geohash_cells`` cell, e.g. for a bounding-box query."""
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    lat_q = lon_q = 0
+    for i in range(bits):
+        bit = (int(cell) >> (bits - 1 - i)) & 1
+        if i % 2 == 0:
+            lon_q = (lon_q << 1) | bit
+        else:
+            lat_q = (lat_q << 1) | bit
+    lat_size = 180.0 / (1 << lat_bits)
+    lon_size = 360.0 / (1 << lon_bits)
+    return -90.0 + lat_q * lat_size, -90.0 + (lat_q + 1) * lat_size, -180.0 + lon_q * lon_size, -180.0 + (lon_q + 1) * lon_size
+
+
+def close_pairs(coords: np.ndarray, radius_m: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Index pairs ``(i, j)`` with ``i < j`` of (lat, lon) rows within ``radius_m``, and their distances.
+
+    Spatial hashing: points are placed on the sphere in 3-D and bucketed into cubes
+    of side ``radius_m``; only points in the same or adjacent cubes are compared, so
+    the work grows with the number of points rather than its square (for bounded
+    density). Works across the antimeridian and near the poles.
+    """
+    coords = np.radians(np.asarray(coords, dtype=np.float64))
+    lat, lon = coords[:, 0], coords[:, 1]
+    xyz = EARTH_RADIUS_M * np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+    cells = np.floor(xyz / radius_m).astype(np.int64)
+    bias = 1 << 20
+    if np.abs(cells).max(initial=0) >= bias - 1:
+        raise ValueError("radius_m is too small for spatial hashing.")
+
+    def key(c):
+        return ((c[:, 0] + bias) << 42) | ((c[:, 1] + bias) << 21) | (c[:, 2] + bias)
+
+    keys = key(cells)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    firsts, seconds = [], []
+    offsets = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing="ij"), axis=-1).reshape(-1, 3)
+    for offset in offsets:
+        target = key(cells + offset)
+        lo = np.searchsorted(sorted_keys, target, side="left")
+        counts = np.searchsorted(sorted_keys, target, side="right") - lo
+        first = np.repeat(np.arange(coords.shape[0]), counts)
+        # Position within each point's run of neighbours: running index minus the run's start.
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        second = order[np.repeat(lo, counts) + np.arange(first.size) - starts]
+        keep = first < second
+        firsts.append(first[keep])
+        seconds.append(second[keep])
+    i = np.concatenate(firsts)
+    j = np.concatenate(seconds)
+    distance = haversine(np.degrees(coords[i]), np.degrees(coords[j]))
+    near = distance <= radius_m
+    return i[near], j[near], distance[near]
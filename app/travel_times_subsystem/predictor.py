@@ -0,0 +1,241 @@
+"""Travel time predictor trained from cached observations.
+
+A ridge regression on log travel time with:
+- distance terms (haversine km, its log and square root),
+- bearing (sin/cos) and time of day (two cyclic harmonics of the bucket),
+- one learned offset per origin geohash cell and per destination geohash cell
+  (cells hashed into ``n_cells`` slots).
+
+Training accumulates the normal equations in closed form (cell one-hots via
+bincount), so it scales linearly with the number of observations. Prediction of
+an entire N×N matrix is one batch of array operations. Each prediction comes
+with a log-space standard deviation: the training residual spread for its
+distance band, inflated for cells with few observations, so callers can send only
+uncertain pairs to the paid provider.
+
+Once ``travel_times.train_predictor`` has saved a model, ``load_predictor`` hands
+it to ``TravelTimeService`` (cache gaps are filled with its predictions instead of
+the geometric approximation) and to the nightly precompute (only matrix rows
+with uncertain pairs are fetched).
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.models.delivery_points import DeliveryPoint
+from app.models.travel_times import BUCKETS_PER_DAY, TravelTime
+from app.travel_times_subsystem.geometry import geohash_cells, haversine, haversine_matrix, initial_bearing
+
+N_DENSE = 10  # see _dense_features
+DISTANCE_BANDS_KM = np.array([0.5, 1, 2, 5, 10, 20, 50])
+HASH_MULTIPLIER = 0x9E3779B1
+
+
+@dataclass
+class Observations:
+    """Training rows: origin/destination (lat, lon) of shape (k, 2), bucket and duration in seconds of shape (k,)."""
+
+    origins: np.ndarray
+    destinations: np.ndarray
+    buckets: np.ndarray
+    durations: np.ndarray
+
+    def __len__(self):
+        return int(self.durations.shape[0])
+
+
+def load_observations(engine: Engine, source: str | None = None) -> Observations:
+    """Cached travel times joined to both endpoints' coordinates, in one select."""
+    origin = aliased(DeliveryPoint)
+    destination = aliased(DeliveryPoint)
+    stmt = (
+        select(origin.latitude, origin.longitude, destination.latitude, destination.longitude,
+               TravelTime.time_bucket, TravelTime.duration_s)
+        .join(origin, origin.id == TravelTime.origin_id)
+        .join(destination, destination.id == TravelTime.destination_id)
+        .where(origin.latitude.is_not(None), destination.latitude.is_not(None))
+        .where(TravelTime.duration_s > 0)
+    )
+    if source is not None:
+        stmt = stmt.where(TravelTime.source == source)
+    with engine.connect() as conn:
+        rows = conn.execute(stmt).all()
+    data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    return Observations(
+        origins=data[:, 0:2],
+        destinations=data[:, 2:4],
+        buckets=data[:, 4].astype(np.int64),
+        durations=data[:, 5],
+    )
+
+
+def _dense_features(km: np.ndarray, bearing: np.ndarray, buckets) -> np.ndarray:
+    """(..., N_DENSE) feature array from distances (km), bearings (rad) and time buckets."""
+    phase = 2 * np.pi * np.asarray(buckets, dtype=np.float64) / BUCKETS_PER_DAY
+    features = np.empty(km.shape + (N_DENSE,))
+    features[..., 0] = 1.0
+    features[..., 1] = km
+    features[..., 2] = np.log1p(km)
+    features[..., 3] = np.sqrt(km)
+    features[..., 4] = np.sin(bearing)
+    features[..., 5] = np.cos(bearing)
+    # Cyclic harmonics of the time of day; the morning/evening peaks need the second one.
+    features[..., 6] = np.sin(phase)
+    features[..., 7] = np.cos(phase)
+    features[..., 8] = np.sin(2 * phase)
+    features[..., 9] = np.cos(2 * phase)
+    return features
+
+
+class TravelTimePredictor:
+    """Fitted model; use ``fit`` to train, ``predict`` / ``predict_matrix`` for inference."""
+
+    def __init__(self, n_cells: int = 256, geohash_bits: int = 25, ridge: float = 1.0, support_scale: float = 5.0):
+        self.n_cells = n_cells
+        self.geohash_bits = geohash_bits
+        self.ridge = ridge
+        self.support_scale = support_scale
+        self.weights: np.ndarray | None = None
+        self.band_sigma: np.ndarray | None = None
+        self.cell_counts: np.ndarray | None = None
+        self.n_observations = 0
+
+    def _cells(self, coords: np.ndarray) -> np.ndarray:
+        cells = geohash_cells(coords, self.geohash_bits).astype(np.uint64)
+        return ((cells * np.uint64(HASH_MULTIPLIER)) >> np.uint64(7)).astype(np.int64) % self.n_cells
+
+    def fit(self, observations: Observations) -> dict:
+        """Fit on ``observations``; returns training metrics (rmse in log space, MAPE)."""
+        if len(observations) == 0:
+            raise ValueError("No observations to train on.")
+        km = haversine(observations.origins, observations.destinations) / 1000.0
+        bearing = initial_bearing(observations.origins, observations.destinations)
+        dense = _dense_features(km, bearing, observations.buckets)
+        o_cells = self._cells(observations.origins)
+        d_cells = self._cells(observations.destinations) + self.n_cells
+        target = np.log(observations.durations)
+        p = N_DENSE + 2 * self.n_cells
+
+        # Normal equations X^T X w = X^T y with X = [dense | one-hot(origin cell) | one-hot(destination cell)].
+        gram = np.zeros((p, p))
+        gram[:N_DENSE, :N_DENSE] = dense.T @ dense
+        for cells in (o_cells, d_cells):
+            cross = np.stack([np.bincount(cells, weights=dense[:, f], minlength=2 * self.n_cells) for f in range(N_DENSE)])
+            gram[:N_DENSE, N_DENSE:] += cross
+            gram[N_DENSE:, :N_DENSE] += cross.T
+        pair_counts = np.bincount(o_cells * 2 * self.n_cells + d_cells, minlength=(2 * self.n_cells) ** 2)
+        pair_counts = pair_counts.reshape(2 * self.n_cells, 2 * self.n_cells)
+        cell_counts = np.bincount(np.concatenate((o_cells, d_cells)), minlength=2 * self.n_cells)
+        gram[N_DENSE:, N_DENSE:] = pair_counts + pair_counts.T + np.diag(cell_counts)
+        rhs = np.concatenate((
+            dense.T @ target,
+            np.bincount(o_cells, weights=target, minlength=2 * self.n_cells)
+            + np.bincount(d_cells, weights=target, minlength=2 * self.n_cells),
+        ))
+        penalty = np.full(p, self.ridge)
+        penalty[0] = 0.0  # do not shrink the intercept
+        self.weights = np.linalg.solve(gram + np.diag(penalty), rhs)
+        self.cell_counts = cell_counts
+
+        residual = target - self._log_mean(dense, o_cells, d_cells)
+        bands = np.searchsorted(DISTANCE_BANDS_KM, km)
+        sums = np.bincount(bands, weights=residual ** 2, minlength=DISTANCE_BANDS_KM.size + 1)
+        counts = np.bincount(bands, minlength=DISTANCE_BANDS_KM.size + 1)
+        overall = np.sqrt(residual.var()) if residual.size > 1 else 0.0
+        self.band_sigma = np.where(counts > 1, np.sqrt(sums / np.maximum(counts, 1)), overall)
+        self.n_observations = len(observations)
+        return {
+            "observations": self.n_observations,
+            "rmse_log": float(np.sqrt(np.mean(residual ** 2))),
+            "mape": float(np.mean(np.abs(np.expm1(-residual)))),
+        }
+
+    def _log_mean(self, dense, o_cells, d_cells) -> np.ndarray:
+        w = self.weights
+        return dense @ w[:N_DENSE] + w[N_DENSE + o_cells] + w[N_DENSE + d_cells]
+
+    def _predict(self, km, bearing, buckets, o_cells, d_cells) -> tuple[np.ndarray, np.ndarray]:
+        if self.weights is None:
+            raise RuntimeError("Predictor is not fitted.")
+        dense = _dense_features(km, bearing, buckets)
+        d_cells = d_cells + self.n_cells
+        durations = np.exp(self._log_mean(dense, o_cells, d_cells))
+        support = self.support_scale * (1 / (1 + self.cell_counts[o_cells]) + 1 / (1 + self.cell_counts[d_cells]))
+        sigma = self.band_sigma[np.searchsorted(DISTANCE_BANDS_KM, km)] * np.sqrt(1 + support)
+        durations = np.where(km > 0, durations, 0.0)
+        return durations, sigma
+
+    def predict(self, origins, destinations, buckets) -> tuple[np.ndarray, np.ndarray]:
+        """Predicted duration (s) and log-space standard deviation for aligned (k, 2) pairs."""
+        origins = np.asarray(origins, dtype=np.float64)
+        destinations = np.asarray(destinations, dtype=np.float64)
+        km = haversine(origins, destinations) / 1000.0
+        bearing = initial_bearing(origins, destinations)
+        return self._predict(km, bearing, buckets, self._cells(origins), self._cells(destinations))
+
+    def predict_matrix(self, coords: np.ndarray, bucket: int) -> tuple[np.ndarray, np.ndarray]:
+        """(n, n) durations and log-space sigmas for all pairs of ``coords`` in one batch.
+
+        Per-point terms (geohash cells) are computed once and broadcast over the matrix.
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        km = haversine_matrix(coords) / 1000.0
+        bearing = initial_bearing(coords[:, None, :], coords[None, :, :])
+        cells = self._cells(coords)
+        return self._predict(km, bearing, bucket, cells[:, None], cells[None, :])
+
+    def save(self, path: str | Path):
+        """Write the model to ``path`` (.npz) atomically, so readers never see a partial file."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                weights=self.weights,
+                band_sigma=self.band_sigma,
+                cell_counts=self.cell_counts,
+                params=np.array([self.n_cells, self.geohash_bits, self.ridge, self.support_scale, self.n_observations]),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TravelTimePredictor":
+        with np.load(path) as data:
+            n_cells, bits, ridge, support_scale, n_obs = data["params"]
+            model = cls(n_cells=int(n_cells), geohash_bits=int(bits), ridge=float(ridge), support_scale=float(support_scale))
+            model.weights = data["weights"]
+            model.band_sigma = data["band_sigma"]
+            model.cell_counts = data["cell_counts"]
+            model.n_observations = int(n_obs)
+        return model
+
+
+_loaded: dict[Path, tuple[float, TravelTimePredictor]] = {}
+
+
+def load_predictor(path: str | Path | None = None) -> TravelTimePredictor | None:
+    """The saved model at ``path`` (default ``settings.travel_time_model_path``); None until one is trained.
+
+    Kept per process and reloaded when the file changes, so a retrained model is picked up.
+    """
+    path = Path(path or settings.travel_time_model_path)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _loaded[path] = (mtime, TravelTimePredictor.load(path))
+    return cached[1]
+
+
+def uncertain_pairs(sigma: np.ndarray, max_relative_error: float = 0.25) -> np.ndarray:
+    """Mask of pairs whose predicted ~1-sigma relative error exceeds ``max_relative_error``; query these from the provider."""
+    return np.expm1(sigma) > max_relative_error
@@ -0,0 +1,112 @@
+"""Time-dependent travel time profiles.
+
+A profile holds one travel time per (origin, destination, time-of-day bucket)
+in a single 3-D array. Lookups interpolate linearly between bucket centres and
+are vectorized over any number of (origin, destination, departure) triples.
+
+Interpolation preserves FIFO (leaving later never arrives earlier) because the
+constructor caps every drop between consecutive buckets to the bucket width,
+i.e. the travel time slope is never below -1.
+"""
+
+import numpy as np
+
+from app.models.travel_times import BUCKET_SECONDS
+
+
+def _fill_missing(values: np.ndarray) -> np.ndarray:
+    """Fill NaN buckets with the nearest earlier bucket, then the nearest later one, per pair."""
+    values = values.copy()
+    n_buckets = values.shape[-1]
+    positions = np.arange(n_buckets)
+    valid = ~np.isnan(values)
+    # Forward fill: index of the last valid bucket at or before each position.
+    last = np.maximum.accumulate(np.where(valid, positions, -1), axis=-1)
+    # Backward fill for leading gaps: index of the first valid bucket at or after each position.
+    first = np.minimum.accumulate(np.where(valid, positions, n_buckets)[..., ::-1], axis=-1)[..., ::-1]
+    source = np.where(last >= 0, last, first)
+    has_any = source < n_buckets
+    filled = np.take_along_axis(values, np.clip(source, 0, n_buckets - 1), axis=-1)
+    return np.where(has_any, filled, np.nan)
+
+
+def enforce_fifo(values: np.ndarray, bucket_seconds: float) -> np.ndarray:
+    """Lower travel times so no bucket is more than ``bucket_seconds`` above the next one."""
+    values = values.copy()
+    for k in range(values.shape[-1] - 2, -1, -1):
+        np.minimum(values[..., k], values[..., k + 1] + bucket_seconds, out=values[..., k])
+    return values
+
+
+class TravelTimeProfile:
+    """Travel times of shape (n, n, n_buckets) for nodes ``0..n-1``.
+
+    ``first_bucket`` is the time-of-day bucket of ``durations[..., 0]``; departure
+    times are seconds from midnight. Departures before the first or after the last
+    bucket centre use the end values.
+    """
+
+    def __init__(self, durations: np.ndarray, first_bucket: int = 0, bucket_seconds: float = BUCKET_SECONDS):
+        durations = np.asarray(durations, dtype=np.float64)
+        if durations.ndim != 3 or durations.shape[0] != durations.shape[1]:
+            raise ValueError("durations must have shape (n, n, n_buckets).")
+        self.first_bucket = first_bucket
+        self.bucket_seconds = float(bucket_seconds)
+        self.durations = enforce_fifo(_fill_missing(durations), self.bucket_seconds)
+
+    @property
+    def n_buckets(self) -> int:
+        return self.durations.shape[-1]
+
+    @property
+    def bucket_centres(self) -> np.ndarray:
+        return (self.first_bucket + np.arange(self.n_buckets) + 0.5) * self.bucket_seconds
+
+    def travel_time(self, origins, destinations, departure_times) -> np.ndarray:
+        """Travel time for each (origin, destination, departure) triple; inputs broadcast together."""
+        origins, destinations, departure_times = np.broadcast_arrays(
+            np.asarray(origins, dtype=np.int64),
+            np.asarray(destinations, dtype=np.int64),
+            np.asarray(departure_times, dtype=np.float64),
+        )
+        position = departure_times / self.bucket_seconds - 0.5 - self.first_bucket
+        position = np.clip(position, 0.0, self.n_buckets - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, self.n_buckets - 1)
+        weight = position - lower
+        before = self.durations[origins, destinations, lower]
+        after = self.durations[origins, destinations, upper]
+        return before + (after - before) * weight
+
+    def arrival_times(self, origins, destinations, departure_times) -> np.ndarray:
+        return np.asarray(departure_times, dtype=np.float64) + self.travel_time(origins, destinations, departure_times)
+
+    def route_schedules(self, routes: np.ndarray, start_times, service_times=None) -> np.ndarray:
+        """Arrival time at every stop of many routes at once.
+
+        ``routes`` is (R, L) node indices padded with -1, starting at the depot or
+        first stop; ``start_times`` (R,) is the departure from ``routes[:, 0]``.
+        Returns (R, L) arrival times (NaN on padding); legs are evaluated one
+        position at a time across all routes.
+        """
+        routes = np.asarray(routes, dtype=np.int64)
+        n_routes, length = routes.shape
+        service = np.zeros(self.durations.shape[0]) if service_times is None else np.asarray(service_times, dtype=np.float64)
+        arrivals = np.full((n_routes, length), np.nan)
+        arrivals[:, 0] = start_times
+        departure = np.asarray(start_times, dtype=np.float64) + 0.0
+        for k in range(1, length):
+            active = routes[:, k] >= 0
+            if not active.any():
+                break
+            prev, nxt = routes[active, k - 1], routes[active, k]
+            if k > 1:
+                departure[active] = arrivals[active, k - 1] + service[prev]
+            arrivals[active, k] = self.arrival_times(prev, nxt, departure[active])
+        return arrivals
+
+    def static_matrix(self, departure_time: float) -> np.ndarray:
+        """(n, n) matrix of travel times for one departure time."""
+        n = self.durations.shape[0]
+        o, d = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+        return self.travel_time(o, d, departure_time)
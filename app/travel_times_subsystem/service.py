@@ -0,0 +1,136 @@
+"""Single interface to travel times for the solver.
+
+``mode="approximate"`` answers immediately from the geometric approximation;
+``mode="cached"`` uses cached provider observations and fills gaps with the
+trained predictor's estimates, or the approximation while no model has been
+trained (``estimate_matrix``). After an approximate solve, ``verify_routes`` re-prices the final
+routes leg by leg against real (cached) travel times.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from app.models.travel_times import TravelTime
+from app.travel_times_subsystem.approximation import ApproximationModel, load_samples
+from app.travel_times_subsystem.cache import load_block, load_durations, load_pairs
+from app.travel_times_subsystem.predictor import TravelTimePredictor, load_predictor
+
+MODES = ("approximate", "cached")
+
+
+class TravelTimeService:
+    def __init__(
+        self,
+        engine: Engine,
+        approximation: ApproximationModel | None = None,
+        predictor: TravelTimePredictor | None = None,
+    ):
+        self.engine = engine
+        self._approximation = approximation
+        self._predictor = predictor
+
+    @property
+    def approximation(self) -> ApproximationModel:
+        """Approximation fitted from the cache on first use (defaults when the cache is empty)."""
+        if self._approximation is None:
+            self.refit_approximation()
+        return self._approximation
+
+    def refit_approximation(self) -> dict:
+        """Refit detours and speeds from the current cache; returns the error report."""
+        samples = load_samples(self.engine)
+        self._approximation = ApproximationModel.fit(samples) if samples.durations.size else ApproximationModel()
+        return self._approximation.report
+
+    @property
+    def predictor(self) -> TravelTimePredictor | None:
+        """The given predictor, else the one saved at ``settings.travel_time_model_path`` (None until trained)."""
+        return self._predictor if self._predictor is not None else load_predictor()
+
+    def estimate_matrix(self, coords, time_bucket: int) -> np.ndarray:
+        """(n, n) estimated travel times for cache gaps: the predictor's if trained, else the approximation's."""
+        predictor = self.predictor
+        if predictor is None:
+            return self.approximation.matrix(coords)
+        return predictor.predict_matrix(coords, time_bucket)[0]
+
+    def matrix(self, ids, coords, time_bucket: int, mode: str = "cached") -> np.ndarray:
+        """(n, n) travel times in seconds between ``ids`` (with their ``coords``) for one time bucket."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown travel time mode {mode!r}; expected one of {list(MODES)}.")
+        if mode == "approximate":
+            return self.approximation.matrix(coords)
+        cached = load_durations(self.engine, ids, range(time_bucket, time_bucket + 1))[..., 0]
+        return np.where(np.isnan(cached), self.estimate_matrix(coords, time_bucket), cached)
+
+    def distance_matrix(self, ids, coords, time_bucket: int, mode: str = "cached") -> np.ndarray:
+        """(n, n) road distances in meters; cached provider distances where known, else the approximation's."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown travel time mode {mode!r}; expected one of {list(MODES)}.")
+        approximate = self.approximation.distance_matrix(coords)
+        np.fill_diagonal(approximate, 0.0)
+        if mode == "approximate":
+            return approximate
+        cached = load_block(self.engine, ids, ids, time_bucket, column=TravelTime.distance_m)
+        return np.where(np.isnan(cached), approximate, cached)
+
+    def block(self, origin_ids, origin_coords, destination_ids, destination_coords, time_bucket: int, mode: str = "cached") -> np.ndarray:
+        """(n, m) travel times from origins to destinations, e.g. only the rows/columns of newly added points."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown travel time mode {mode!r}; expected one of {list(MODES)}.")
+        approximate = self.approximation.matrix(origin_coords, destination_coords)
+        np.copyto(approximate, 0.0, where=np.asarray(origin_ids)[:, None] == np.asarray(destination_ids)[None, :])
+        if mode == "approximate":
+            return approximate
+        cached = load_block(self.engine, origin_ids, destination_ids, time_bucket)
+        return np.where(np.isnan(cached), approximate, cached)
+
+    def pairs(self, origin_ids, origin_coords, destination_ids, destination_coords, time_bucket: int, mode: str = "cached") -> np.ndarray:
+        """Travel times for aligned origin/destination pairs (e.g. the legs of existing routes)."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown travel time mode {mode!r}; expected one of {list(MODES)}.")
+        approximate = self.approximation.predict(origin_coords, destination_coords)
+        approximate = np.where(np.asarray(origin_ids) == np.asarray(destination_ids), 0.0, approximate)
+        if mode == "approximate":
+            return approximate
+        cached = load_pairs(self.engine, origin_ids, destination_ids, time_bucket)
+        return np.where(np.isnan(cached), approximate, cached)
+
+    def verify_routes(self, routes, ids, durations: np.ndarray, time_bucket: int, depot: int = 0) -> list[dict]:
+        """Compare each route's total under ``durations`` with real cached leg times.
+
+        ``routes`` are node-index arrays (depot excluded), ``ids`` maps node index to
+        delivery point id. Legs missing from the cache are counted and priced with
+        ``durations``, so ``missing_legs`` shows how much of the check is real.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        paths = [np.concatenate(([depot], np.asarray(r, dtype=np.int64), [depot])) for r in routes]
+        if not paths:
+            return []
+        origins = np.concatenate([p[:-1] for p in paths])
+        destinations = np.concatenate([p[1:] for p in paths])
+        planned = durations[origins, destinations]
+        real = load_pairs(self.engine, ids[origins], ids[destinations], time_bucket)
+        missing = np.isnan(real)
+        real = np.where(missing, planned, real)
+
+        report = []
+        bounds = np.cumsum([0] + [p.shape[0] - 1 for p in paths])
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            planned_total = float(planned[start:stop].sum())
+            real_total = float(real[start:stop].sum())
+            report.append({
+                "planned_s": planned_total,
+                "real_s": real_total,
+                "relative_error": (planned_total - real_total) / real_total if real_total else 0.0,
+                "missing_legs": int(missing[start:stop].sum()),
+            })
+        return report
+
+
+@lru_cache(maxsize=4)
+def shared_service(engine: Engine) -> TravelTimeService:
+    """One service per engine for the API process, so the approximation is fitted once rather than per request."""
+    return TravelTimeService(engine)
@@ -0,0 +1,193 @@
+"""Worker affinity: send solve jobs to workers that already hold the job's regional data.
+
+- Workers keep a ``ResidentData`` per process: the fitted travel time service and
+  the last few regional matrices (all cached durations between a region's
+  delivery points for one time bucket), reused across tasks instead of being
+  reloaded per job.
+- After each task a worker advertises the regions it holds in a ``WorkerRegistry``
+  (a Redis sorted set per region, scored by time, so dead workers age out).
+- ``dispatch_solve_job`` sends the task to the direct queue of a worker holding
+  the job's region, and the same task to the shared queue with a countdown of
+  ``affinity_timeout_seconds``. Whichever copy runs first claims the job
+  atomically; the other finds it no longer queued and does nothing.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.models.delivery_points import DeliveryPoint
+from app.travel_times_subsystem.approximation import region_bounds, region_of
+from app.travel_times_subsystem.cache import load_block
+from app.travel_times_subsystem.service import TravelTimeService
+
+REGISTRY_KEY = "where2now:affinity:region:{}"
+# Origins/destinations per ``load_block`` read when building a region matrix.
+REGION_BLOCK = 1000
+
+
+def job_region(coords) -> int:
+    """Region (3-character geohash cell) that a job with its depot at ``coords`` belongs to."""
+    return int(region_of(np.asarray(coords, dtype=np.float64).reshape(1, 2))[0])
+
+
+class WorkerRegistry:
+    """Which worker holds which region, in Redis (or any client with ``zadd``/``zrangebyscore``/``zremrangebyscore``)."""
+
+    def __init__(self, redis, ttl: float | None = None):
+        self.redis = redis
+        self.ttl = settings.affinity_ttl_seconds if ttl is None else ttl
+
+    @classmethod
+    def from_url(cls, url: str | None = None) -> "WorkerRegistry":
+        import redis
+
+        return cls(redis.Redis.from_url(url or settings.celery_broker_url))
+
+    def advertise(self, worker: str, regions, now: float | None = None):
+        now = time.time() if now is None else now
+        for region in regions:
+            key = REGISTRY_KEY.format(region)
+            self.redis.zadd(key, {worker: now})
+            self.redis.zremrangebyscore(key, "-inf", now - self.ttl)
+
+    def workers_for(self, region: int, now: float | None = None) -> list[str]:
+        """Workers that advertised ``region`` within the TTL, most recent first."""
+        now = time.time() if now is None else now
+        members = self.redis.zrangebyscore(REGISTRY_KEY.format(region), now - self.ttl, "+inf")
+        names = [m.decode() if isinstance(m, bytes) else m for m in members]
+        return names[::-1]
+
+
+@dataclass
+class RegionMatrix:
+    """Cached durations (float32, NaN where unknown) between every located delivery point of a region."""
+
+    region: int
+    time_bucket: int
+    ids: np.ndarray
+    durations: np.ndarray
+    loaded_at: float
+
+    def submatrix(self, ids) -> np.ndarray | None:
+        """Durations between ``ids`` (float64), or None if any id is not in this region."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.ids.size == 0:
+            return None
+        positions = np.searchsorted(self.ids, ids).clip(max=self.ids.size - 1)
+        if np.any(self.ids[positions] != ids):
+            return None
+        return self.durations[np.ix_(positions, positions)].astype(np.float64)
+
+
+def load_region_matrix(engine: Engine, region: int, time_bucket: int, max_points: int) -> RegionMatrix | None:
+    """Load a region's matrix for one bucket, or None when the region has more than ``max_points`` points.
+
+    Only points in the region's bounding box are read; ``region_of`` settles the points on its edges.
+    The matrix is filled in float32 from ``REGION_BLOCK``-sized blocks, so neither a
+    float64 copy of it nor an unbounded list of bound parameters is ever built.
+    """
+    lat_min, lat_max, lon_min, lon_max = region_bounds(region)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(DeliveryPoint.id, DeliveryPoint.latitude, DeliveryPoint.longitude)
+            .where(DeliveryPoint.latitude.between(lat_min, lat_max), DeliveryPoint.longitude.between(lon_min, lon_max))
+            .order_by(DeliveryPoint.id)
+        ).all()
+    data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    ids = data[region_of(data[:, 1:3]) == region, 0].astype(np.int64)
+    if ids.size > max_points:
+        return None
+    durations = np.empty((ids.size, ids.size), dtype=np.float32)
+    for o in range(0, ids.size, REGION_BLOCK):
+        for d in range(0, ids.size, REGION_BLOCK):
+            origins, destinations = ids[o:o + REGION_BLOCK], ids[d:d + REGION_BLOCK]
+            durations[o:o + REGION_BLOCK, d:d + REGION_BLOCK] = load_block(engine, origins, destinations, time_bucket)
+    return RegionMatrix(region, time_bucket, ids, durations, time.monotonic())
+
+
+class ResidentData:
+    """Travel time data a worker process keeps across tasks.
+
+    Has the same ``matrix`` interface as ``TravelTimeService`` so it can be passed
+    to ``build_instance``. Regional matrices are kept LRU, at most ``max_regions``
+    of them and ``max_bytes`` in total, and reloaded after ``ttl`` seconds so
+    nightly cache refreshes are picked up.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_regions: int | None = None,
+        max_points: int | None = None,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.engine = engine
+        self.service = TravelTimeService(engine)
+        self.max_regions = settings.affinity_max_regions if max_regions is None else max_regions
+        self.max_points = settings.affinity_max_region_points if max_points is None else max_points
+        self.max_bytes = int(settings.affinity_max_resident_mb * 2**20) if max_bytes is None else max_bytes
+        self.ttl = settings.affinity_ttl_seconds if ttl is None else ttl
+        self._matrices: OrderedDict[tuple[int, int], RegionMatrix] = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+
+    @property
+    def regions(self) -> set[int]:
+        return {region for region, _ in self._matrices}
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.durations.nbytes for entry in self._matrices.values())
+
+    def region_matrix(self, region: int, time_bucket: int) -> RegionMatrix | None:
+        key = (region, time_bucket)
+        entry = self._matrices.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl:
+            self._matrices.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = load_region_matrix(self.engine, region, time_bucket, self.max_points)
+        if entry is None:
+            return None
+        self.loads += 1
+        self._matrices[key] = entry
+        self._matrices.move_to_end(key)
+        # A matrix larger than the whole budget is used for this job but not kept.
+        while self._matrices and (len(self._matrices) > self.max_regions or self.resident_bytes > self.max_bytes):
+            self._matrices.popitem(last=False)
+        return entry
+
+    def matrix(self, ids, coords, time_bucket: int, mode: str = "cached") -> np.ndarray:
+        """Like ``TravelTimeService.matrix``, but cached durations come from the resident regional matrix."""
+        if mode != "cached" or len(ids) == 0:
+            return self.service.matrix(ids, coords, time_bucket, mode)
+        entry = self.region_matrix(job_region(coords[0]), time_bucket)
+        cached = None if entry is None else entry.submatrix(ids)
+        if cached is None:
+            return self.service.matrix(ids, coords, time_bucket, mode)
+        np.fill_diagonal(cached, 0.0)
+        return np.where(np.isnan(cached), self.service.estimate_matrix(coords, time_bucket), cached)
+
+
+def dispatch_solve_job(task, job_id: int, region: int | None, registry: WorkerRegistry | None, timeout: float | None = None):
+    """Send ``task`` for ``job_id`` to a worker holding ``region``, with a delayed fallback to any worker.
+
+    Returns the chosen worker name, or None when the job went straight to the shared queue.
+    """
+    from celery.utils.nodenames import worker_direct
+
+    timeout = settings.affinity_timeout_seconds if timeout is None else timeout
+    workers = registry.workers_for(region) if registry is not None and region is not None else []
+    if not workers:
+        task.apply_async(args=[job_id])
+        return None
+    task.apply_async(args=[job_id], queue=worker_direct(workers[0]))
+    task.apply_async(args=[job_id], countdown=timeout)
+    return workers[0]
@@ -0,0 +1,32 @@
+"""Celery instance + config."""
+
+from celery import Celery
+from celery.schedules import crontab
+
+from app.config import settings
+
+celery_app = Celery(
+    "where2now",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend,
+    include=["app.worker.tasks"],
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+    # Requeue tasks whose worker process died, so long solves resume from their checkpoint.
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Every worker also consumes its own direct queue, used for region affinity (app/worker/affinity.py).
+    worker_direct=True,
+    timezone=settings.timezone,
+    beat_schedule={
+        # Off-peak: warm tomorrow morning's matrices for clients that solve regularly.
+        "precompute-morning-matrices": {
+            "task": "travel_times.precompute_matrices",
+            "schedule": crontab(hour=settings.precompute_hour, minute=0),
+        },
+    },
+)
@@ -0,0 +1,111 @@
+"""Task definitions."""
+
+import asyncio
+import math
+from pathlib import Path
+
+from celery.utils.log import get_task_logger
+
+from app.config import settings
+from app.db.session import engine
+from app.services.bulk_delete import delete_ids
+from app.services.dedup import DEFAULT_MIN_SIMILARITY, DEFAULT_RADIUS_M, find_duplicates, merge_duplicates
+from app.services.entity_cache import publish_clear
+from app.services.jobs import lease_remaining, run_solve_job
+from app.services.precompute import precompute_matrices
+from app.travel_times_subsystem.client import GoogleMapsClient
+from app.travel_times_subsystem.predictor import TravelTimePredictor, load_observations
+from app.worker.affinity import ResidentData, WorkerRegistry
+from app.worker.celery_app import celery_app
+
+logger = get_task_logger(__name__)
+
+# Per worker process, kept across tasks.
+_resident: ResidentData | None = None
+_registry: WorkerRegistry | None = None
+
+
+def resident_data() -> ResidentData:
+    global _resident
+    if _resident is None:
+        _resident = ResidentData(engine)
+    return _resident
+
+
+def worker_registry() -> WorkerRegistry:
+    global _registry
+    if _registry is None:
+        _registry = WorkerRegistry.from_url()
+    return _registry
+
+
+@celery_app.task(name="jobs.solve", bind=True, max_retries=None)
+def solve_job(self, job_id: int) -> str:
+    """Run a queued solve job with this process's resident data; the result is stored on the job row.
+
+    A redelivered task (its worker died or was restarted mid-solve) takes the job
+    over once its lease has expired and resumes from the last checkpoint. While the
+    lease is still live (the worker died moments ago, or is still solving) the task
+    retries when it runs out, so the job is never left running with no task behind it.
+    """
+    resident = resident_data()
+    redelivered = bool((self.request.delivery_info or {}).get("redelivered")) or bool(self.request.retries)
+    job = run_solve_job(engine, job_id, travel_times=resident, resume=redelivered)
+    if job is None and redelivered:
+        remaining = lease_remaining(engine, job_id)
+        if remaining is not None:
+            raise self.retry(countdown=math.ceil(remaining) + 1)
+    if self.request.hostname:
+        worker_registry().advertise(self.request.hostname, resident.regions)
+    return "skipped" if job is None else job.status
+
+
+@celery_app.task(name="delivery_points.find_duplicates")
+def find_duplicate_delivery_points(radius_m: float = DEFAULT_RADIUS_M, min_similarity: float = DEFAULT_MIN_SIMILARITY, merge: bool = False) -> dict:
+    """Scan the whole table for duplicate clusters; with ``merge`` fold every cluster into its canonical point."""
+    report = find_duplicates(engine, radius_m, min_similarity)
+    if merge and report["clusters"]:
+        report["merge"] = merge_duplicates(engine, [(c["canonical_id"], c["duplicate_ids"]) for c in report["clusters"]])
+        publish_clear()
+    logger.info("Duplicate scan: %d points, %d duplicates in %d clusters", report["points"], report["duplicates"], len(report["clusters"]))
+    return report
+
+
+@celery_app.task(name="bulk.delete", bind=True)
+def bulk_delete(self, table: str, ids: list[int]) -> dict:
+    """Delete ``ids`` from ``table`` in chunks, reporting progress as task state PROGRESS."""
+
+    def progress(done: int, deleted: int):
+        self.update_state(state="PROGRESS", meta={"total": len(ids), "done": done, "deleted": deleted})
+
+    deleted = delete_ids(engine, table, ids, on_progress=progress)
+    publish_clear()
+    return {"total": len(ids), "done": len(ids), "deleted": deleted}
+
+
+@celery_app.task(name="travel_times.train_predictor")
+def train_travel_time_predictor(model_path: str | None = None) -> dict:
+    """Fit the travel time predictor on every cached observation and save it for the API/workers."""
+    observations = load_observations(engine)
+    model = TravelTimePredictor()
+    metrics = model.fit(observations)
+    path = Path(model_path or settings.travel_time_model_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    model.save(path)
+    return {**metrics, "path": str(path)}
+
+
+@celery_app.task(name="travel_times.precompute_matrices")
+def precompute_travel_time_matrices(max_elements: int | None = None) -> dict:
+    """Refresh morning matrices of active clients within the provider budget; returns coverage stats."""
+
+    async def run():
+        async with GoogleMapsClient() as maps:
+            return await precompute_matrices(engine, maps, max_elements=max_elements)
+
+    stats = asyncio.run(run())
+    logger.info(
+        "Matrix precompute: %d elements, expected warm solves %.0f%% -> %.0f%%",
+        stats["elements"], 100 * stats["before"]["expected_warm_solves"], 100 * stats["after"]["expected_warm_solves"],
+    )
+    return stats
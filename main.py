@@ -2,9 +2,16 @@
 
 from fastapi import FastAPI
 
-from app.api.routes import health, clients, delivery_points
+from app.api.admission import AdmissionMiddleware
+from app.api.encoding import CompressionMiddleware
+from app.api.profiling import ProfilingMiddleware
+from app.api.routes import health, clients, delivery_points, export, jobs, routes
 
 app = FastAPI()
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(CompressionMiddleware)
+# Outermost, so shed requests cost next to nothing.
+app.add_middleware(AdmissionMiddleware)
 
 app.include_router(
     health.router, 
@@ -21,3 +28,18 @@ app.include_router(
     prefix="/api/delivery-points",
     tags=["delivery_points"],
 )
+app.include_router(
+    export.router,
+    prefix="/api/export",
+    tags=["export"],
+)
+app.include_router(
+    jobs.router,
+    prefix="/api/jobs",
+    tags=["jobs"],
+)
+app.include_router(
+    routes.router,
+    prefix="/api/routes",
+    tags=["routes"],
+)
@@ -0,0 +1 @@
+"""Benchmark harnesses (run as modules, not collected by pytest)."""
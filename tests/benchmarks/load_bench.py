@@ -0,0 +1,278 @@
+"""API load test: asyncio httpx driver against a local uvicorn + seeded database.
+
+For each data scale the harness seeds a fresh database, starts uvicorn on it,
+drives every scenario with a fixed number of concurrent workers for a fixed
+duration, and records p50/p95/p99 latency and throughput.
+
+Usage (from project root):
+    python -m tests.benchmarks.load_bench --scales 1000,10000 --duration 10 --out bench_load.json
+    python -m tests.benchmarks.load_bench --database-url postgresql+psycopg2://u:p@localhost/bench --scales 1000000
+
+SQLite databases are created under ``--workdir``; a PostgreSQL URL must point at
+an empty scratch database (its tables are dropped and recreated per scale).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+from app.db.base import Base
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SEED_CHUNK = 20_000
+LINK_BATCH = 50
+BATCH_GET_SIZE = 500
+
+
+@dataclass
+class Dataset:
+    """Id ranges of the seeded rows (ids are dense, starting at 1)."""
+
+    delivery_points: int
+    clients: int
+
+
+Scenario = Callable[[httpx.AsyncClient, Dataset, random.Random], Awaitable[httpx.Response]]
+
+
+async def list_clients(http, data, rng):
+    return await http.get("/api/clients/")
+
+
+async def list_delivery_points(http, data, rng):
+    return await http.get("/api/delivery-points/")
+
+
+async def get_delivery_point(http, data, rng):
+    return await http.get(f"/api/delivery-points/{rng.randint(1, data.delivery_points)}")
+
+
+async def get_client(http, data, rng):
+    return await http.get(f"/api/clients/{rng.randint(1, data.clients)}")
+
+
+async def create_delivery_point(http, data, rng):
+    return await http.post(
+        "/api/delivery-points/",
+        json={"name": "Load test", "address": "1 Bench St", "state": "LX", "zip": "1000-001", "country": "PT"},
+    )
+
+
+async def link_client_delivery_points(http, data, rng):
+    ids = rng.sample(range(1, data.delivery_points + 1), min(LINK_BATCH, data.delivery_points))
+    return await http.post(f"/api/clients/{rng.randint(1, data.clients)}/delivery-points", json={"delivery_point_ids": ids})
+
+
+async def batch_get_delivery_points(http, data, rng):
+    ids = rng.sample(range(1, data.delivery_points + 1), min(BATCH_GET_SIZE, data.delivery_points))
+    return await http.post("/api/delivery-points/batch-get", json={"ids": ids})
+
+
+async def list_client_delivery_points(http, data, rng):
+    return await http.get(f"/api/clients/{rng.randint(1, data.clients)}/delivery-points")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "list_clients": list_clients,
+    "list_delivery_points": list_delivery_points,
+    "get_client": get_client,
+    "get_delivery_point": get_delivery_point,
+    "create_delivery_point": create_delivery_point,
+    "link_client_delivery_points": link_client_delivery_points,
+    "list_client_delivery_points": list_client_delivery_points,
+    "batch_get_delivery_points": batch_get_delivery_points,
+}
+
+# Full listings return every row; above this scale they only measure serialization of huge bodies.
+LIST_ALL_MAX_SCALE = 100_000
+
+
+def seed(database_url: str, n_points: int, n_clients: int | None = None, links_per_client: int = 20, seed: int = 0) -> Dataset:
+    """Create fresh tables and bulk-insert ``n_points`` delivery points, clients and links."""
+    n_clients = n_clients or max(1, n_points // 100)
+    rng = np.random.default_rng(seed)
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, n_points, SEED_CHUNK):
+            size = min(SEED_CHUNK, n_points - start)
+            lats = 38.7 + rng.normal(0, 0.05, size)
+            lons = -9.14 + rng.normal(0, 0.05, size)
+            conn.execute(
+                insert(DeliveryPoint),
+                [
+                    {"name": f"DP {start + i}", "address": f"{start + i} Bench St", "city": "Lisboa", "state": "LX",
+                     "zip": f"{1000 + (start + i) % 900}-001", "country": "PT", "latitude": float(lat), "longitude": float(lon)}
+                    for i, (lat, lon) in enumerate(zip(lats, lons))
+                ],
+            )
+        conn.execute(insert(Client), [{"name": f"Client {i}", "email": f"c{i}@bench.test"} for i in range(n_clients)])
+        links = {
+            (c, int(p))
+            for c in range(1, n_clients + 1)
+            for p in rng.integers(1, n_points + 1, size=links_per_client)
+        }
+        rows = [{"client_id": c, "delivery_point_id": p} for c, p in links]
+        for start in range(0, len(rows), SEED_CHUNK):
+            conn.execute(insert(client_delivery_points), rows[start:start + SEED_CHUNK])
+    engine.dispose()
+    return Dataset(delivery_points=n_points, clients=n_clients)
+
+
+def summarize(name: str, latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Latency percentiles (ms) and throughput (requests/s) for one scenario run."""
+    values = np.array(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values.size else (float("nan"),) * 3
+    return {
+        "scenario": name,
+        "requests": int(values.size),
+        "errors": errors,
+        "throughput_rps": round(values.size / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+async def drive(
+    http: httpx.AsyncClient,
+    scenario: Scenario,
+    data: Dataset,
+    concurrency: int = 16,
+    duration: float = 10.0,
+    max_requests: int | None = None,
+    seed: int = 0,
+) -> tuple[list[float], int, float]:
+    """Run ``scenario`` from ``concurrency`` workers until ``duration`` or ``max_requests`` is reached."""
+    latencies: list[float] = []
+    errors = 0
+    started = time.perf_counter()
+    deadline = started + duration
+    budget = [max_requests if max_requests is not None else float("inf")]
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline and budget[0] > 0:
+            budget[0] -= 1
+            t0 = time.perf_counter()
+            try:
+                response = await scenario(http, data, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - t0)
+            errors += failed
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """uvicorn subprocess serving ``main:app`` against ``database_url``."""
+
+    def __init__(self, database_url: str, workers: int = 1):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        # One bench process stands in for many callers: lift the per-client admission limit.
+        env = {**os.environ, "DATABASE_URL": database_url, "ADMISSION_MAX_PER_CLIENT": "1000"}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(self.port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=PROJECT_ROOT,
+            env=env,
+        )
+
+    def wait_ready(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{self.base_url}/api/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("uvicorn did not become ready")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def __enter__(self):
+        self.wait_ready()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+async def run_scale(base_url: str, data: Dataset, scenarios: list[str], concurrency: int, duration: float) -> list[dict]:
+    results = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as http:
+        for name in scenarios:
+            if name.startswith("list_") and name != "list_client_delivery_points" and data.delivery_points > LIST_ALL_MAX_SCALE:
+                continue
+            latencies, errors, elapsed = await drive(http, SCENARIOS[name], data, concurrency, duration)
+            results.append(summarize(name, latencies, errors, elapsed))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.load_bench")
+    parser.add_argument("--scales", default="1000,10000,100000", help="Comma-separated delivery point counts.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--database-url", help="Scratch database URL (default: SQLite file per scale).")
+    parser.add_argument("--workdir", type=Path, default=Path(".bench"))
+    parser.add_argument("--out", type=Path, default=Path("bench_load.json"))
+    args = parser.parse_args(argv)
+
+    args.workdir.mkdir(exist_ok=True)
+    scenarios = args.scenarios.split(",")
+    report = []
+    for scale in (int(s) for s in args.scales.split(",")):
+        url = args.database_url or f"sqlite:///{(args.workdir / f'load_{scale}.db').resolve()}"
+        data = seed(url, scale)
+        with Server(url, workers=args.workers) as server:
+            results = asyncio.run(run_scale(server.base_url, data, scenarios, args.concurrency, args.duration))
+        for r in results:
+            r["scale"] = scale
+            print(f"{scale:>9} {r['scenario']:<30} {r['throughput_rps']:>9.1f} rps  p50={r['p50_ms']:.1f}ms "
+                  f"p95={r['p95_ms']:.1f}ms p99={r['p99_ms']:.1f}ms errors={r['errors']}")
+        report.extend(results)
+
+    args.out.write_text(json.dumps({"concurrency": args.concurrency, "duration_s": args.duration, "results": report}, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Solver benchmark runner with baseline regression checks.
+
+Runs every solver mode on a set of instances and records wall time, objective,
+gap to best known and peak traced memory. Results are written as JSON and can be
+compared to a stored baseline.
+
+Usage (from project root):
+    python -m tests.benchmarks.solver_bench --out bench.json
+    python -m tests.benchmarks.solver_bench --suite synthetic --baseline tests/benchmarks/baselines/solver.json
+    python -m tests.benchmarks.solver_bench --suite reference --instances-dir ~/data/solomon
+    python -m tests.benchmarks.solver_bench --modes alns --scaling 1,2,4,8,16,32
+
+``--scaling`` also runs ALNS on the scaling instance with each worker count and
+records best objective against elapsed time, i.e. quality-versus-time curves for
+1..N cores.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.solver.instances import GENERATORS, load_directory
+from app.solver.problem import RoutingInstance
+from app.solver.solver import MODES, solve
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "solver.json"
+
+# Seeded synthetic suite: (generator, n, seed, extra kwargs).
+SYNTHETIC_SUITE = [
+    ("uniform", 100, 1, {}),
+    ("uniform", 100, 2, {"time_windows": True}),
+    ("clustered", 200, 1, {}),
+    ("city", 200, 1, {}),
+    ("city", 500, 2, {}),
+]
+
+
+def synthetic_instances() -> list[RoutingInstance]:
+    return [GENERATORS[name](n, seed=seed, **kwargs) for name, n, seed, kwargs in SYNTHETIC_SUITE]
+
+
+def run_one(instance: RoutingInstance, mode: str) -> dict:
+    """Solve once under tracemalloc and return the result record."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    solution = solve(instance, mode=mode)
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gap = None
+    if instance.best_known:
+        gap = (solution.objective - instance.best_known) / instance.best_known
+    return {
+        "instance": instance.name,
+        "mode": mode,
+        "size": instance.size - 1,
+        "wall_time_s": round(wall, 6),
+        "objective": round(solution.objective, 6),
+        "gap": None if gap is None else round(gap, 6),
+        "routes": solution.n_routes,
+        "peak_memory_mb": round(peak / 2**20, 3),
+    }
+
+
+def run_scaling(instance: RoutingInstance, worker_counts, iterations: int = 300, time_limit: float | None = None) -> list[dict]:
+    """ALNS with each worker count; the trace is ``[elapsed s, best objective]`` per exchange epoch."""
+    records = []
+    for workers in worker_counts:
+        started = time.perf_counter()
+        solution = solve(instance, mode="alns", workers=workers, iterations=iterations, time_limit=time_limit)
+        records.append({
+            "instance": instance.name,
+            "workers": workers,
+            "wall_time_s": round(time.perf_counter() - started, 6),
+            "objective": round(solution.objective, 6),
+            "iterations": solution.stats["iterations"],
+            "trace": [[round(t, 4), round(obj, 6)] for t, obj in solution.stats["trace"]],
+        })
+    return records
+
+
+def run(instances: list[RoutingInstance], modes=MODES, repeat: int = 1) -> list[dict]:
+    """Run every mode on every instance; keeps the fastest of ``repeat`` runs."""
+    results = []
+    for instance in instances:
+        for mode in modes:
+            runs = [run_one(instance, mode) for _ in range(repeat)]
+            results.append(min(runs, key=lambda r: r["wall_time_s"]))
+    return results
+
+
+def compare(
+    results: list[dict],
+    baseline: list[dict],
+    time_tolerance: float = 0.25,
+    objective_tolerance: float = 0.005,
+    min_time_delta_s: float = 0.05,
+) -> list[str]:
+    """Describe every result that is slower or worse than its baseline entry beyond the tolerances.
+
+    Time tolerance is relative (0.25 = 25% slower) and slowdowns under
+    ``min_time_delta_s`` are treated as timer noise; objective tolerance is relative.
+    Results without a baseline entry are ignored.
+    """
+    reference = {(r["instance"], r["mode"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result["instance"], result["mode"]))
+        if base is None:
+            continue
+        key = f"{result['instance']} [{result['mode']}]"
+        if result["objective"] > base["objective"] * (1 + objective_tolerance):
+            regressions.append(f"{key}: objective {result['objective']:.2f} vs baseline {base['objective']:.2f}")
+        slowdown = result["wall_time_s"] - base["wall_time_s"]
+        if slowdown > min_time_delta_s and result["wall_time_s"] > base["wall_time_s"] * (1 + time_tolerance):
+            regressions.append(f"{key}: wall time {result['wall_time_s']:.3f}s vs baseline {base['wall_time_s']:.3f}s")
+    return regressions
+
+
+def write_results(path: Path, results: list[dict], scaling: list[dict] | None = None):
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if scaling:
+        payload["scaling"] = scaling
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def read_results(path: Path) -> list[dict]:
+    return json.loads(path.read_text())["results"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.solver_bench")
+    parser.add_argument("--suite", choices=("synthetic", "reference", "all"), default="synthetic")
+    parser.add_argument("--instances-dir", type=Path, help="Directory with Solomon .txt / CVRPLIB .vrp files.")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated solver modes.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=Path, default=Path("bench_solver.json"))
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON to compare against.")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--objective-tolerance", type=float, default=0.005)
+    parser.add_argument("--scaling", help="Comma-separated ALNS worker counts, e.g. 1,2,4,8.")
+    parser.add_argument("--scaling-instance", default="city:500:2", help="generator:n:seed for the scaling runs.")
+    parser.add_argument("--iterations", type=int, default=300, help="ALNS iterations per search in scaling runs.")
+    parser.add_argument("--time-limit", type=float, help="ALNS time limit (s) in scaling runs.")
+    args = parser.parse_args(argv)
+
+    instances = []
+    if args.suite in ("synthetic", "all"):
+        instances += synthetic_instances()
+    if args.suite in ("reference", "all"):
+        if args.instances_dir is None:
+            parser.error("--instances-dir is required for the reference suite.")
+        instances += load_directory(args.instances_dir)
+
+    results = run(instances, modes=args.modes.split(","), repeat=args.repeat)
+    scaling = None
+    if args.scaling:
+        name, n, seed = args.scaling_instance.split(":")
+        instance = GENERATORS[name](int(n), seed=int(seed))
+        worker_counts = [int(w) for w in args.scaling.split(",")]
+        scaling = run_scaling(instance, worker_counts, args.iterations, args.time_limit)
+    write_results(args.out, results, scaling)
+    for r in results:
+        gap = "" if r["gap"] is None else f" gap={r['gap']:.2%}"
+        print(f"{r['instance']:<28} {r['mode']:<14} {r['wall_time_s']:>9.3f}s obj={r['objective']:.1f}{gap} peak={r['peak_memory_mb']:.1f}MB")
+    for r in scaling or []:
+        print(f"{r['instance']:<28} workers={r['workers']:<4} {r['wall_time_s']:>9.3f}s obj={r['objective']:.1f} iterations={r['iterations']}")
+
+    if args.baseline:
+        regressions = compare(results, read_results(args.baseline), args.time_tolerance, args.objective_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
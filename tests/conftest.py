@@ -1,6 +1,9 @@
 """Pytest fixtures and configuration."""
 
 import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Make project root importable (e.g. "app", "main") when running pytest from any cwd.
@@ -8,13 +11,15 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.db.base import Base
-from app.dependencies import get_db_session
+from app.db.session import enable_sqlite_foreign_keys
+from app.dependencies import get_db_session, get_entity_cache
 from app.models import Client, DeliveryPoint  # noqa: F401 - register models with Base
+from app.services.entity_cache import EntityCache
 from main import app
 
 # In-memory SQLite for tests; StaticPool so one connection = one DB (tables visible to session).
@@ -24,6 +29,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+enable_sqlite_foreign_keys(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -46,7 +52,56 @@ def client(db_session):
     def get_test_db():
         yield db_session
 
+    # Fresh entity cache per test: ids are reused across test databases.
+    cache = EntityCache()
     app.dependency_overrides[get_db_session] = get_test_db
+    app.dependency_overrides[get_entity_cache] = lambda: cache
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@dataclass
+class QueryLog:
+    """SQL statements seen by the engine inside a ``count_queries`` block, with timings."""
+
+    statements: list[str] = field(default_factory=list)
+    durations: list[float] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.durations)
+
+
+@contextmanager
+def _count_queries(bind=engine):
+    log = QueryLog()
+    started: list[float] = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        started.append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        log.durations.append(time.perf_counter() - started.pop())
+        log.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before)
+    event.listen(bind, "after_cursor_execute", after)
+    try:
+        yield log
+    finally:
+        event.remove(bind, "before_cursor_execute", before)
+        event.remove(bind, "after_cursor_execute", after)
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager counting and timing SQL statements (executemany counts once).
+
+    Usage: ``with count_queries() as log: ...; assert log.count <= 4``.
+    """
+    return _count_queries
@@ -0,0 +1,69 @@
+"""Tests for admission control (concurrency limits and load shedding)."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import admission
+from app.api.admission import AdmissionController
+
+
+def _controller(**kwargs):
+    defaults = {"max_concurrent": 2, "max_queue": 1, "queue_timeout_s": 0.05, "max_per_client": 2, "route_limits": {}}
+    return AdmissionController(**{**defaults, **kwargs})
+
+
+def test_per_client_limit_throttles_only_that_client():
+    async def scenario():
+        controller = _controller(max_per_client=1)
+        status, held = await controller.admit("a", "/api/clients/")
+        assert status is None
+        assert (await controller.admit("a", "/api/clients/"))[0] == 429
+        assert (await controller.admit("b", "/api/clients/"))[0] is None
+        controller.release("a", held)
+        assert (await controller.admit("a", "/api/clients/"))[0] is None
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["admitted"], stats["throttled"]) == (3, 1)
+
+
+def test_full_queue_and_queue_timeout_are_shed():
+    async def scenario():
+        controller = _controller(max_concurrent=1)
+        _, held = await controller.admit("a", "/api/clients/")
+        waiting = asyncio.create_task(controller.admit("b", "/api/clients/"))
+        await asyncio.sleep(0)
+        # The one queue place is taken: shed at once.
+        assert (await controller.admit("c", "/api/clients/"))[0] == 503
+        # The queued request is handed the slot when the first one finishes.
+        controller.release("a", held)
+        status, held_b = await waiting
+        assert status is None and controller.global_gate.active == 1
+        # Nobody leaves within the timeout: shed.
+        assert (await controller.admit("d", "/api/clients/"))[0] == 503
+        controller.release("b", held_b)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"] == 2 and stats["in_flight"] == 0
+
+
+def test_route_limit_applies_to_longest_prefix():
+    async def scenario():
+        controller = _controller(max_concurrent=10, max_queue=0, route_limits={"/api/export": 1})
+        assert (await controller.admit("a", "/api/export/clients"))[0] is None
+        assert (await controller.admit("b", "/api/export/delivery_points"))[0] == 503
+        assert (await controller.admit("b", "/api/clients/"))[0] is None
+
+    asyncio.run(scenario())
+
+
+def test_rejected_requests_get_retry_after(client: TestClient, monkeypatch):
+    monkeypatch.setattr(admission, "_controller", _controller(max_per_client=0, retry_after_s=3))
+    response = client.get("/api/clients/")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    # Health checks are never shed.
+    assert client.get("/api/health/admission").json()["throttled"] == 1
@@ -288,3 +288,71 @@ def test_unlink_client_delivery_point_404_not_associated(client: TestClient, db_
     response = client.delete(f"/api/clients/{c.id}/delivery-points/{dp.id}")
     assert response.status_code == 404
     assert "not associated" in response.json()["detail"].lower()
+
+
+def test_bulk_delete_clients(client: TestClient, db_session):
+    """POST /bulk-delete removes matching clients and their links in one request."""
+    from app.models.clients import client_delivery_points
+    from app.models.delivery_points import DeliveryPoint
+
+    clients = [Client(name=f"C {i}", email="gone@example.com" if i < 3 else None) for i in range(5)]
+    dp = DeliveryPoint(name="DP", address="A", state="S", zip="Z", country="PT")
+    db_session.add_all([*clients, dp])
+    db_session.commit()
+    client.post(f"/api/clients/{clients[0].id}/delivery-points", json={"delivery_point_ids": [dp.id]})
+    response = client.post("/api/clients/bulk-delete", json={"email": "gone@example.com"})
+    assert response.status_code == 200
+    assert response.json()["deleted"] == 3
+    assert [c["name"] for c in client.get("/api/clients/").json()] == ["C 3", "C 4"]
+    assert db_session.execute(client_delivery_points.select()).all() == []
+    assert client.post("/api/clients/bulk-delete", json={}).status_code == 400
+
+
+def test_bulk_delete_clients_in_background(client: TestClient, db_session):
+    """With background the ids go to a worker; progress is read by task id."""
+    from app.dependencies import get_bulk_delete_dispatcher, get_task_status
+    from main import app
+
+    sent = []
+    app.dependency_overrides[get_bulk_delete_dispatcher] = lambda: lambda table, ids: sent.append((table, ids)) or "task-1"
+    app.dependency_overrides[get_task_status] = lambda: lambda task_id: {"task_id": task_id, "state": "PROGRESS", "total": 2, "done": 1, "deleted": 1}
+    db_session.add_all([Client(name="A"), Client(name="B")])
+    db_session.commit()
+    response = client.post("/api/clients/bulk-delete", json={"ids": [1, 2, 3], "background": True})
+    assert response.status_code == 202
+    assert response.json() == {"matched": 2, "deleted": None, "task_id": "task-1"}
+    assert sent == [("clients", [1, 2])]
+    assert client.get("/api/clients/bulk-delete/task-1").json()["done"] == 1
+
+
+def test_multi_get_clients(client: TestClient, db_session):
+    db_session.add_all([Client(name=f"C {i}") for i in range(3)])
+    db_session.commit()
+    response = client.post("/api/clients/batch-get", json={"ids": [3, 7, 1]})
+    assert [c["name"] for c in response.json()["items"]] == ["C 2", "C 0"]
+    assert response.json()["missing"] == [7]
+    assert client.get("/api/clients/?ids=2").json()["items"][0]["name"] == "C 1"
+
+
+def test_get_client_is_cached_until_written(client: TestClient, db_session, count_queries):
+    """Repeated reads come from the entity cache; PATCH and linking invalidate the affected entries."""
+    db_session.add_all([Client(name="Acme"), DeliveryPoint(name="Dock", address="A", state="S", zip="Z", country="PT")])
+    db_session.commit()
+    assert client.get("/api/clients/1").json()["name"] == "Acme"
+    assert client.get("/api/clients/1/delivery-points").json() == []
+    with count_queries() as log:
+        assert client.get("/api/clients/1").json()["name"] == "Acme"
+        assert client.get("/api/clients/1/delivery-points").json() == []
+    assert log.count == 0, log.statements
+
+    client.patch("/api/clients/1", json={"name": "Acme Ltd"})
+    client.post("/api/clients/1/delivery-points", json={"delivery_point_ids": [1]})
+    assert client.get("/api/clients/1").json()["name"] == "Acme Ltd"
+    assert [dp["id"] for dp in client.get("/api/clients/1/delivery-points").json()] == [1]
+    assert client.get("/api/delivery-points/1/clients").json()[0]["name"] == "Acme Ltd"
+
+    client.delete("/api/clients/1")
+    assert client.get("/api/clients/1").status_code == 404
+    assert client.get("/api/delivery-points/1/clients").json() == []
+    stats = client.get("/api/health/cache").json()
+    assert stats["enabled"] and stats["namespaces"]["clients"]["hits"] == 1
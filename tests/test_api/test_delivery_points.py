@@ -333,3 +333,63 @@ def test_unlink_delivery_point_client_404_not_associated(client: TestClient, db_
     assert response.status_code == 404
     assert "not associated" in response.json()["detail"].lower()
 
+
+
+def test_find_and_merge_duplicates(client: TestClient, db_session):
+    """GET /duplicates proposes clusters; POST /merge folds them into the canonical point."""
+    rows = [
+        DeliveryPoint(name="Shop", address="Main St 1", state="S", zip="10001", country="US", latitude=40.0, longitude=-74.0),
+        DeliveryPoint(name="Shop", address="Main Street 1", state="S", zip="10001", country="US", latitude=40.0001, longitude=-74.0),
+    ]
+    c = Client(name="C")
+    db_session.add_all([*rows, c])
+    db_session.commit()
+    client.post(f"/api/clients/{c.id}/delivery-points", json={"delivery_point_ids": [rows[1].id]})
+    kept, dropped = rows[1].id, rows[0].id
+
+    response = client.get("/api/delivery-points/duplicates?radius_m=50")
+    assert response.status_code == 200
+    [cluster] = response.json()["clusters"]
+    assert cluster["canonical_id"] == kept and cluster["duplicate_ids"] == [dropped]
+
+    merge = {"merges": [{"canonical_id": cluster["canonical_id"], "duplicate_ids": cluster["duplicate_ids"]}]}
+    assert client.post("/api/delivery-points/merge", json=merge).json() == {"merged": 1, "links_added": 0}
+    db_session.expire_all()
+    assert client.get(f"/api/delivery-points/{dropped}").status_code == 404
+    assert client.post("/api/delivery-points/merge", json=merge).status_code == 404
+
+
+def test_multi_get_delivery_points(client: TestClient, db_session):
+    """GET ?ids= and POST /batch-get keep request order and report missing ids."""
+    db_session.add_all([DeliveryPoint(name=f"DP {i}", address="A", state="S", zip="Z", country="PT") for i in range(5)])
+    db_session.commit()
+    by_query = client.get("/api/delivery-points/?ids=4,99,1,4,2")
+    assert by_query.status_code == 200
+    assert [dp["id"] for dp in by_query.json()["items"]] == [4, 1, 2]
+    assert by_query.json()["missing"] == [99]
+    by_body = client.post("/api/delivery-points/batch-get", json={"ids": [4, 99, 1, 4, 2]})
+    assert by_body.json() == by_query.json()
+    assert client.get("/api/delivery-points/?ids=1,x").status_code == 400
+    assert client.post("/api/delivery-points/batch-get", json={"ids": []}).status_code == 422
+
+
+def test_bulk_update_delivery_points(client: TestClient, db_session):
+    """PATCH / applies partial updates keyed by id, bumps updated_at and returns a summary."""
+    db_session.add_all([DeliveryPoint(name=f"DP {i}", address="A", state="S", zip="Z", country="PT") for i in range(3)])
+    db_session.commit()
+    before = client.get("/api/delivery-points/1").json()["updated_at"]
+    response = client.patch("/api/delivery-points/", json={"items": [
+        {"id": 1, "latitude": 38.71, "longitude": -9.14},
+        {"id": 2, "latitude": 38.72, "longitude": -9.15},
+        {"id": 3, "address": "B"},
+        {"id": 42, "latitude": 1.0},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {"requested": 4, "updated": 3, "missing": [42]}
+    rows = {dp["id"]: dp for dp in client.get("/api/delivery-points/").json()}
+    assert (rows[1]["latitude"], rows[1]["longitude"]) == (38.71, -9.14)
+    assert rows[2]["latitude"] == 38.72 and rows[2]["address"] == "A"
+    assert rows[3]["address"] == "B" and rows[3]["latitude"] is None
+    assert rows[1]["updated_at"] > before
+    duplicate = client.patch("/api/delivery-points/", json={"items": [{"id": 1, "name": "x"}, {"id": 1, "name": "y"}]})
+    assert duplicate.status_code == 422
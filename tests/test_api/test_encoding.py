@@ -0,0 +1,67 @@
+"""Tests for response compression and content negotiation."""
+
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api.encoding import preferred_media_type
+from app.models.delivery_points import DeliveryPoint
+
+
+def _seed(db_session, n=200):
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "address": "Rua Augusta", "state": "Lisboa", "zip": "1100", "country": "PT",
+          "latitude": 38.7 + i * 1e-4, "longitude": -9.1} for i in range(n)],
+    )
+    db_session.commit()
+
+
+def test_preferred_media_type_honours_q_values():
+    offered = ["application/json", "application/msgpack"]
+    assert preferred_media_type(None, offered) == "application/json"
+    assert preferred_media_type("*/*", offered) == "application/json"
+    assert preferred_media_type("application/x-msgpack", offered) == "application/msgpack"
+    assert preferred_media_type("application/json;q=0.5, application/msgpack", offered) == "application/msgpack"
+    assert preferred_media_type("text/html", offered) is None
+
+
+def test_large_listing_is_gzipped_small_response_is_not(client: TestClient, db_session):
+    _seed(db_session)
+    response = client.get("/api/delivery-points/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 200
+    small = client.get("/api/delivery-points/1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_zstd_is_preferred_when_accepted(client: TestClient, db_session):
+    pytest.importorskip("zstandard")
+    _seed(db_session)
+    response = client.get("/api/delivery-points/", headers={"Accept-Encoding": "gzip, zstd"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert len(response.json()) == 200
+
+
+def test_listing_as_msgpack(client: TestClient, db_session):
+    msgpack = pytest.importorskip("msgpack")
+    _seed(db_session, n=3)
+    response = client.get("/api/delivery-points/", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == client.get("/api/delivery-points/").json()
+    batch = client.get("/api/delivery-points/?ids=2,9", headers={"Accept": "application/msgpack"})
+    assert msgpack.unpackb(batch.content)["missing"] == [9]
+
+
+def test_listing_as_arrow(client: TestClient, db_session):
+    pa = pytest.importorskip("pyarrow")
+    _seed(db_session, n=3)
+    response = client.get("/api/delivery-points/", headers={"Accept": "application/vnd.apache.arrow.stream"})
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+    assert table.column("id").to_pylist() == [1, 2, 3]
+    assert table.schema.field("latitude").type == pa.float64()
+    # Multi-get is not tabular (items plus missing ids): Arrow is not offered.
+    assert client.get("/api/delivery-points/?ids=1", headers={"Accept": "application/vnd.apache.arrow.stream"}).status_code == 406
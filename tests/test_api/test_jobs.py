@@ -0,0 +1,335 @@
+"""Tests for solve jobs API and the job runner."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.config import settings
+from app.dependencies import get_job_dispatcher
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.models.jobs import Job
+from app.services import jobs
+from app.services.jobs import claim_job, renew_lease, run_solve_job
+from app.solver.instances import city_instance
+from app.worker.affinity import job_region
+from main import app
+
+
+@pytest.fixture
+def dispatched(client):
+    """(job id, region) pairs handed to the workers, instead of enqueueing on a broker."""
+    sent = []
+    app.dependency_overrides[get_job_dispatcher] = lambda: lambda job_id, region: sent.append((job_id, region))
+    return sent
+
+
+def _seed(db_session, n=6):
+    c = Client(name="Acme")
+    db_session.add(c)
+    db_session.flush()
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": 38.70 + 0.01 * i, "longitude": -9.14 - 0.01 * (i % 3)} for i in range(n)],
+    )
+    db_session.execute(insert(client_delivery_points), [{"client_id": c.id, "delivery_point_id": i} for i in range(1, n + 1)])
+    db_session.commit()
+    return c
+
+
+def test_create_job_queues_and_dispatches(client: TestClient, db_session, dispatched):
+    """POST /api/jobs/ stores a queued job and hands its id to the workers."""
+    c = _seed(db_session)
+    response = client.post("/api/jobs/", json={"client_id": c.id, "depot_id": 1, "travel_times": "approximate"})
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+    assert data["params"]["depot_id"] == 1
+    assert dispatched == [(data["id"], job_region((38.70, -9.14)))]
+    assert client.get(f"/api/jobs/{data['id']}").json()["status"] == "queued"
+    assert [j["id"] for j in client.get(f"/api/jobs/?client_id={c.id}").json()] == [data["id"]]
+
+
+def test_create_job_unknown_client_404(client: TestClient, dispatched):
+    response = client.post("/api/jobs/", json={"client_id": 999, "depot_id": 1})
+    assert response.status_code == 404
+    assert dispatched == []
+
+
+def test_create_job_unknown_depot_404(client: TestClient, db_session, dispatched):
+    c = _seed(db_session)
+    assert client.post("/api/jobs/", json={"client_id": c.id, "depot_id": 999}).status_code == 404
+
+
+def test_get_job_404(client: TestClient):
+    assert client.get("/api/jobs/999").status_code == 404
+
+
+def test_run_solve_job_visits_every_linked_point(db_session):
+    """The runner solves the client's points from the depot and stores routes as delivery point ids."""
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate", "mode": "local_search"})
+    db_session.add(job)
+    db_session.commit()
+
+    job = run_solve_job(db_session.get_bind(), job.id)
+    assert job.status == "succeeded", job.error
+    visited = sorted(dp for route in job.result["routes"] for dp in route)
+    assert visited == [2, 3, 4, 5, 6]
+    assert job.result["depot_id"] == 1
+    assert job.finished_at is not None
+
+
+def test_run_solve_job_records_phase_timings(db_session):
+    """Seconds per pipeline phase are stored on the job, in pipeline order."""
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+    job = run_solve_job(db_session.get_bind(), job.id)
+    assert list(job.phases) == ["load", "matrix", "build", "solve", "postprocess"]
+    assert all(seconds >= 0 for seconds in job.phases.values())
+
+
+def test_run_solve_job_records_errors(db_session):
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 999})
+    db_session.add(job)
+    db_session.commit()
+
+    job = run_solve_job(db_session.get_bind(), job.id)
+    assert job.status == "failed"
+    assert "999" in job.error
+
+
+def test_run_solve_job_records_unexpected_errors(db_session, monkeypatch):
+    """Errors outside the known ones still finish the job as failed, then reach the task."""
+    import app.services.jobs as jobs
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("pool died")
+
+    monkeypatch.setattr(jobs, "solve_result", broken)
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+
+    with pytest.raises(RuntimeError):
+        run_solve_job(db_session.get_bind(), job.id)
+    db_session.expire_all()
+    job = db_session.get(Job, job.id)
+    assert job.status == "failed"
+    assert "pool died" in job.error
+    assert "load" in job.phases
+    assert job.finished_at is not None
+
+
+def test_job_is_claimed_once(db_session):
+    """The affinity copy and the fallback copy of a task cannot both run the job."""
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+    engine = db_session.get_bind()
+
+    assert run_solve_job(engine, job.id).status == "succeeded"
+    assert run_solve_job(engine, job.id) is None
+    assert claim_job(engine, job.id) is False
+
+
+def test_redelivered_task_leaves_job_with_fresh_lease(db_session):
+    """A redelivered copy only takes a running job over once its worker stopped renewing the lease."""
+    c = _seed(db_session)
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.job_lease_seconds + 60)
+    job = Job(client_id=c.id, status="running", updated_at=datetime.now(timezone.utc),
+              params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+    engine = db_session.get_bind()
+
+    assert claim_job(engine, job.id, resume=True) is False
+    assert run_solve_job(engine, job.id, resume=True) is None
+
+    job.updated_at = stale
+    db_session.commit()
+    renew_lease(engine, job.id)  # the worker is still alive after all
+    assert claim_job(engine, job.id, resume=True) is False
+
+    job.updated_at = stale
+    db_session.commit()
+    assert claim_job(engine, job.id, resume=True) is True
+
+
+def test_task_redelivered_inside_lease_retries_instead_of_skipping(db_session, monkeypatch):
+    """A worker killed moments ago leaves a live lease: the redelivered task retries when it runs out."""
+    import app.worker.tasks as tasks
+    from app.travel_times_subsystem.service import TravelTimeService
+
+    class Retry(Exception):
+        pass
+
+    def retry(countdown=None, **kwargs):
+        retries.append(countdown)
+        return Retry()
+
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+    engine = db_session.get_bind()
+    assert claim_job(engine, job.id)  # the first worker took it, then was OOM-killed
+
+    retries = []
+    monkeypatch.setattr(tasks, "engine", engine)
+    monkeypatch.setattr(tasks, "resident_data", lambda: TravelTimeService(engine))
+    monkeypatch.setattr(tasks.solve_job, "retry", retry)
+    tasks.solve_job.push_request(delivery_info={"redelivered": True}, retries=0, hostname=None)
+    try:
+        with pytest.raises(Retry):
+            tasks.solve_job.run(job.id)
+    finally:
+        tasks.solve_job.pop_request()
+    assert 0 < retries[0] <= settings.job_lease_seconds + 1
+    db_session.expire_all()
+    assert db_session.get(Job, job.id).status == "running"
+
+
+def test_insert_stops_into_finished_job(client: TestClient, db_session):
+    """New stops are added to a finished job's routes and stored as a new, chainable job."""
+    c = _seed(db_session, n=8)
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate", "delivery_point_ids": [2, 3, 4, 5]})
+    db_session.add(job)
+    db_session.commit()
+    run_solve_job(db_session.get_bind(), job.id)
+    db_session.expire_all()  # the runner used its own session
+
+    response = client.post(f"/api/jobs/{job.id}/insertions", json={"delivery_point_ids": [6, 7]})
+    assert response.status_code == 201
+    data = response.json()
+    assert data["kind"] == "insert" and data["status"] == "succeeded"
+    assert data["params"]["base_job_id"] == job.id
+    assert sorted(dp for route in data["result"]["routes"] for dp in route) == [2, 3, 4, 5, 6, 7]
+
+    chained = client.post(f"/api/jobs/{data['id']}/insertions", json={"delivery_point_ids": [8]})
+    assert sorted(dp for route in chained.json()["result"]["routes"] for dp in route) == [2, 3, 4, 5, 6, 7, 8]
+    assert client.post(f"/api/jobs/{data['id']}/insertions", json={"delivery_point_ids": [6]}).status_code == 400
+
+
+def test_get_job_routes_as_arrow(client: TestClient, db_session):
+    """Accept: Arrow returns the job's routes as a table of stops."""
+    pa = pytest.importorskip("pyarrow")
+    c = _seed(db_session)
+    job = Job(client_id=c.id, status="succeeded", params={}, result={"routes": [[3, 2], [5]]})
+    db_session.add(job)
+    db_session.commit()
+    response = client.get(f"/api/jobs/{job.id}", headers={"Accept": "application/vnd.apache.arrow.stream"})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.to_pydict() == {"route": [0, 0, 1], "position": [0, 1, 0], "delivery_point_id": [3, 2, 5]}
+
+
+def test_insert_stops_needs_finished_job(client: TestClient, db_session):
+    c = _seed(db_session)
+    job = Job(client_id=c.id, params={"depot_id": 1})
+    db_session.add(job)
+    db_session.commit()
+    assert client.post(f"/api/jobs/{job.id}/insertions", json={"delivery_point_ids": [2]}).status_code == 409
+    assert client.post("/api/jobs/999/insertions", json={"delivery_point_ids": [2]}).status_code == 404
+
+
+def test_redelivered_alns_job_resumes_and_clears_checkpoint(db_session, monkeypatch, tmp_path):
+    """A job left running by a dead worker is taken over on redelivery; its checkpoint is removed when done."""
+    from app.config import settings
+    from app.services.jobs import checkpoint_path
+
+    monkeypatch.setattr(settings, "checkpoint_dir", str(tmp_path))
+    c = _seed(db_session, n=10)
+    job = Job(client_id=c.id, status="running", updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+              params={"depot_id": 1, "travel_times": "approximate", "mode": "alns", "iterations": 20, "workers": 1})
+    db_session.add(job)
+    db_session.commit()
+    engine = db_session.get_bind()
+
+    assert run_solve_job(engine, job.id) is None  # a plain duplicate must not run it
+    finished = run_solve_job(engine, job.id, resume=True)
+    assert finished.status == "succeeded", finished.error
+    assert finished.result["stats"]["iterations"] == 20
+    assert not checkpoint_path(job.id).exists()
+
+
+def test_run_solve_job_reports_presolve_reduction(db_session):
+    """Delivery points at the same coordinates are solved as one stop and expanded back in the routes."""
+    c = _seed(db_session, n=6)
+    db_session.execute(insert(DeliveryPoint), [{"name": "Same building", "latitude": 38.72, "longitude": -9.16}])
+    db_session.execute(insert(client_delivery_points), [{"client_id": c.id, "delivery_point_id": 7}])
+    db_session.commit()
+    job = Job(client_id=c.id, params={"depot_id": 1, "travel_times": "approximate"})
+    db_session.add(job)
+    db_session.commit()
+
+    job = run_solve_job(db_session.get_bind(), job.id)
+    assert job.result["presolve"]["merged_stops"] == 1
+    assert sorted(dp for route in job.result["routes"] for dp in route) == [2, 3, 4, 5, 6, 7]
+
+
+def test_scenario_job_compares_variants(client: TestClient, db_session, dispatched):
+    """POST /api/jobs/scenarios queues one job; running it solves every scenario on one matrix."""
+    c = _seed(db_session, n=8)
+    response = client.post("/api/jobs/scenarios", json={
+        "client_id": c.id,
+        "depot_id": 1,
+        "travel_times": "approximate",
+        "vehicle_capacity": 3,
+        "scenarios": [{"name": "one van", "vehicles": 1}, {"name": "fleet"}, {"name": "big vans", "vehicle_capacity": 10}],
+    })
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["kind"] == "scenarios"
+    assert dispatched[0][0] == job_id
+
+    job = run_solve_job(db_session.get_bind(), job_id)
+    assert job.status == "succeeded"
+    one_van, fleet, big = job.result["scenarios"]
+    assert one_van["n_routes"] == 1 and one_van["served"] == 3 and len(one_van["unserved"]) == 4
+    assert fleet["n_routes"] == 3 and fleet["unserved"] == []
+    assert big["n_routes"] == 1 and big["unserved"] == []
+    assert job.result["best"] == "big vans"
+    assert client.post(f"/api/jobs/{job_id}/insertions", json={"delivery_point_ids": [2]}).status_code == 409
+
+
+def test_scenario_overrides_map_vehicle_capacity_to_capacity(monkeypatch):
+    """The solver gets ``capacity`` only, with the defaults filled in, and the result says it ran in turn."""
+    captured = []
+    monkeypatch.setattr(jobs, "solve_scenarios", lambda instance, scenarios, *args: captured.extend(scenarios) or [])
+    instance = city_instance(5, seed=1)
+    params = {"workers": 1, "scenarios": [{"name": "big vans", "vehicle_capacity": 10, "vehicles": None}, {"name": "fleet"}]}
+    result = jobs.scenario_result(instance, np.arange(instance.size), params)
+    assert captured == [
+        {"mode": "local_search", "iterations": 300, "seed": 0, "name": "big vans", "capacity": 10},
+        {"mode": "local_search", "iterations": 300, "seed": 0, "name": "fleet", "capacity": None},
+    ]
+    assert result["parallel"] is False
+
+
+def test_scenario_names_must_be_unique(client: TestClient, db_session, dispatched):
+    c = _seed(db_session)
+    response = client.post("/api/jobs/scenarios", json={
+        "client_id": c.id, "depot_id": 1, "scenarios": [{"name": "a"}, {"name": "a", "vehicles": 2}],
+    })
+    assert response.status_code == 422
+    assert dispatched == []
+
+
+def test_create_job_refused_while_solve_queue_is_deep(client: TestClient, db_session, dispatched, monkeypatch):
+    """POST /jobs answers 503 with Retry-After once job_queue_max_depth jobs are queued."""
+    c = _seed(db_session)
+    monkeypatch.setattr(settings, "job_queue_max_depth", 1)
+    payload = {"client_id": c.id, "depot_id": 1, "travel_times": "approximate"}
+    assert client.post("/api/jobs/", json=payload).status_code == 202
+    response = client.post("/api/jobs/", json=payload)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(settings.job_queue_retry_after_s)
+    assert len(dispatched) == 1
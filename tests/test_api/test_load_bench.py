@@ -0,0 +1,34 @@
+"""Tests for the API load-test driver (in-process, no uvicorn)."""
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.models.clients import Client
+from app.models.delivery_points import DeliveryPoint
+from main import app
+from tests.benchmarks.load_bench import SCENARIOS, Dataset, drive, summarize
+
+
+def test_drive_every_scenario(client: TestClient, db_session):
+    """Every scenario runs against the app without errors and yields percentiles."""
+    db_session.add_all([DeliveryPoint(name=f"DP {i}", address="A", state="S", zip="Z", country="PT") for i in range(60)])
+    db_session.add_all([Client(name=f"C {i}") for i in range(3)])
+    db_session.commit()
+    data = Dataset(delivery_points=60, clients=3)
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return {
+                name: await drive(http, scenario, data, concurrency=1, duration=5.0, max_requests=3)
+                for name, scenario in SCENARIOS.items()
+            }
+
+    for name, (latencies, errors, elapsed) in asyncio.run(run_all()).items():
+        summary = summarize(name, latencies, errors, elapsed)
+        assert summary["requests"] == 3, name
+        assert summary["errors"] == 0, name
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+        assert summary["throughput_rps"] > 0
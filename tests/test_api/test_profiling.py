@@ -0,0 +1,50 @@
+"""Tests for on-demand request profiling."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import profiling
+from app.config import settings
+from app.models.delivery_points import DeliveryPoint
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_admin_token", "secret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_profiling_needs_admin_token(client: TestClient, monkeypatch):
+    assert client.get("/api/clients/", headers={"X-Profile": "inline"}).status_code == 403
+    monkeypatch.setattr(settings, "profiling_admin_token", "secret")
+    assert client.get("/api/clients/", headers={"X-Profile": "inline", "X-Admin-Token": "wrong"}).status_code == 403
+    # Without the flag nothing changes.
+    assert client.get("/api/clients/").json() == []
+
+
+def test_inline_profile_replaces_response(client: TestClient, admin_token):
+    pytest.importorskip("pyinstrument")
+    response = client.get("/api/clients/?profile=inline", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["x-profiled-status"] == "200"
+
+
+def test_cprofile_fallback_sees_sync_endpoint(client: TestClient, db_session, admin_token, monkeypatch):
+    """The endpoint runs in a worker thread; the profile must still cover it."""
+    monkeypatch.setattr(profiling, "pyinstrument", None)
+    db_session.add(DeliveryPoint(name="Dock", address="A", state="S", zip="Z", country="PT"))
+    db_session.commit()
+    response = client.get("/api/delivery-points/1", headers={**ADMIN, "X-Profile": "inline"})
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "get_delivery_point" in response.text
+
+
+def test_stored_profile_keeps_response(client: TestClient, admin_token):
+    response = client.get("/api/clients/", headers={**ADMIN, "X-Profile": "store"})
+    assert response.json() == []
+    report = admin_token / response.headers["x-profile-report"]
+    assert report.exists() and report.stat().st_size > 0
@@ -0,0 +1,126 @@
+"""Query-count and latency budgets for API routes.
+
+Budgets are upper bounds on SQL statements per request; link routes must stay
+constant whatever the batch size.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.models.clients import Client
+from app.models.delivery_points import DeliveryPoint
+
+LINK_BUDGET = 4
+UNLINK_BUDGET = 3
+# Total SQL time for linking the largest batch, generous for slow CI machines.
+LINK_LATENCY_BUDGET_S = 0.5
+
+
+def _seed(db_session, n_points=500, n_clients=50):
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "address": "A", "state": "S", "zip": "Z", "country": "PT"} for i in range(n_points)])
+    db_session.execute(insert(Client), [{"name": f"C {i}"} for i in range(n_clients)])
+    db_session.commit()
+
+
+@pytest.mark.parametrize("batch_size", [1, 10, 500])
+def test_link_client_delivery_points_budget(client: TestClient, db_session, count_queries, batch_size):
+    """Linking delivery points to a client issues at most 4 statements for any batch size."""
+    _seed(db_session)
+    ids = list(range(1, batch_size + 1))
+    with count_queries() as log:
+        response = client.post("/api/clients/1/delivery-points", json={"delivery_point_ids": ids})
+    assert response.status_code == 200
+    assert len(response.json()) == batch_size
+    assert log.count <= LINK_BUDGET, log.statements
+    assert log.total_time < LINK_LATENCY_BUDGET_S
+
+
+def test_link_client_delivery_points_budget_when_already_linked(client: TestClient, db_session, count_queries):
+    """Re-linking existing links (nothing to insert) stays within budget."""
+    _seed(db_session)
+    ids = list(range(1, 101))
+    client.post("/api/clients/1/delivery-points", json={"delivery_point_ids": ids})
+    with count_queries() as log:
+        response = client.post("/api/clients/1/delivery-points", json={"delivery_point_ids": ids + [101]})
+    assert response.status_code == 200
+    assert len(response.json()) == 101
+    assert log.count <= LINK_BUDGET, log.statements
+
+
+@pytest.mark.parametrize("batch_size", [1, 50])
+def test_link_delivery_point_clients_budget(client: TestClient, db_session, count_queries, batch_size):
+    """Linking clients to a delivery point issues at most 4 statements for any batch size."""
+    _seed(db_session)
+    with count_queries() as log:
+        response = client.post("/api/delivery-points/1/clients", json={"client_ids": list(range(1, batch_size + 1))})
+    assert response.status_code == 200
+    assert log.count <= LINK_BUDGET, log.statements
+
+
+def test_unlink_budget_does_not_load_collection(client: TestClient, db_session, count_queries):
+    """Unlinking deletes the link row without loading the client's other links."""
+    _seed(db_session)
+    client.post("/api/clients/1/delivery-points", json={"delivery_point_ids": list(range(1, 501))})
+    with count_queries() as log:
+        response = client.delete("/api/clients/1/delivery-points/7")
+    assert response.status_code == 204
+    assert log.count <= UNLINK_BUDGET, log.statements
+    with count_queries() as log:
+        response = client.delete("/api/delivery-points/8/clients/1")
+    assert response.status_code == 204
+    assert log.count <= UNLINK_BUDGET, log.statements
+
+
+@pytest.mark.parametrize(
+    "path, budget",
+    [
+        ("/api/clients/", 1),
+        ("/api/delivery-points/", 1),
+        ("/api/clients/1", 1),
+        ("/api/delivery-points/1", 1),
+        ("/api/clients/1/delivery-points", 2),
+        ("/api/delivery-points/1/clients", 2),
+    ],
+)
+def test_read_route_budgets(client: TestClient, db_session, count_queries, path, budget):
+    """Read routes stay at one or two statements regardless of table size."""
+    _seed(db_session)
+    db_session.expunge_all()
+    with count_queries() as log:
+        response = client.get(path)
+    assert response.status_code == 200
+    assert log.count <= budget, log.statements
+
+
+def test_bulk_delete_budget(client: TestClient, db_session, count_queries):
+    """Bulk deleting 2500 delivery points is one select plus one DELETE per 1000-id chunk."""
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "country": "PT"} for i in range(2500)])
+    db_session.commit()
+    with count_queries() as log:
+        response = client.post("/api/delivery-points/bulk-delete", json={"country": "PT"})
+    assert response.json() == {"matched": 2500, "deleted": 2500, "task_id": None}
+    assert sum(s.lstrip().upper().startswith(("SELECT", "DELETE")) for s in log.statements) <= 1 + 3, log.statements
+
+
+@pytest.mark.parametrize("batch_size", [1, 500, 2500])
+def test_batch_get_budget(client: TestClient, db_session, count_queries, batch_size):
+    """Fetching many delivery points by id is one SELECT per 1000 ids."""
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "address": "A", "state": "S", "zip": "Z", "country": "PT"} for i in range(2500)])
+    db_session.commit()
+    ids = list(range(batch_size, 0, -1))
+    with count_queries() as log:
+        response = client.post("/api/delivery-points/batch-get", json={"ids": ids})
+    assert [dp["id"] for dp in response.json()["items"]] == ids
+    assert log.count <= -(-batch_size // 1000), log.statements
+
+
+def test_bulk_update_budget(client: TestClient, db_session, count_queries):
+    """Updating coordinates of 2000 points is one existence SELECT per 1000 ids and one executemany UPDATE."""
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "address": "A", "state": "S", "zip": "Z", "country": "PT"} for i in range(2000)])
+    db_session.commit()
+    items = [{"id": i, "latitude": 38.7 + i * 1e-5, "longitude": -9.1} for i in range(1, 2001)]
+    with count_queries() as log:
+        response = client.patch("/api/delivery-points/", json={"items": items})
+    assert response.json()["updated"] == 2000
+    assert sum(s.lstrip().upper().startswith(("SELECT", "UPDATE")) for s in log.statements) <= 3, log.statements
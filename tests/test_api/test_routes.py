@@ -0,0 +1,74 @@
+"""Tests for route evaluation API."""
+
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.models.delivery_points import DeliveryPoint
+from app.travel_times_subsystem.cache import store_matrix
+
+
+def _seed(db_session, n=5):
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": 38.70 + 0.01 * i, "longitude": -9.14} for i in range(n)],
+    )
+    db_session.commit()
+    ids = np.arange(1, n + 1)
+    durations = 60.0 * np.abs(ids[:, None] - ids[None, :])
+    store_matrix(db_session.get_bind(), ids, 32, durations, distances=10 * durations)
+    return ids
+
+
+def test_evaluate_uses_cached_travel_times(client: TestClient, db_session):
+    """Totals, ETAs and loads follow the cached legs; routes leave at the bucket start."""
+    _seed(db_session)
+    response = client.post("/api/routes/evaluate", json={"depot_id": 1, "routes": [[2, 4], [5]]})
+    assert response.status_code == 200
+    first, second = response.json()["routes"]
+    assert first["travel_s"] == 60 + 120 + 180
+    assert first["distance_m"] == 3600
+    assert first["etas_s"] == [8 * 3600 + 60, 8 * 3600 + 180]
+    assert first["loads"] == [1.0, 2.0]
+    assert first["feasible"] and first["violations"] == []
+    assert second["return_s"] - second["departure_s"] == 480
+    assert response.json()["totals"] == {
+        "routes": 2, "stops": 3, "travel_s": 840.0, "distance_m": 8400.0, "feasible_routes": 2,
+    }
+
+
+def test_evaluate_reports_violations(client: TestClient, db_session):
+    _seed(db_session)
+    response = client.post(
+        "/api/routes/evaluate",
+        json={"depot_id": 1, "routes": [[2, 3, 2], [4]], "vehicle_capacity": 2, "start_time_s": 86_300},
+    )
+    first, second = response.json()["routes"]
+    types = sorted(v["type"] for v in first["violations"])
+    assert types == ["capacity", "repeated_stop", "return_late", "time_window", "time_window"]
+    assert next(v for v in first["violations"] if v["type"] == "capacity")["amount"] == 1.0
+    assert not first["feasible"]
+    assert [v["type"] for v in second["violations"]] == ["time_window", "return_late"]
+
+
+def test_evaluate_unknown_point_404(client: TestClient, db_session):
+    _seed(db_session)
+    response = client.post("/api/routes/evaluate", json={"depot_id": 1, "routes": [[2, 99]]})
+    assert response.status_code == 404
+    assert "99" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("n_routes", [2000])
+def test_evaluate_thousands_of_routes(client: TestClient, db_session, n_routes):
+    """Thousands of candidate routes are scored in one call."""
+    ids = _seed(db_session, n=40)
+    rng = np.random.default_rng(0)
+    routes = [rng.choice(ids[1:], size=12, replace=False).tolist() for _ in range(n_routes)]
+    started = time.perf_counter()
+    response = client.post("/api/routes/evaluate", json={"depot_id": 1, "routes": routes, "travel_times": "approximate"})
+    assert response.status_code == 200
+    assert time.perf_counter() - started < 5.0
+    assert response.json()["totals"]["stops"] == 12 * n_routes
@@ -0,0 +1,66 @@
+"""Tests for set-based bulk deletion."""
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.models.jobs import Job
+from app.models.travel_times import TravelTime
+from app.services.bulk_delete import delete_ids, matching_ids
+
+
+def _seed(db_session):
+    """Client 1 owns points 1-4, client 2 shares point 4 and owns 5; a cached leg 1 -> 2."""
+    db_session.add_all([Client(name="Leaving"), Client(name="Staying")])
+    db_session.flush()
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "country": "PT"} for i in range(5)])
+    links = [(1, 1), (1, 2), (1, 3), (1, 4), (2, 4), (2, 5)]
+    db_session.execute(insert(client_delivery_points), [{"client_id": c, "delivery_point_id": d} for c, d in links])
+    db_session.add(TravelTime(origin_id=1, destination_id=2, time_bucket=32, duration_s=60.0))
+    db_session.add(Job(client_id=1, params={}))
+    db_session.commit()
+    return db_session.get_bind()
+
+
+def _count(db_session, table) -> int:
+    return db_session.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def test_offboarding_deletes_exclusive_points_and_cascades(db_session):
+    engine = _seed(db_session)
+    ids = matching_ids(engine, "delivery_points", {"client_id": 1, "exclusive": True})
+    assert ids == [1, 2, 3]
+    assert delete_ids(engine, "delivery_points", ids) == 3
+    assert delete_ids(engine, "clients", [1]) == 1
+    # Links, cached travel times and jobs went with their rows.
+    links = {tuple(row) for row in db_session.execute(select(client_delivery_points))}
+    assert links == {(2, 4), (2, 5)}
+    assert _count(db_session, TravelTime) == 0
+    assert _count(db_session, Job) == 0
+
+
+def test_delete_ids_reports_progress_per_chunk(db_session):
+    engine = _seed(db_session)
+    progress = []
+    deleted = delete_ids(engine, "delivery_points", [1, 2, 3, 4, 5, 99], chunk_size=4,
+                         on_progress=lambda done, deleted: progress.append((done, deleted)))
+    assert deleted == 5
+    assert progress == [(4, 4), (6, 5)]
+
+
+def test_matching_ids_resolves_long_id_lists_in_chunks(db_session, count_queries):
+    """More ids than SQLite's 32,766 bound parameters are resolved chunk by chunk, filters included."""
+    engine = _seed(db_session)
+    ids = list(range(1, 40_001))
+    with count_queries(engine) as log:
+        assert matching_ids(engine, "delivery_points", {"ids": ids}) == [1, 2, 3, 4, 5]
+    assert log.count == 40
+    assert matching_ids(engine, "delivery_points", {"ids": ids[::-1], "client_id": 2}) == [4, 5]
+
+
+def test_matching_ids_needs_a_criterion(db_session):
+    engine = _seed(db_session)
+    with pytest.raises(ValueError):
+        matching_ids(engine, "clients", {"ids": None, "name": None})
+    assert matching_ids(engine, "clients", {"name": "Staying"}) == [2]
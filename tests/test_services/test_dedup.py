@@ -0,0 +1,93 @@
+"""Tests for near-duplicate delivery point detection and merging."""
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, select
+
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.services.dedup import find_duplicates, merge_duplicates, normalize_text
+from app.travel_times_subsystem.geometry import close_pairs, haversine_matrix
+
+POINTS = [
+    # id 1-3: one shop typed three ways, a few meters apart
+    {"name": "Padaria Central", "address": "Av. da Liberdade 120", "zip": "1250-146", "country": "PT", "latitude": 38.7200, "longitude": -9.1450},
+    {"name": "Padaria Central", "address": "Avenida da Liberdade, nº 120", "zip": "1250146", "country": "PT", "latitude": 38.72005, "longitude": -9.14505},
+    {"name": "padaria central lda", "address": "AVENIDA DA LIBERDADE 120", "zip": "1250-146", "country": "PT", "latitude": 38.72010, "longitude": -9.14495},
+    # id 4: a different business next door
+    {"name": "Farmácia Lima", "address": "Av. da Liberdade 122", "zip": "1250-146", "country": "PT", "latitude": 38.72015, "longitude": -9.1450},
+    # id 5: same address as 6 but geocoded far away; id 6 has no coordinates
+    {"name": "Café Sol", "address": "Rua Augusta 10", "zip": "1100-053", "country": "PT", "latitude": 38.80, "longitude": -9.30},
+    {"name": "Cafe Sol", "address": "R. Augusta, 10", "zip": "1100-053", "country": "PT", "latitude": None, "longitude": None},
+]
+
+
+def _seed(db_session):
+    db_session.execute(insert(DeliveryPoint), POINTS)
+    db_session.add_all([Client(name="A"), Client(name="B")])
+    db_session.flush()
+    db_session.execute(insert(client_delivery_points), [
+        {"client_id": 1, "delivery_point_id": 1},
+        {"client_id": 1, "delivery_point_id": 2},
+        {"client_id": 2, "delivery_point_id": 2},
+        {"client_id": 2, "delivery_point_id": 6},
+    ])
+    db_session.commit()
+
+
+def test_normalize_text():
+    assert normalize_text("Av. da Liberdade, nº 120") == normalize_text("AVENIDA DA LIBERDADE 120") == "avenida da liberdade 120"
+    assert normalize_text("Praça do Comércio") == "praca do comercio"
+    assert normalize_text(None) == ""
+
+
+def test_close_pairs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    coords = np.column_stack((38.7 + rng.normal(0, 0.02, 1500), -9.14 + rng.normal(0, 0.02, 1500)))
+    i, j, distance = close_pairs(coords, 100.0)
+    expected = np.argwhere(np.triu(haversine_matrix(coords) <= 100.0, k=1))
+    assert sorted(zip(i.tolist(), j.tolist())) == sorted(map(tuple, expected.tolist()))
+    assert (distance <= 100.0).all()
+
+
+def test_find_duplicates_clusters(db_session):
+    """Nearby similar points and equal addresses in one zip cluster; the neighbour shop does not."""
+    _seed(db_session)
+    report = find_duplicates(db_session.get_bind())
+    clusters = {c["canonical_id"]: c["duplicate_ids"] for c in report["clusters"]}
+    # Point 2 has the most client links, so it is kept.
+    assert clusters == {2: [1, 3], 5: [6]}
+    assert report["duplicates"] == 3
+    assert report["clusters"][0]["max_distance_m"] < 20
+
+
+def test_find_duplicates_keeps_tenants_at_one_address_apart(db_session):
+    """Different businesses sharing an address and zip are candidates, not duplicates."""
+    db_session.execute(insert(DeliveryPoint), [
+        {"name": "Farmácia Lima", "address": "Rua Augusta 20", "zip": "1100-053", "country": "PT", "latitude": None, "longitude": None},
+        {"name": "Padaria Sousa", "address": "R. Augusta, 20", "zip": "1100-053", "country": "PT", "latitude": None, "longitude": None},
+        {"name": "Talho Costa", "address": "Rua Augusta 20", "zip": "1100053", "country": "PT", "latitude": None, "longitude": None},
+    ])
+    db_session.commit()
+    report = find_duplicates(db_session.get_bind())
+    assert report["clusters"] == []
+    assert report["candidate_pairs"] == 3
+
+
+def test_merge_duplicates_repoints_links(db_session):
+    _seed(db_session)
+    engine = db_session.get_bind()
+    assert merge_duplicates(engine, [(2, [1, 3]), (5, [6])]) == {"merged": 3, "links_added": 1}
+    links = {tuple(row) for row in db_session.execute(select(client_delivery_points))}
+    assert links == {(1, 2), (2, 2), (2, 5)}
+    assert db_session.execute(select(DeliveryPoint.id).order_by(DeliveryPoint.id)).scalars().all() == [2, 4, 5]
+
+
+def test_merge_duplicates_rejects_overlap_and_unknown(db_session):
+    _seed(db_session)
+    engine = db_session.get_bind()
+    with pytest.raises(ValueError):
+        merge_duplicates(engine, [(2, [1]), (1, [3])])
+    with pytest.raises(KeyError):
+        merge_duplicates(engine, [(2, [99])])
+    assert db_session.execute(select(DeliveryPoint.id).order_by(DeliveryPoint.id)).scalars().all() == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,76 @@
+"""Tests for the in-process entity response cache."""
+
+from app.services.entity_cache import EntityCache, LocalBus
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_read_through_counts_hits_and_skips_not_found():
+    cache = EntityCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return b'{"id": 1}'
+
+    assert cache.get_or_load("clients", 1, load) == b'{"id": 1}'
+    assert cache.get_or_load("clients", 1, load) == b'{"id": 1}'
+    assert len(loads) == 1
+    assert cache.get_or_load("clients", 2, lambda: None) is None
+    assert cache.get_or_load("clients", 2, lambda: None) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+    assert stats["namespaces"]["clients"]["hit_ratio"] == 0.25
+
+
+def test_entries_expire_after_ttl_and_lru_is_bounded():
+    clock = Clock()
+    cache = EntityCache(max_entries=2, ttl_seconds=10, clock=clock)
+    for key in (1, 2):
+        cache.get_or_load("clients", key, lambda: b"old")
+    cache.get_or_load("clients", 1, lambda: b"new")  # hit: 1 is now most recent
+    cache.get_or_load("clients", 3, lambda: b"three")  # evicts 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_load("clients", 2, lambda: b"reloaded") == b"reloaded"  # evicts 1
+    assert cache.get_or_load("clients", 3, lambda: b"unused") == b"three"
+    clock.now = 11
+    assert cache.get_or_load("clients", 3, lambda: b"fresh") == b"fresh"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidation_reaches_other_processes_on_the_bus():
+    bus = LocalBus()
+    first, second = EntityCache(bus=bus), EntityCache(bus=bus)
+    for cache in (first, second):
+        cache.get_or_load("clients", 1, lambda: b"old")
+        cache.get_or_load("client_delivery_points", 1, lambda: b"[]")
+    first.invalidate("clients", [1])
+    assert second.get_or_load("clients", 1, lambda: b"new") == b"new"
+    assert second.get_or_load("client_delivery_points", 1, lambda: b"other") == b"[]"
+    second.clear()
+    assert first.get_or_load("client_delivery_points", 1, lambda: b"[1]") == b"[1]"
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = EntityCache()
+
+    def load():
+        # A write commits and invalidates while this (now stale) read is in flight.
+        cache.invalidate("clients", [1])
+        return b"stale"
+
+    assert cache.get_or_load("clients", 1, load) == b"stale"
+    assert cache.get_or_load("clients", 1, lambda: b"fresh") == b"fresh"
+
+
+def test_disabled_cache_always_loads():
+    cache = EntityCache(enabled=False)
+    cache.get_or_load("clients", 1, lambda: b"old")
+    assert cache.get_or_load("clients", 1, lambda: b"new") == b"new"
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,180 @@
+"""Tests for the nightly travel time matrix precompute."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import httpx
+import numpy as np
+from sqlalchemy import insert
+
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.models.jobs import Job
+from app.services.precompute import client_point_sets, matrix_statuses, next_departure, precompute_matrices
+from app.travel_times_subsystem.cache import load_durations
+from app.travel_times_subsystem.client import GoogleMapsClient
+
+
+def _provider(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["departure_time"])
+        n_o = len(request.url.params["origins"].split("|"))
+        n_d = len(request.url.params["destinations"].split("|"))
+        row = {"elements": [{"status": "OK", "duration": {"value": 600}, "distance": {"value": 5000}}] * n_d}
+        return httpx.Response(200, json={"status": "OK", "rows": [row] * n_o})
+
+    return handler
+
+
+def _seed(db_session):
+    """Client 1 (3 jobs) owns points 1-4, client 2 (1 job) points 4-6, client 3 has no recent jobs."""
+    db_session.add_all([Client(name="Busy"), Client(name="Quiet"), Client(name="Idle")])
+    db_session.flush()
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": 38.7 + 0.01 * i, "longitude": -9.1} for i in range(6)]
+        + [{"name": "No coords", "latitude": None, "longitude": None}],
+    )
+    links = [(1, 1), (1, 2), (1, 3), (1, 4), (1, 7), (2, 4), (2, 5), (2, 6), (3, 1), (3, 2)]
+    db_session.execute(insert(client_delivery_points), [{"client_id": c, "delivery_point_id": d} for c, d in links])
+    now = datetime.now(timezone.utc)
+    db_session.add_all([Job(client_id=1, params={}) for _ in range(3)] + [Job(client_id=2, params={})])
+    db_session.add(Job(client_id=3, params={}, created_at=now - timedelta(days=30)))
+    db_session.commit()
+    return db_session.get_bind(), now
+
+
+def _run(engine, now, max_elements=None):
+    calls = []
+
+    async def go():
+        async with GoogleMapsClient(api_key="k", base_url="http://mock", transport=httpx.MockTransport(_provider(calls)),
+                                    elements_per_second=1_000_000) as maps:
+            return await precompute_matrices(engine, maps, now=now, time_buckets=[28, 32], lookback_days=7,
+                                             max_age_days=14, max_elements=max_elements)
+
+    return asyncio.run(go()), calls
+
+
+def test_active_clients_and_point_sets(db_session):
+    engine, now = _seed(db_session)
+    statuses = matrix_statuses(engine, now, [32], lookback_days=7, max_age_days=14)
+    assert {s.client_id: s.weight for s in statuses} == {1: 3, 2: 1}
+    sets = client_point_sets(engine, [1, 2])
+    assert sets[1][0].tolist() == [1, 2, 3, 4]  # point 7 has no coordinates
+    assert all(not s.warm for s in statuses)
+
+
+def test_precompute_warms_every_matrix_and_reports_coverage(db_session):
+    engine, now = _seed(db_session)
+    stats, calls = _run(engine, now)
+    assert stats["active_clients"] == 2
+    assert stats["before"]["expected_warm_solves"] == 0.0
+    assert stats["after"] == {"matrices": 4, "warm_matrices": 4, "pair_coverage": 1.0, "expected_warm_solves": 1.0}
+    # 4x4 for client 1 and 3x3 for client 2, per bucket.
+    assert stats["elements"] == 2 * (16 + 9)
+    assert np.all(load_durations(engine, [1, 2, 3, 4], range(28, 29))[~np.eye(4, dtype=bool)] == 600)
+    assert all(int(t) > now.timestamp() for t in calls)
+
+    # Nothing is stale on a second run, so the provider is not called again.
+    again, calls = _run(engine, now)
+    assert again["elements"] == 0 and calls == []
+
+
+def test_precompute_respects_budget_and_prefers_busy_clients(db_session):
+    engine, now = _seed(db_session)
+    stats, _ = _run(engine, now, max_elements=32)
+    assert stats["elements"] == 32  # both buckets of client 1; client 2 does not fit
+    assert stats["after"]["warm_matrices"] == 2
+    assert stats["after"]["expected_warm_solves"] == 0.75
+
+
+class _Predictor:
+    """Sure of every pair except those leaving the first point."""
+
+    def predict_matrix(self, coords, bucket):
+        sigma = np.zeros((len(coords), len(coords)))
+        sigma[0] = 1.0
+        return np.full_like(sigma, 600.0), sigma
+
+
+def test_precompute_leaves_confident_rows_to_the_predictor(db_session):
+    engine, now = _seed(db_session)
+    calls = []
+
+    async def go():
+        async with GoogleMapsClient(api_key="k", base_url="http://mock", transport=httpx.MockTransport(_provider(calls)),
+                                    elements_per_second=1_000_000) as maps:
+            return await precompute_matrices(engine, maps, now=now, time_buckets=[32], lookback_days=7,
+                                             max_age_days=14, predictor=_Predictor())
+
+    stats = asyncio.run(go())
+    # One uncertain row per client: 1x4 for client 1 and 1x3 for client 2.
+    assert stats["elements"] == 4 + 3
+    assert stats["predicted_rows"] == 3 + 2
+    assert len(calls) == 2
+
+
+def _run_with(engine, now, handler, time_buckets=(32,)):
+    async def go():
+        async with GoogleMapsClient(api_key="k", base_url="http://mock", transport=httpx.MockTransport(handler),
+                                    elements_per_second=1_000_000) as maps:
+            return await precompute_matrices(engine, maps, now=now, time_buckets=list(time_buckets), lookback_days=7,
+                                             max_age_days=14)
+
+    return asyncio.run(go())
+
+
+def test_provider_error_on_one_matrix_does_not_stop_the_run(db_session, caplog):
+    engine, now = _seed(db_session)
+    calls = []
+    ok = _provider(calls)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(request.url.params["destinations"].split("|")) == 4:  # client 1
+            return httpx.Response(200, json={"status": "REQUEST_DENIED", "error_message": "key revoked"})
+        return ok(request)
+
+    stats = _run_with(engine, now, handler)
+    assert stats["failed"] == 1 and stats["refreshed"] == 1
+    assert stats["after"]["warm_matrices"] == 1  # client 2 was still refreshed
+    assert "key revoked" in caplog.text
+
+
+def test_pairs_without_route_are_not_refetched(db_session):
+    engine, now = _seed(db_session)
+    calls = []
+    ok = _provider(calls)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = ok(request)
+        body = response.json()
+        # No route from the first origin of each request to its last destination.
+        body["rows"][0] = {"elements": body["rows"][0]["elements"][:-1] + [{"status": "ZERO_RESULTS"}]}
+        return httpx.Response(200, json=body)
+
+    stats = _run_with(engine, now, handler)
+    assert stats["after"]["warm_matrices"] == 2
+    durations = load_durations(engine, [1, 2, 3, 4], range(32, 33))[:, :, 0]
+    assert np.isnan(durations[0, 3]) and durations[0, 1] == 600  # the marker reads as missing
+
+    calls.clear()
+    again = _run_with(engine, now, handler)
+    assert again["elements"] == 0 and calls == []
+
+
+def test_next_departure_is_next_local_morning():
+    tz = ZoneInfo("Europe/Lisbon")
+    now = datetime(2026, 3, 10, 2, 0, tzinfo=timezone.utc)
+    assert datetime.fromtimestamp(next_departure(now, 32, tz), tz) == datetime(2026, 3, 10, 8, 0, tzinfo=tz)
+    late = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    assert datetime.fromtimestamp(next_departure(late, 32, tz), tz) == datetime(2026, 3, 11, 8, 0, tzinfo=tz)
+
+
+def test_beat_schedule_points_at_registered_task():
+    from app.worker.celery_app import celery_app
+    import app.worker.tasks  # noqa: F401 - registers tasks
+
+    entry = celery_app.conf.beat_schedule["precompute-morning-matrices"]
+    assert entry["task"] in celery_app.tasks
@@ -0,0 +1,81 @@
+"""Tests for the snapshot problem loader."""
+
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.models.clients import Client, client_delivery_points
+from app.models.delivery_points import DeliveryPoint
+from app.services.problem_loader import load_problem
+
+
+def _seed(db_session):
+    dps = [
+        DeliveryPoint(name=f"DP {i}", address="A", state="S", zip="Z", country="PT",
+                      latitude=38.0 + i, longitude=-9.0 - i)
+        for i in range(4)
+    ]
+    dps.append(DeliveryPoint(name="No coords", address="A", state="S", zip="Z", country="PT"))
+    a, b = Client(name="A"), Client(name="B")
+    a.delivery_points.extend(dps[:2])
+    b.delivery_points.extend(dps[1:3] + dps[4:])
+    db_session.add_all(dps + [a, b])
+    db_session.commit()
+    return a, b, dps
+
+
+def test_load_problem_for_client(db_session):
+    """Loads only the client's points, sorted by id, with links as node indices."""
+    a, _, dps = _seed(db_session)
+    problem = load_problem(db_session.get_bind(), client_ids=[a.id])
+    assert problem.ids.tolist() == [dps[0].id, dps[1].id]
+    assert problem.coords.dtype == np.float64
+    np.testing.assert_allclose(problem.coords, [[38.0, -9.0], [39.0, -10.0]])
+    assert problem.link_clients.tolist() == [a.id, a.id]
+    assert sorted(problem.link_nodes.tolist()) == [0, 1]
+    assert problem.demands.tolist() == [1.0, 1.0]
+    assert problem.windows.shape == (2, 2)
+
+
+def test_load_problem_union_and_missing_coords(db_session):
+    """Client points and explicit points are merged; missing coordinates become NaN."""
+    a, b, dps = _seed(db_session)
+    problem = load_problem(db_session.get_bind(), client_ids=[b.id], delivery_point_ids=[dps[3].id])
+    assert problem.ids.tolist() == sorted(dp.id for dp in (dps[1], dps[2], dps[3], dps[4]))
+    assert problem.missing_coords.tolist() == [dps[4].id]
+    assert problem.index_of([dps[3].id]).tolist() == [problem.ids.tolist().index(dps[3].id)]
+    with pytest.raises(KeyError):
+        problem.index_of([dps[0].id])
+
+
+def test_load_problem_requires_selection(db_session):
+    """Loading without clients or points is an error."""
+    with pytest.raises(ValueError):
+        load_problem(db_session.get_bind())
+
+
+def test_load_problem_10k_points_fast(db_session):
+    """A 10k-point problem loads well under a second into a small footprint."""
+    n = 10_000
+    client_row = Client(name="Big")
+    db_session.add(client_row)
+    db_session.commit()
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": 38.0 + i * 1e-4, "longitude": -9.0} for i in range(n)],
+    )
+    db_session.execute(
+        insert(client_delivery_points),
+        [{"client_id": client_row.id, "delivery_point_id": i + 1} for i in range(n)],
+    )
+    db_session.commit()
+
+    started = time.perf_counter()
+    problem = load_problem(db_session.get_bind(), client_ids=[client_row.id])
+    elapsed = time.perf_counter() - started
+
+    assert problem.size == n
+    assert elapsed < 1.0
+    assert problem.nbytes < 1_000_000
@@ -0,0 +1 @@
+"""Solver tests."""
@@ -0,0 +1,57 @@
+"""Tests for the ALNS mode and its process-parallel multi-start."""
+
+import logging
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.solver import shared
+from app.solver.alns import new_state, search
+from app.solver.evaluation import route_is_feasible
+from app.solver.instances import city_instance, uniform_instance
+from app.solver.solver import solve
+
+
+def test_alns_improves_on_local_search():
+    instance = uniform_instance(50, seed=7, time_windows=True)
+    alns = solve(instance, "alns", iterations=150)
+    assert alns.objective < solve(instance, "local_search").objective
+    assert alns.stats["iterations"] == 150
+    assert alns.stats["trace"][-1][1] >= alns.objective - 1e-6  # final 2-opt can only improve
+
+
+def test_search_state_is_resumable():
+    """Two runs of 40 iterations give the same result as one run of 80."""
+    instance = city_instance(40, seed=2)
+    routes = solve(instance, "local_search").routes
+    once = search(instance, new_state(instance, routes, seed=3, iterations=80), 80)
+    twice = search(instance, search(instance, new_state(instance, routes, seed=3, iterations=80), 40), 40)
+    assert once.best_cost == twice.best_cost
+    assert all(np.array_equal(a, b) for a, b in zip(once.best, twice.best))
+
+
+def test_parallel_searches_share_matrix_and_are_reproducible():
+    instance = city_instance(60, seed=4)
+    segments_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    first = solve(instance, "alns", workers=2, iterations=60, exchange_every=20)
+    second = solve(instance, "alns", workers=2, iterations=60, exchange_every=20)
+    assert first.objective == second.objective
+    assert first.stats["workers"] == 2 and first.stats["iterations"] == 120
+    assert first.stats["parallel"]
+    assert sorted(np.concatenate(first.routes).tolist()) == list(range(1, instance.size))
+    assert all(route_is_feasible(instance, r) for r in first.routes)
+    if segments_before:
+        assert set(os.listdir("/dev/shm")) <= segments_before  # shared memory was released
+
+
+def test_daemonic_process_runs_searches_in_process_and_says_so(monkeypatch, caplog):
+    """Celery prefork children are daemonic: the searches fall back to this process, with a warning."""
+    instance = city_instance(30, seed=5)
+    pooled = solve(instance, "alns", workers=2, iterations=40, exchange_every=20)
+    monkeypatch.setattr(shared, "current_process", lambda: SimpleNamespace(daemon=True))
+    with caplog.at_level(logging.WARNING, logger="app.solver.shared"):
+        fallback = solve(instance, "alns", workers=2, iterations=40, exchange_every=20)
+    assert not fallback.stats["parallel"] and fallback.stats["workers"] == 2
+    assert fallback.objective == pooled.objective  # same searches, only not in parallel
+    assert "daemonic" in caplog.text
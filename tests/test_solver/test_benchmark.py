@@ -0,0 +1,36 @@
+"""Tests for the solver benchmark harness."""
+
+from app.solver.instances import uniform_instance
+from tests.benchmarks.solver_bench import compare, read_results, run, run_scaling, write_results
+
+
+def test_run_records_metrics(tmp_path):
+    """Each (instance, mode) gets wall time, objective, gap and peak memory, and round-trips through JSON."""
+    results = run([uniform_instance(20, seed=1)], modes=["greedy"])
+    assert len(results) == 1
+    record = results[0]
+    assert record["wall_time_s"] > 0
+    assert record["objective"] > 0
+    assert record["gap"] is None
+    assert record["peak_memory_mb"] >= 0
+    path = tmp_path / "bench.json"
+    write_results(path, results)
+    assert read_results(path) == results
+
+
+def test_compare_flags_regressions():
+    """Slower or worse results than baseline are reported; within tolerance is fine."""
+    base = [{"instance": "a", "mode": "greedy", "wall_time_s": 1.0, "objective": 100.0}]
+    assert compare([{"instance": "a", "mode": "greedy", "wall_time_s": 1.1, "objective": 100.2}], base) == []
+    regressions = compare([{"instance": "a", "mode": "greedy", "wall_time_s": 2.0, "objective": 110.0}], base)
+    assert len(regressions) == 2
+    assert compare([{"instance": "b", "mode": "greedy", "wall_time_s": 9.0, "objective": 1e9}], base) == []
+
+
+def test_run_scaling_records_quality_over_time():
+    """One record per worker count, each with a best-objective trace that never gets worse."""
+    records = run_scaling(uniform_instance(20, seed=1), [1, 2], iterations=20)
+    assert [r["workers"] for r in records] == [1, 2]
+    for r in records:
+        objectives = [obj for _, obj in r["trace"]]
+        assert objectives == sorted(objectives, reverse=True)
@@ -0,0 +1,74 @@
+"""Tests for ALNS checkpointing and resume."""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.solver.alns import new_state, solve_alns
+from app.solver.checkpoint import Checkpointer
+from app.solver.instances import city_instance, uniform_instance
+from app.solver.solver import solve
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingCheckpointer(Checkpointer):
+    """Saves normally, then "kills the worker" right after the ``after``-th save."""
+
+    def __init__(self, *args, after: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.after = after
+
+    def save(self, *args):
+        super().save(*args)
+        if self.saves == self.after:
+            raise Crash()
+
+
+def test_resume_after_crash_matches_uninterrupted_run(tmp_path):
+    instance = city_instance(40, seed=5)
+    initial = solve(instance, "local_search").routes
+    options = {"iterations": 80, "exchange_every": 20, "seed": 1}
+    reference, _ = solve_alns(instance, initial, **options)
+
+    path = tmp_path / "job-1.npz"
+    with pytest.raises(Crash):
+        solve_alns(instance, initial, checkpoint=CrashingCheckpointer(path, instance, interval=0, after=2), **options)
+    assert path.exists()
+
+    checkpoint = Checkpointer(path, instance, interval=0)
+    resumed, stats = solve_alns(instance, initial, checkpoint=checkpoint, **options)
+    assert stats["resumed"] is True
+    assert stats["iterations"] == 80
+    assert len(stats["trace"]) == 5  # start + 4 epochs, across both runs
+    assert all(np.array_equal(a, b) for a, b in zip(resumed, reference))
+
+
+def test_checkpoint_for_other_instance_is_ignored(tmp_path):
+    instance = uniform_instance(20, seed=1)
+    other = uniform_instance(20, seed=2)
+    path = tmp_path / "job-2.npz"
+    state = new_state(instance, solve(instance, "greedy").routes, seed=0, iterations=10)
+    heartbeats = []
+    Checkpointer(path, instance, on_save=lambda: heartbeats.append(1)).save([state], [[0.0, state.best_cost]], {})
+    assert heartbeats == [1]
+    assert Checkpointer(path, instance).load() is not None
+    assert Checkpointer(path, other).load() is None
+
+
+def test_checkpoint_is_cheap_to_write(tmp_path):
+    """Saving a 1k-stop, 8-search state takes milliseconds, not seconds."""
+    instance = city_instance(1000, seed=1)
+    routes = solve(instance, "greedy").routes
+    states = [new_state(instance, routes, seed=k, iterations=100) for k in range(8)]
+    checkpoint = Checkpointer(tmp_path / "job-3.npz", instance)
+    started = time.perf_counter()
+    checkpoint.save(states, [[0.0, states[0].best_cost]], {"lower": 0.0})
+    assert time.perf_counter() - started < 0.1
+    assert (tmp_path / "job-3.npz").stat().st_size < 200_000
+    loaded, _, bounds = checkpoint.load()
+    assert bounds == {"lower": 0.0}
+    assert all(np.array_equal(a, b) for a, b in zip(loaded[3].best, states[3].best))
@@ -0,0 +1,56 @@
+"""Tests for the feasibility kernel and incremental insertion."""
+
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from app.solver.evaluation import route_cost, route_is_feasible
+from app.solver.feasibility import insertion_costs, insertion_slots, route_state
+from app.solver.insertion import insert_stops
+from app.solver.instances import city_instance, uniform_instance
+from app.solver.solver import solve
+
+
+def _head(instance, n):
+    """The first ``n`` nodes of ``instance`` as an instance of their own."""
+    return replace(
+        instance,
+        durations=instance.durations[:n, :n],
+        demands=instance.demands[:n],
+        windows=instance.windows[:n],
+        service_times=instance.service_times[:n],
+        coords=None if instance.coords is None else instance.coords[:n],
+    )
+
+
+def test_kernel_agrees_with_full_schedule_evaluation():
+    """O(1) slot checks give the same feasibility and cost delta as re-evaluating the whole route."""
+    instance = uniform_instance(40, seed=5, time_windows=True)
+    routes = solve(_head(instance, 30), "greedy").routes
+    slots = insertion_slots(instance, [route_state(instance, r) for r in routes])
+    for node in range(30, 40):
+        delta, feasible = insertion_costs(instance, slots, node)
+        for k in range(slots.position.size):
+            route = routes[slots.route_index[k]]
+            candidate = np.insert(route, slots.position[k], node)
+            assert feasible[k] == route_is_feasible(instance, candidate)
+            assert np.isclose(delta[k], route_cost(instance.durations, candidate) - route_cost(instance.durations, route))
+
+
+def test_insert_stops_keeps_routes_feasible():
+    instance = uniform_instance(60, seed=6, time_windows=True)
+    routes = solve(_head(instance, 50), "local_search").routes
+    new, opened = insert_stops(instance, routes, range(50, 60))
+    assert sorted(np.concatenate(new).tolist()) == list(range(1, 60))
+    assert all(route_is_feasible(instance, r) for r in new)
+    assert all(len(r) == 1 for r in new if r[0] in opened)
+
+
+def test_insert_into_1k_stop_plan_is_fast():
+    instance = city_instance(1011, seed=1)
+    routes = solve(_head(instance, 1001), "greedy").routes
+    started = time.perf_counter()
+    new, _ = insert_stops(instance, routes, range(1001, 1011))
+    assert time.perf_counter() - started < 0.5
+    assert sorted(np.concatenate(new).tolist()) == list(range(1, 1011))
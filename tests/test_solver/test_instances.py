@@ -0,0 +1,98 @@
+"""Tests for synthetic instance generators and reference-set loaders."""
+
+import numpy as np
+import pytest
+
+from app.solver.instances import (
+    city_instance,
+    clustered_instance,
+    load_cvrplib,
+    load_directory,
+    load_solomon,
+    uniform_instance,
+)
+
+SOLOMON_SAMPLE = """C101
+
+VEHICLE
+NUMBER     CAPACITY
+  25         200
+
+CUSTOMER
+CUST NO.  XCOORD.   YCOORD.    DEMAND   READY TIME  DUE DATE   SERVICE   TIME
+
+    0      40         50          0          0       1236          0
+    1      45         68         10        912        967         90
+    2      45         70         30        825        870         90
+    3      42         66         10         65        146         90
+"""
+
+CVRPLIB_SAMPLE = """NAME : \tX-n4-k2
+COMMENT : \t"test"
+TYPE : \tCVRP
+DIMENSION : \t4
+EDGE_WEIGHT_TYPE : \tEUC_2D
+CAPACITY : \t10
+NODE_COORD_SECTION
+1\t0\t0
+2\t3\t4
+3\t6\t8
+4\t0\t1
+DEMAND_SECTION
+1 0
+2 5
+3 5
+4 3
+DEPOT_SECTION
+\t1
+\t-1
+EOF
+"""
+
+
+@pytest.mark.parametrize("generator", [uniform_instance, clustered_instance, city_instance])
+def test_generators_are_seeded(generator):
+    """Same seed gives identical instances; depot has no demand."""
+    a, b = generator(30, seed=7), generator(30, seed=7)
+    assert a.size == 31
+    np.testing.assert_array_equal(a.durations, b.durations)
+    np.testing.assert_array_equal(a.windows, b.windows)
+    assert a.demands[0] == 0
+    assert not np.array_equal(a.durations, generator(30, seed=8).durations)
+
+
+def test_city_instance_uses_lat_lon():
+    """City instances carry DeliveryPoint-like coordinates and travel times in seconds."""
+    inst = city_instance(50, seed=1)
+    assert np.all(np.abs(inst.coords[:, 0] - 38.72) < 0.5)
+    assert np.all(np.abs(inst.coords[:, 1] + 9.14) < 0.5)
+    assert 0 < np.median(inst.durations) < 3600
+
+
+def test_load_solomon(tmp_path):
+    """Solomon files give vehicles, capacity, windows and service times."""
+    path = tmp_path / "C101.txt"
+    path.write_text(SOLOMON_SAMPLE)
+    inst = load_solomon(path, best_known=100.0)
+    assert inst.name == "C101"
+    assert inst.size == 4
+    assert inst.capacity == 200
+    assert inst.max_vehicles == 25
+    assert inst.windows[3].tolist() == [65.0, 146.0]
+    assert inst.service_times[1] == 90
+    assert inst.durations[0, 3] == pytest.approx(np.hypot(2, 16))
+
+
+def test_load_cvrplib_with_solution_file(tmp_path):
+    """CVRPLIB files use rounded EUC_2D distances and read the .sol cost."""
+    path = tmp_path / "X-n4-k2.vrp"
+    path.write_text(CVRPLIB_SAMPLE)
+    (tmp_path / "X-n4-k2.sol").write_text("Route #1: 1 2\nRoute #2: 3\nCost 21\n")
+    inst = load_cvrplib(path)
+    assert inst.size == 4
+    assert inst.capacity == 10
+    assert inst.max_vehicles == 2
+    assert inst.best_known == 21
+    assert inst.durations[0, 1] == 5
+    assert inst.demands.tolist() == [0, 5, 5, 3]
+    assert [i.name for i in load_directory(tmp_path)] == ["X-n4-k2"]
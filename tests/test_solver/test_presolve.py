@@ -0,0 +1,66 @@
+"""Tests for pre-solve reductions."""
+
+from dataclasses import replace
+
+import numpy as np
+
+from app.solver.evaluation import route_is_feasible
+from app.solver.instances import city_instance
+from app.solver.presolve import presolve
+from app.solver.solver import MODES, solve
+
+
+def _with_duplicates(instance, copies: int, seed: int = 0):
+    """Append ``copies`` stops at the same place as random existing stops (a few seconds away)."""
+    rng = np.random.default_rng(seed)
+    source = rng.integers(1, instance.size, copies)
+    index = np.concatenate((np.arange(instance.size), source))
+    durations = instance.durations[np.ix_(index, index)].copy()
+    n = index.size
+    same_place = index[:, None] == index[None, :]
+    durations[same_place & ~np.eye(n, dtype=bool)] = 5.0
+    return replace(
+        instance,
+        name=f"{instance.name}-dup{copies}",
+        durations=durations,
+        demands=instance.demands[index],
+        windows=instance.windows[index],
+        service_times=instance.service_times[index],
+        coords=None if instance.coords is None else instance.coords[index],
+    )
+
+
+def test_merges_co_located_stops_and_expands_feasibly():
+    instance = _with_duplicates(city_instance(120, seed=3), copies=60)
+    reduced = presolve(instance)
+    assert reduced.report["merged_stops"] >= 50
+    assert reduced.report["reduction"] >= 0.3
+    for mode in MODES:
+        options = {"iterations": 30} if mode == "alns" else {}
+        routes = reduced.expand(solve(reduced.instance, mode, **options).routes)
+        assert sorted(np.concatenate(routes).tolist()) == list(range(1, instance.size))
+        assert all(route_is_feasible(instance, r) for r in routes)
+
+
+def test_does_not_merge_stops_with_incompatible_windows():
+    instance = _with_duplicates(city_instance(10, seed=1), copies=1)
+    windows = instance.windows.copy()
+    windows[-1] = (0.0, 100.0)
+    original = int(np.flatnonzero((instance.durations[-1] == 5.0))[0])
+    windows[original] = (20_000.0, 30_000.0)
+    reduced = presolve(replace(instance, windows=windows))
+    assert not any(len(m) > 1 for m in reduced.members)
+
+
+def test_prunes_arcs_that_break_windows():
+    """With disjoint morning/afternoon windows, afternoon -> morning arcs are unusable."""
+    instance = city_instance(40, seed=2)
+    windows = instance.windows.copy()
+    windows[1:21] = (7 * 3600, 9 * 3600)
+    windows[21:] = (14 * 3600, 16 * 3600)
+    reduced = presolve(replace(instance, windows=windows), merge_seconds=0)
+    d = reduced.instance.durations
+    assert np.isinf(d[21:, 1:21]).all()
+    assert reduced.report["arcs_pruned"] >= 20 * 20
+    routes = reduced.expand(solve(reduced.instance, "local_search").routes)
+    assert all(route_is_feasible(replace(instance, windows=windows), r) for r in routes)
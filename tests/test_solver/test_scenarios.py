@@ -0,0 +1,57 @@
+"""Tests for scenario batches."""
+
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.solver import shared
+from app.solver.evaluation import route_is_feasible
+from app.solver.instances import city_instance
+from app.solver.scenarios import scenario_instance, solve_scenarios
+
+
+def test_scenarios_respect_fleet_and_shift():
+    instance = city_instance(120, seed=4)
+    scenarios = [
+        {"name": "unlimited"},
+        {"name": "three vehicles", "vehicles": 3},
+        {"name": "short shift", "shift_s": 3 * 3600, "mode": "greedy"},
+    ]
+    unlimited, three, short = solve_scenarios(instance, scenarios, workers=1, merge_seconds=30)
+    stops = list(range(1, instance.size))
+    assert sorted(np.concatenate(unlimited["routes"]).tolist()) == stops
+    assert unlimited["unserved"].size == 0
+
+    assert len(three["routes"]) == 3
+    assert three["unserved"].size > 0
+    assert sorted(np.concatenate([*three["routes"], three["unserved"]]).tolist()) == stops
+
+    variant = scenario_instance(instance, scenarios[2])
+    assert variant.windows[0, 1] - variant.windows[0, 0] == 3 * 3600
+    assert all(route_is_feasible(variant, route) for route in short["routes"])
+
+
+def test_pool_matches_in_process():
+    """Scenarios solved in processes sharing the matrix give the same plans as in-process."""
+    instance = city_instance(60, seed=5)
+    scenarios = [{"name": f"{v} vehicles", "vehicles": v, "mode": "alns", "iterations": 20} for v in (2, 4, 8)]
+    pooled = solve_scenarios(instance, scenarios, workers=2)
+    local = solve_scenarios(instance, scenarios, workers=1)
+    for a, b in zip(pooled, local):
+        assert a["name"] == b["name"]
+        assert a["objective"] == b["objective"]
+        assert np.array_equal(a["unserved"], b["unserved"])
+
+
+def test_daemonic_process_solves_scenarios_in_turn(monkeypatch, caplog):
+    """Under a Celery prefork child no pool can start: same plans, solved in-process, with a warning."""
+    instance = city_instance(30, seed=6)
+    scenarios = [{"name": f"{v} vehicles", "vehicles": v} for v in (2, 4)]
+    pooled = solve_scenarios(instance, scenarios, workers=2)
+    monkeypatch.setattr(shared, "current_process", lambda: SimpleNamespace(daemon=True))
+    with caplog.at_level(logging.WARNING, logger="app.solver.shared"):
+        local = solve_scenarios(instance, scenarios, workers=2)
+    assert [a["objective"] for a in pooled] == [b["objective"] for b in local]
+    assert "daemonic" in caplog.text
+    assert not shared.parallel_available(2)
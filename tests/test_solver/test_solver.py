@@ -0,0 +1,48 @@
+"""Tests for the baseline solver modes."""
+
+import numpy as np
+import pytest
+
+from app.solver.evaluation import route_cost, route_is_feasible
+from app.solver.instances import city_instance, uniform_instance
+from app.solver.solver import MODES, solve
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("instance", [uniform_instance(60, seed=3, time_windows=True), city_instance(80, seed=3)])
+def test_solve_visits_every_stop_once_feasibly(instance, mode):
+    """Every customer is on exactly one feasible route and the objective adds up."""
+    solution = solve(instance, mode=mode)
+    visited = np.concatenate(solution.routes)
+    assert sorted(visited.tolist()) == list(range(1, instance.size))
+    assert all(route_is_feasible(instance, r) for r in solution.routes)
+    assert solution.objective == pytest.approx(sum(route_cost(instance.durations, r) for r in solution.routes))
+
+
+def test_local_search_not_worse_than_greedy():
+    """2-opt never makes the greedy solution worse."""
+    instance = uniform_instance(100, seed=4)
+    assert solve(instance, "local_search").objective <= solve(instance, "greedy").objective
+
+
+def test_unknown_mode():
+    """Unknown modes are rejected."""
+    with pytest.raises(ValueError):
+        solve(uniform_instance(5), mode="magic")
+
+
+def test_evaluate_routes_matches_sequential_evaluation():
+    """The batched evaluator agrees with route_cost/route_schedule, including infeasible routes."""
+    from app.solver.evaluation import evaluate_routes, route_schedule
+
+    instance = uniform_instance(60, seed=5, time_windows=True)
+    routes = list(solve(instance, "greedy").routes)
+    rng = np.random.default_rng(0)
+    routes += [rng.permutation(np.arange(1, instance.size))[:k] for k in (0, 1, 7, 30)]
+    evaluation = evaluate_routes(instance, routes)
+    for k, route in enumerate(routes):
+        starts, feasible = route_schedule(instance, route)
+        assert evaluation.travel[k] == pytest.approx(route_cost(instance.durations, route))
+        assert np.allclose(evaluation.starts[k, : len(route)], starts)
+        assert bool(evaluation.feasible[k]) == feasible
+    assert evaluation.feasible[: len(routes) - 4].all()
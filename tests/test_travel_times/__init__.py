@@ -0,0 +1 @@
+"""Travel time subsystem tests."""
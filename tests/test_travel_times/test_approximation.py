@@ -0,0 +1,108 @@
+"""Tests for the geometric approximation backend and the travel time service."""
+
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.models.delivery_points import DeliveryPoint
+from app.solver.instances import city_instance
+from app.travel_times_subsystem.approximation import (
+    DEFAULT_SPEEDS,
+    ApproximationModel,
+    Samples,
+    equirectangular_matrix,
+)
+from app.travel_times_subsystem.cache import store_matrix
+from app.travel_times_subsystem.geometry import haversine_matrix
+from app.travel_times_subsystem.service import TravelTimeService
+
+
+def _samples(detour=1.5, speed=6.0, n=60, seed=0):
+    """Synthetic observations: road distance = detour × great circle, constant speed."""
+    inst = city_instance(n, seed=seed)
+    o, d = np.nonzero(~np.eye(inst.size, dtype=bool))
+    great_circle = haversine_matrix(inst.coords)[o, d]
+    return inst, Samples(inst.coords[o], inst.coords[d], great_circle * detour, great_circle * detour / speed)
+
+
+def test_equirectangular_close_to_haversine_in_city():
+    """Within a city the cheap equirectangular distance is within 0.1% of haversine."""
+    inst = city_instance(100, seed=1)
+    exact = haversine_matrix(inst.coords)
+    approx = equirectangular_matrix(inst.coords)
+    off_diagonal = ~np.eye(inst.size, dtype=bool)
+    np.testing.assert_allclose(approx[off_diagonal], exact[off_diagonal], rtol=1e-3)
+
+
+def test_fit_recovers_detour_and_speed():
+    """Fitted detour and speeds reproduce the observations with a small error report."""
+    inst, samples = _samples()
+    model = ApproximationModel.fit(samples)
+    assert model.default_detour == pytest.approx(1.5)
+    assert all(v == pytest.approx(1.5) for v in model.detours.values())
+    assert model.report["mape"] < 0.01
+    matrix = model.matrix(inst.coords)
+    assert matrix.shape == (inst.size, inst.size)
+    assert np.all(np.diag(matrix) == 0)
+
+
+def test_defaults_without_data_and_monotone_speeds():
+    """An unfitted model uses urban defaults; fitted speeds never fall with distance."""
+    model = ApproximationModel()
+    coords = np.array([[38.72, -9.14], [38.73, -9.14]])
+    assert model.matrix(coords)[0, 1] > 0
+    _, samples = _samples()
+    samples.durations[:10] *= 100
+    assert np.all(np.diff(ApproximationModel.fit(samples).speeds) >= 0)
+
+
+def test_durations_never_fall_with_distance():
+    """No drop at band edges, even when a fitted speed jumps: durations are continuous and non-decreasing."""
+    road = np.linspace(0.0, 100_000.0, 20_001)
+    for speeds in (DEFAULT_SPEEDS, np.array([2.0, 20.0, 21.0, 22.0, 40.0])):
+        durations = ApproximationModel(speeds=speeds.copy())._durations(road, np.ones_like(road))
+        assert durations[0] == 0.0 and np.all(np.diff(durations) >= 0)
+    default = ApproximationModel()._durations(np.array([2_000.0, 2_999.0, 3_001.0]), np.ones(3))
+    assert default[0] == pytest.approx(2_000.0 / 7.0)  # a band's own speed at its midpoint
+    assert default[1] <= default[2]
+
+
+def test_matrix_for_thousands_of_points_is_fast():
+    """A 3000-point matrix is computed in one vectorized pass."""
+    rng = np.random.default_rng(0)
+    coords = np.column_stack((38.7 + rng.normal(0, 0.05, 3000), -9.14 + rng.normal(0, 0.05, 3000)))
+    started = time.perf_counter()
+    matrix = ApproximationModel(method="equirectangular").matrix(coords)
+    assert matrix.shape == (3000, 3000)
+    assert time.perf_counter() - started < 2.0
+
+
+def test_service_cached_mode_prefers_observations_and_verifies_routes(db_session):
+    """Cached mode uses stored legs and fills gaps; verify_routes reprices routes with real legs."""
+    inst = city_instance(6, seed=3)
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": lat, "longitude": lon} for i, (lat, lon) in enumerate(inst.coords)],
+    )
+    db_session.commit()
+    engine = db_session.get_bind()
+    ids = np.arange(1, inst.size + 1)
+    real = inst.durations * 1.2
+    real[0, 3] = np.nan  # one leg never observed
+    store_matrix(engine, ids, 34, real)
+
+    service = TravelTimeService(engine)
+    cached = service.matrix(ids, inst.coords, 34, mode="cached")
+    approximate = service.matrix(ids, inst.coords, 34, mode="approximate")
+    assert cached[1, 2] == pytest.approx(real[1, 2])
+    assert cached[0, 3] == pytest.approx(approximate[0, 3])
+    assert service.approximation.report["samples"] == np.count_nonzero(~np.isnan(real) & ~np.eye(inst.size, dtype=bool))
+
+    report = service.verify_routes([np.array([1, 2]), np.array([3])], ids, approximate, 34)
+    assert report[0]["real_s"] == pytest.approx(real[0, 1] + real[1, 2] + real[2, 0])
+    assert report[0]["missing_legs"] == 0
+    assert report[1]["missing_legs"] == 1
+    with pytest.raises(ValueError):
+        service.matrix(ids, inst.coords, 34, mode="exact")
@@ -0,0 +1,195 @@
+"""Tests for the batched async Distance Matrix client, against a mock provider."""
+
+import asyncio
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+from app.travel_times_subsystem.client import GoogleMapsClient, ProviderError, QuotaExceeded, TokenBucket, tile
+
+
+class MockProvider:
+    """Answers like the Distance Matrix API: duration = 10 * |lat_o - lat_d| * 1000 seconds."""
+
+    def __init__(self, fail_first: int = 0, delay: float = 0.0):
+        self.calls = 0
+        self.fail_first = fail_first
+        self.delay = delay
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            return httpx.Response(503)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        parse = lambda s: [tuple(map(float, p.split(","))) for p in s.split("|")]  # noqa: E731
+        origins = parse(request.url.params["origins"])
+        destinations = parse(request.url.params["destinations"])
+        rows = [
+            {"elements": [
+                {"status": "OK", "duration": {"value": round(abs(o[0] - d[0]) * 10_000)}, "distance": {"value": 1}}
+                for d in destinations
+            ]}
+            for o in origins
+        ]
+        return httpx.Response(200, json={"status": "OK", "rows": rows})
+
+
+def _points(n):
+    return np.column_stack((38.0 + np.arange(n) * 0.01, np.full(n, -9.0)))
+
+
+def _client(provider, **kwargs):
+    kwargs.setdefault("elements_per_second", 1_000_000)
+    return GoogleMapsClient(api_key="test", base_url="http://mock", transport=httpx.MockTransport(provider),
+                            backoff_base=0.001, **kwargs)
+
+
+def test_tile_respects_provider_limits():
+    """Blocks cover the matrix exactly once and stay within origin/destination/element limits."""
+    blocks = tile(37, 53, max_origins=25, max_destinations=25, max_elements=100)
+    covered = np.zeros((37, 53), dtype=int)
+    for o, d in blocks:
+        assert (o.stop - o.start) * (d.stop - d.start) <= 100
+        covered[o, d] += 1
+    assert np.all(covered == 1)
+
+
+def test_fetch_matrix_assembles_blocks():
+    """A 30×30 matrix is fetched in blocks and assembled in the right positions."""
+    provider = MockProvider()
+    points = _points(30)
+
+    async def run():
+        async with _client(provider) as maps:
+            return await maps.fetch_matrix(points), maps.metrics
+
+    result, metrics = asyncio.run(run())
+    expected = np.rint(np.abs(points[:, None, 0] - points[None, :, 0]) * 10_000)
+    np.testing.assert_array_equal(result.durations, expected)
+    assert result.elements == 900
+    assert result.cost == pytest.approx(900 * metrics.cost_per_element)
+    assert provider.calls == len(tile(30, 30, 25, 25, 100))
+    assert metrics.elements_per_second > 0
+
+
+def test_retries_with_backoff_then_succeeds():
+    """Transient 503s are retried."""
+    provider = MockProvider(fail_first=2)
+
+    async def run():
+        async with _client(provider) as maps:
+            return await maps.fetch_matrix(_points(3)), maps.metrics
+
+    result, metrics = asyncio.run(run())
+    assert not np.isnan(result.durations).any()
+    assert metrics.retries == 2
+
+
+def test_gives_up_after_max_retries_and_releases_quota():
+    """Persistent failures raise ProviderError without consuming quota."""
+    provider = MockProvider(fail_first=100)
+
+    async def run():
+        async with _client(provider, max_retries=2, quota_elements=100) as maps:
+            with pytest.raises(ProviderError):
+                await maps.fetch_matrix(_points(3))
+            return maps.quota.used
+
+    assert asyncio.run(run()) == 0
+    assert provider.calls == 3
+
+
+def test_client_error_status_raises_provider_error_without_retrying():
+    calls = []
+
+    def provider(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(400, text="Invalid request")
+
+    async def run():
+        async with _client(provider, max_retries=2) as maps:
+            with pytest.raises(ProviderError, match="HTTP 400"):
+                await maps.fetch_matrix(_points(3))
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_quota_budget_enforced():
+    """Requests beyond the element quota fail with QuotaExceeded."""
+
+    async def run():
+        async with _client(MockProvider(), quota_elements=50) as maps:
+            await maps.fetch_matrix(_points(5))  # 25 elements
+            with pytest.raises(QuotaExceeded):
+                await maps.fetch_matrix(_points(6))  # 36 elements
+
+    asyncio.run(run())
+
+
+def test_quota_is_reserved_for_the_whole_matrix():
+    """A matrix the quota cannot cover fails before any block is requested."""
+    provider = MockProvider()
+
+    async def run():
+        async with _client(provider, quota_elements=100) as maps:
+            with pytest.raises(QuotaExceeded):
+                await maps.fetch_matrix(_points(11))  # 121 elements, two blocks
+            return maps.quota
+
+    quota = asyncio.run(run())
+    assert provider.calls == 0
+    assert quota.used == quota.reserved == 0
+
+
+def test_failed_block_cancels_pending_blocks():
+    """The first block error stops the matrix: later blocks are never sent and only answered blocks are charged."""
+    calls = []
+
+    async def provider(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 2:
+            return httpx.Response(200, json={"status": "REQUEST_DENIED", "error_message": "bad key"})
+        return await MockProvider(delay=0.01)(request)
+
+    async def run():
+        async with _client(provider, max_concurrency=1, max_origins=2, quota_elements=1000) as maps:
+            with pytest.raises(ProviderError):
+                await maps.fetch_matrix(_points(10))  # five blocks of 2×10
+            return maps.quota
+
+    quota = asyncio.run(run())
+    # The block already waiting for the connection may start; it is cancelled before its answer.
+    assert len(calls) <= 3
+    assert quota.used == 20 and quota.reserved == 0
+
+
+def test_identical_concurrent_requests_are_deduplicated():
+    """Two concurrent fetches of the same matrix share in-flight block requests."""
+    provider = MockProvider(delay=0.05)
+
+    async def run():
+        async with _client(provider) as maps:
+            a, b = await asyncio.gather(maps.fetch_matrix(_points(10)), maps.fetch_matrix(_points(10)))
+            return a, b, maps.metrics
+
+    a, b, metrics = asyncio.run(run())
+    np.testing.assert_array_equal(a.durations, b.durations)
+    assert provider.calls == 1
+    assert metrics.deduplicated == 1
+
+
+def test_token_bucket_limits_rate():
+    """Acquiring beyond the burst waits for refill."""
+
+    async def run():
+        bucket = TokenBucket(rate=1000, capacity=10)
+        started = time.perf_counter()
+        for _ in range(5):
+            await bucket.acquire(10)
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) >= 0.035
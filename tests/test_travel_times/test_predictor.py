@@ -0,0 +1,129 @@
+"""Tests for the batch travel time predictor and its training task."""
+
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.models.delivery_points import DeliveryPoint
+from app.solver.instances import city_instance
+from app.config import settings
+from app.travel_times_subsystem.cache import store_matrix
+from app.travel_times_subsystem.predictor import Observations, TravelTimePredictor, load_predictor, uncertain_pairs
+from app.travel_times_subsystem.service import TravelTimeService
+
+
+def _observations(n_obs=20_000, seed=0):
+    """Noisy city travel times with a morning peak around bucket 34 (08:30)."""
+    inst = city_instance(200, seed=seed)
+    rng = np.random.default_rng(seed)
+    o = rng.integers(0, inst.size, n_obs)
+    d = rng.integers(0, inst.size, n_obs)
+    keep = o != d
+    o, d = o[keep], d[keep]
+    buckets = rng.integers(28, 60, o.size)
+    peak = 1 + 0.4 * np.exp(-(((buckets - 34) / 4.0) ** 2))
+    durations = inst.durations[o, d] * peak * rng.lognormal(0, 0.05, o.size)
+    return inst, Observations(inst.coords[o], inst.coords[d], buckets, durations)
+
+
+def test_fit_learns_distance_and_time_of_day():
+    """The model fits within a few percent and predicts slower trips at the peak."""
+    inst, obs = _observations()
+    model = TravelTimePredictor()
+    metrics = model.fit(obs)
+    assert metrics["mape"] < 0.15
+    peak, _ = model.predict(inst.coords[[1]], inst.coords[[50]], [34])
+    off_peak, _ = model.predict(inst.coords[[1]], inst.coords[[50]], [56])
+    assert peak[0] > off_peak[0] * 1.1
+
+
+def test_predict_matrix_matches_pairwise_and_flags_uncertainty():
+    """Matrix prediction equals pairwise prediction; unseen far-away cells are uncertain."""
+    inst, obs = _observations()
+    model = TravelTimePredictor()
+    model.fit(obs)
+    coords = np.vstack((inst.coords[:20], [[41.15, -8.61]]))  # plus a point in Porto, never observed
+    durations, sigma = model.predict_matrix(coords, 34)
+    n = coords.shape[0]
+    pairwise, pairwise_sigma = model.predict(np.repeat(coords, n, axis=0), np.tile(coords, (n, 1)), 34)
+    np.testing.assert_allclose(durations.ravel(), pairwise)
+    np.testing.assert_allclose(sigma.ravel(), pairwise_sigma)
+    assert np.all(np.diag(durations) == 0)
+    assert sigma[0, -1] > sigma[0, 1]
+    assert uncertain_pairs(sigma, 0.2)[:, -1].sum() >= uncertain_pairs(sigma, 0.2)[:, 1].sum()
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A saved model predicts identically after loading."""
+    inst, obs = _observations(5_000)
+    model = TravelTimePredictor(n_cells=64)
+    model.fit(obs)
+    path = tmp_path / "model.npz"
+    model.save(path)
+    loaded = TravelTimePredictor.load(path)
+    np.testing.assert_allclose(loaded.predict_matrix(inst.coords[:10], 40)[0], model.predict_matrix(inst.coords[:10], 40)[0])
+
+
+def test_inference_throughput_at_least_1m_pairs_per_second():
+    """A 1000×1000 matrix (1M pairs) is predicted in under a second on CPU."""
+    inst, obs = _observations(5_000)
+    model = TravelTimePredictor()
+    model.fit(obs)
+    coords = np.repeat(inst.coords, 5, axis=0)[:1000] + np.random.default_rng(1).normal(0, 1e-3, (1000, 2))
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        model.predict_matrix(coords, 34)
+        best = min(best, time.perf_counter() - started)
+    assert 1_000_000 / best >= 1_000_000
+
+
+def test_untrained_predictor_raises():
+    with pytest.raises(RuntimeError):
+        TravelTimePredictor().predict_matrix(np.zeros((2, 2)), 0)
+
+
+def test_train_task_reads_cache_and_saves_model(db_session, monkeypatch, tmp_path):
+    """The worker task trains from cached observations and writes the model file."""
+    import app.worker.tasks as tasks
+
+    inst = city_instance(30, seed=2)
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": lat, "longitude": lon} for i, (lat, lon) in enumerate(inst.coords)],
+    )
+    db_session.commit()
+    engine = db_session.get_bind()
+    ids = np.arange(1, inst.size + 1)
+    for bucket in (32, 40):
+        store_matrix(engine, ids, bucket, inst.durations)
+    monkeypatch.setattr(tasks, "engine", engine)
+
+    result = tasks.train_travel_time_predictor(str(tmp_path / "model.npz"))
+    assert result["observations"] == 2 * inst.size * (inst.size - 1)
+    assert TravelTimePredictor.load(result["path"]).n_observations == result["observations"]
+
+
+def test_service_fills_cache_gaps_with_saved_model(db_session, monkeypatch, tmp_path):
+    """Once a model is saved, cached-mode matrices fill gaps with its predictions instead of the approximation."""
+    inst, obs = _observations(5_000)
+    db_session.execute(
+        insert(DeliveryPoint),
+        [{"name": f"DP {i}", "latitude": lat, "longitude": lon} for i, (lat, lon) in enumerate(inst.coords[:5])],
+    )
+    db_session.commit()
+    engine = db_session.get_bind()
+    path = tmp_path / "model.npz"
+    monkeypatch.setattr(settings, "travel_time_model_path", str(path))
+    ids, coords = np.arange(1, 6), inst.coords[:5]
+    assert load_predictor() is None
+
+    model = TravelTimePredictor(n_cells=64)
+    model.fit(obs)
+    model.save(path)
+    store_matrix(engine, ids[:1], 34, np.full((1, 5), 99.0), destination_ids=ids)
+    matrix = TravelTimeService(engine).matrix(ids, coords, 34)
+    np.testing.assert_allclose(matrix[0, 1:], 99.0)
+    np.testing.assert_allclose(matrix[1:], model.predict_matrix(coords, 34)[0][1:])
@@ -0,0 +1,112 @@
+"""Tests for time-dependent travel time profiles and their cache storage."""
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.models.delivery_points import DeliveryPoint
+from app.travel_times_subsystem.cache import PAIR_CHUNK_SIZE, load_durations, load_pairs, load_profile, store_matrix
+from app.travel_times_subsystem.profiles import TravelTimeProfile
+
+W = 900.0  # bucket width
+
+
+def _profile():
+    # 2 nodes, buckets 28..31 (07:00-08:00); 0->1 gets slower through the morning.
+    values = np.zeros((2, 2, 4))
+    values[0, 1] = [600.0, 900.0, 1500.0, 1200.0]
+    values[1, 0] = [300.0, 300.0, 300.0, 300.0]
+    return TravelTimeProfile(values, first_bucket=28, bucket_seconds=W)
+
+
+def test_interpolates_between_bucket_centres():
+    """Lookups hit bucket centres exactly and interpolate linearly between them."""
+    profile = _profile()
+    centres = profile.bucket_centres
+    np.testing.assert_allclose(profile.travel_time(0, 1, centres), [600, 900, 1500, 1200])
+    assert profile.travel_time(0, 1, (centres[0] + centres[1]) / 2) == pytest.approx(750.0)
+    # Before the first and after the last centre the end values are used.
+    assert profile.travel_time(0, 1, 0.0) == pytest.approx(600.0)
+    assert profile.travel_time(0, 1, 86_000.0) == pytest.approx(1200.0)
+
+
+def test_vectorized_broadcasting():
+    """Many (origin, destination, departure) triples are evaluated in one call."""
+    profile = _profile()
+    times = np.linspace(7 * 3600, 8 * 3600, 1000)
+    result = profile.travel_time(np.zeros(1000, dtype=int), 1, times)
+    assert result.shape == (1000,)
+    assert profile.static_matrix(7.5 * 3600).shape == (2, 2)
+
+
+def test_fifo_is_enforced():
+    """A drop steeper than the bucket width is capped so later departures never arrive earlier."""
+    values = np.zeros((2, 2, 3))
+    values[0, 1] = [3000.0, 100.0, 100.0]
+    profile = TravelTimeProfile(values, bucket_seconds=W)
+    assert profile.durations[0, 1, 0] == pytest.approx(100.0 + W)
+    departures = np.linspace(0, 3 * W, 500)
+    arrivals = profile.arrival_times(0, 1, departures)
+    assert np.all(np.diff(arrivals) >= -1e-9)
+
+
+def test_missing_buckets_are_filled_from_neighbours():
+    """NaN buckets take the nearest observed bucket; pairs never observed stay NaN."""
+    values = np.full((2, 2, 4), np.nan)
+    values[0, 1] = [np.nan, 500.0, np.nan, 800.0]
+    profile = TravelTimeProfile(values, bucket_seconds=W)
+    np.testing.assert_allclose(profile.durations[0, 1], [500.0, 500.0, 500.0, 800.0])
+    assert np.isnan(profile.durations[1, 0]).all()
+
+
+def test_route_schedules_evaluates_all_routes_per_leg():
+    """Arrival times along padded routes account for time-dependent legs and service."""
+    profile = _profile()
+    start = profile.bucket_centres[0]
+    routes = np.array([[0, 1, 0], [1, 0, -1]])
+    arrivals = profile.route_schedules(routes, [start, start], service_times=[0.0, 60.0])
+    assert arrivals[0, 1] == pytest.approx(start + 600.0)
+    assert arrivals[0, 2] == pytest.approx(arrivals[0, 1] + 60.0 + 300.0)
+    assert arrivals[1, 1] == pytest.approx(start + 300.0)
+    assert np.isnan(arrivals[1, 2])
+
+
+def test_store_and_load_profile_from_cache(db_session):
+    """Observed matrices round-trip through the cache into a profile; re-storing updates in place."""
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}"} for i in range(3)])
+    db_session.commit()
+    engine = db_session.get_bind()
+    ids = np.array([3, 1, 2])
+    matrix = np.array([[0.0, 10.0, 20.0], [30.0, 0.0, np.nan], [50.0, 60.0, 0.0]])
+    assert store_matrix(engine, ids, 30, matrix) == 5
+    assert store_matrix(engine, ids, 30, matrix * 2) == 5
+
+    durations = load_durations(engine, ids, range(29, 32))
+    assert durations.shape == (3, 3, 3)
+    np.testing.assert_allclose(durations[..., 1], [[0.0, 20.0, 40.0], [60.0, 0.0, np.nan], [100.0, 120.0, 0.0]])
+    assert np.isnan(durations[0, 1, 0])
+
+    profile = load_profile(engine, ids, range(29, 32))
+    assert profile.travel_time(0, 1, 7 * 3600).item() == pytest.approx(20.0)
+
+
+def test_load_pairs_reads_only_the_requested_pairs(db_session, count_queries):
+    """Pricing aligned legs on a warm cache selects those pairs, not every origin × destination."""
+    n = 150
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}"} for i in range(n)])
+    db_session.commit()
+    engine = db_session.get_bind()
+    ids = np.arange(1, n + 1)
+    real = np.random.default_rng(0).uniform(60, 600, (n, n))
+    store_matrix(engine, ids, 34, real)
+
+    # Every leg of a tour twice over, plus a leg that is not cached and one standing still.
+    origins = np.concatenate((ids, ids, [1, 5]))
+    destinations = np.concatenate((np.roll(ids, -1), np.roll(ids, -1), [n + 1, 5]))
+    with count_queries(engine) as log:
+        priced = load_pairs(engine, origins, destinations, 34)
+    np.testing.assert_allclose(priced[:2 * n], np.tile(real[ids - 1, np.roll(ids, -1) - 1], 2))
+    assert np.isnan(priced[-2]) and priced[-1] == 0.0
+    assert log.count == -(-(n + 1) // PAIR_CHUNK_SIZE)
+    # Each of the n + 1 distinct pairs is bound once (two ids), plus the bucket and no-route filter per statement.
+    assert sum(statement.count("?") for statement in log.statements) == 2 * (n + 1) + 2 * log.count
@@ -0,0 +1,141 @@
+"""Tests for worker affinity: registry, resident regional matrices and dispatch."""
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.models.delivery_points import DeliveryPoint
+from app.travel_times_subsystem.approximation import region_bounds, region_of
+from app.travel_times_subsystem.cache import store_matrix
+from app.worker.affinity import ResidentData, WorkerRegistry, dispatch_solve_job, job_region, load_region_matrix
+
+
+class FakeRedis:
+    """The three sorted-set commands the registry uses."""
+
+    def __init__(self):
+        self.sets = {}
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        self.sets[key] = {m: s for m, s in self.sets.get(key, {}).items() if not low <= s <= high}
+
+    def zrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        items = sorted(self.sets.get(key, {}).items(), key=lambda kv: kv[1])
+        return [m.encode() for m, s in items if low <= s <= high]
+
+
+class FakeTask:
+    def __init__(self):
+        self.calls = []
+
+    def apply_async(self, args, **options):
+        self.calls.append((args, options))
+
+
+def _seed_points(db_session):
+    """Four points in Lisbon and one in Porto (a different region)."""
+    coords = [(38.71, -9.14), (38.72, -9.15), (38.73, -9.13), (38.74, -9.16), (41.15, -8.61)]
+    db_session.execute(insert(DeliveryPoint), [{"name": f"DP {i}", "latitude": a, "longitude": b} for i, (a, b) in enumerate(coords)])
+    db_session.commit()
+    return np.array(coords)
+
+
+def test_registry_returns_recent_workers_first_and_expires_old_ones():
+    registry = WorkerRegistry(FakeRedis(), ttl=60)
+    registry.advertise("w1@host", [7, 8], now=1000)
+    registry.advertise("w2@host", [7], now=1030)
+    assert registry.workers_for(7, now=1040) == ["w2@host", "w1@host"]
+    assert registry.workers_for(7, now=1070) == ["w2@host"]
+    assert registry.workers_for(9, now=1040) == []
+
+
+def test_dispatch_prefers_worker_with_region_and_schedules_fallback():
+    registry = WorkerRegistry(FakeRedis(), ttl=60)
+    registry.advertise("w1@host", [7])
+    task = FakeTask()
+    assert dispatch_solve_job(task, 5, 7, registry, timeout=30) == "w1@host"
+    (direct_args, direct), (fallback_args, fallback) = task.calls
+    assert direct_args == fallback_args == [5]
+    assert direct["queue"].name == "w1@host.dq2"
+    assert fallback == {"countdown": 30}
+
+    task = FakeTask()
+    assert dispatch_solve_job(task, 6, 8, registry) is None
+    assert task.calls == [([6], {})]
+
+
+def test_resident_data_reuses_region_matrix_across_jobs(db_session):
+    coords = _seed_points(db_session)
+    engine = db_session.get_bind()
+    ids = np.arange(1, 5)
+    store_matrix(engine, ids, 32, np.full((4, 4), 300.0))
+    resident = ResidentData(engine, max_regions=1, ttl=3600)
+
+    first = resident.matrix(ids[:3], coords[:3], 32)
+    second = resident.matrix(ids[[3, 0]], coords[[3, 0]], 32)
+    assert resident.loads == 1 and resident.hits == 1
+    assert resident.regions == {job_region(coords[0])}
+    np.testing.assert_allclose(first, np.where(np.eye(3, dtype=bool), 0.0, 300.0))
+    np.testing.assert_allclose(second, [[0.0, 300.0], [300.0, 0.0]])
+
+    # A job in another region evicts the least recently used one (max_regions=1).
+    resident.matrix(np.array([5]), coords[[4]], 32)
+    assert resident.regions == {job_region(coords[4])}
+
+
+def test_resident_data_matches_service_for_uncached_pairs(db_session):
+    coords = _seed_points(db_session)
+    resident = ResidentData(db_session.get_bind())
+    ids = np.arange(1, 5)
+    np.testing.assert_allclose(resident.matrix(ids, coords[:4], 32), resident.service.matrix(ids, coords[:4], 32))
+
+
+def test_region_bounds_contain_their_points():
+    coords = np.column_stack((np.random.default_rng(0).uniform(-89, 89, 500), np.random.default_rng(1).uniform(-179, 179, 500)))
+    for (lat, lon), region in zip(coords, region_of(coords)):
+        lat_min, lat_max, lon_min, lon_max = region_bounds(int(region))
+        assert lat_min <= lat < lat_max and lon_min <= lon < lon_max
+
+
+def test_load_region_matrix_reads_only_the_region(db_session, monkeypatch):
+    """The region is filtered in SQL: Porto's point is never read for a Lisbon matrix."""
+    import app.worker.affinity as affinity
+
+    coords = _seed_points(db_session)
+    region = job_region(coords[0])
+    seen = []
+    monkeypatch.setattr(affinity, "region_of", lambda coords: seen.append(len(coords)) or region_of(coords))
+    entry = load_region_matrix(db_session.get_bind(), region, 32, max_points=10)
+    assert entry.ids.tolist() == [1, 2, 3, 4]
+    assert seen == [4]
+
+
+def test_region_matrix_is_built_in_float32_blocks(db_session, monkeypatch, count_queries):
+    import app.worker.affinity as affinity
+
+    coords = _seed_points(db_session)
+    engine = db_session.get_bind()
+    real = np.arange(16, dtype=np.float64).reshape(4, 4) + 100
+    store_matrix(engine, np.arange(1, 5), 32, real)
+    monkeypatch.setattr(affinity, "REGION_BLOCK", 3)
+    with count_queries(engine) as log:
+        entry = load_region_matrix(engine, job_region(coords[0]), 32, max_points=10)
+    assert entry.durations.dtype == np.float32
+    np.testing.assert_allclose(entry.durations, np.where(np.eye(4, dtype=bool), 0.0, real))
+    assert log.count == 1 + 4  # the points, then 2×2 blocks
+
+
+def test_resident_data_bounds_total_memory(db_session):
+    """Regions are evicted to stay within ``max_bytes``, whatever ``max_regions`` allows."""
+    coords = _seed_points(db_session)
+    engine = db_session.get_bind()
+    lisbon = 4 * 4 * 4  # bytes of the 4-point float32 matrix
+    resident = ResidentData(engine, max_regions=10, max_bytes=lisbon + 2, ttl=3600)
+    resident.matrix(np.arange(1, 5), coords[:4], 32)
+    resident.matrix(np.array([5]), coords[[4]], 32)
+    assert resident.regions == {job_region(coords[4])}
+    assert resident.resident_bytes <= lisbon + 2